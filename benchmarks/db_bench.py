@@ -0,0 +1,89 @@
+"""
+Measure the write latency and reader/writer concurrency of the session database.
+
+Runs the same workload against a temporary database with the default settings
+(WAL, synchronous=NORMAL) and with the SQLite defaults (rollback journal, synchronous=FULL):
+
+    python benchmarks/db_bench.py --events 500 --readers 2
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from dasshh.data.client import DBClient
+from dasshh.data.session import SessionService
+
+PRESETS = {
+    "sqlite-defaults": {"journal_mode": "delete", "synchronous": "full", "mmap_size_mb": 0, "cache_size_mb": 2},
+    "dasshh-defaults": {},
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * pct), len(samples) - 1)]
+
+
+def run(name: str, config: dict, events: int, readers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        client = DBClient(db_path=Path(tmp) / "bench.db", config=config)
+        service = SessionService(client)
+        session = service.new_session(detail="bench")
+
+        stop = threading.Event()
+        reads: list[float] = []
+        errors: list[Exception] = []
+
+        def reader() -> None:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    service.get_events(session_id=session.id)
+                except Exception as e:
+                    errors.append(e)
+                reads.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+
+        writes = []
+        content = {"role": "assistant", "content": "x" * 200}
+        for i in range(events):
+            start = time.perf_counter()
+            service.add_event(invocation_id=str(i), session_id=session.id, content=content)
+            writes.append(time.perf_counter() - start)
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+        client.engine.dispose()
+
+    ms = 1000
+    print(f"{name}:")
+    print(
+        f"  add_event  p50 {statistics.median(writes) * ms:.2f} ms  "
+        f"p99 {percentile(writes, 0.99) * ms:.2f} ms  total {sum(writes):.2f} s"
+    )
+    if reads:
+        print(
+            f"  get_events {len(reads)} reads  p50 {statistics.median(reads) * ms:.2f} ms  "
+            f"p99 {percentile(reads, 0.99) * ms:.2f} ms  errors {len(errors)}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500, help="events written per run")
+    parser.add_argument("--readers", type=int, default=2, help="threads reading the session while it is written")
+    args = parser.parse_args()
+
+    for name, config in PRESETS.items():
+        run(name, config, args.events, args.readers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure the per-event cost of the session service with and without the sqlite3 fast path.
+
+Writes events one at a time (the synchronous path of `add_event`), then reads the whole
+session and pages through it, against a temporary database for each path:
+
+    python benchmarks/session_bench.py --events 2000 --page 50
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from dasshh.data import fast_path
+from dasshh.data.client import DBClient
+from dasshh.data.session import SessionService
+
+
+def run(name: str, use_fast_path: bool, events: int, page: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        client = DBClient(db_path=Path(tmp) / "bench.db")
+        service = SessionService(client, fast_path=use_fast_path)
+        session = service.new_session(detail="bench")
+        contents = [
+            {"role": "user", "content": "What is the weather in Paris? " * 4},
+            {"role": "assistant", "tool_calls": [{"id": "1", "function": {"name": "weather", "arguments": "{}"}}]},
+            {"role": "tool", "tool_call_id": "1", "name": "weather", "content": '{"temp": 21}' * 40},
+            {"role": "assistant", "content": "It is 21 degrees in Paris. " * 8},
+        ]
+
+        writes = []
+        for i in range(events):
+            start = time.perf_counter()
+            service.add_event(invocation_id=str(i // 4), session_id=session.id, content=contents[i % 4])
+            writes.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        service.get_events(session_id=session.id)
+        full_read = time.perf_counter() - start
+
+        pages = []
+        after_seq = None
+        while True:
+            start = time.perf_counter()
+            rows = service.get_events(session_id=session.id, after_seq=after_seq, limit=page)
+            pages.append(time.perf_counter() - start)
+            if not rows:
+                break
+            after_seq = rows[-1].seq
+
+        start = time.perf_counter()
+        for _ in range(100):
+            service.get_recent_session()
+        recent = (time.perf_counter() - start) / 100
+        client.engine.dispose()
+
+    us = 1_000_000
+    print(f"{name}:")
+    print(f"  add_event           p50 {statistics.median(writes) * us:8.1f} us  mean {statistics.mean(writes) * us:8.1f} us")
+    print(f"  get_events (all)    {full_read * us / events:8.1f} us per event  total {full_read * 1000:.1f} ms")
+    print(f"  get_events (page)   p50 {statistics.median(pages) * us:8.1f} us per page of {page}")
+    print(f"  get_recent_session  {recent * us:8.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000, help="events written per run")
+    parser.add_argument("--page", type=int, default=50, help="events per page when paging through the session")
+    args = parser.parse_args()
+
+    print(f"json codec: {'orjson' if fast_path.orjson is not None else 'json (install orjson for the fast codec)'}")
+    run("orm", False, args.events, args.page)
+    run("fast-path", True, args.events, args.page)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,6 @@
 import click
-import time
-from rich.console import Console
 
 from dasshh.core.logging import setup_logging
-from dasshh.ui.utils import load_config, DEFAULT_CONFIG_PATH
 
 __version__ = "0.1.2"
 
@@ -25,12 +22,37 @@ __version__ = "0.1.2"
     is_flag=True,
     help="Enable debug logging",
 )
+@click.option(
+    "--log-format",
+    type=click.Choice(["text", "json"]),
+    help="The format of the log file, json writes one JSON object per line. Default is logging.format from the config (text).",
+)
+@click.option(
+    "--profile-startup",
+    is_flag=True,
+    help="Start the app, quit once it is ready and print where the startup time went.",
+)
 @click.pass_context
-def main(ctx, version: bool = False, log_file=None, debug=False) -> None:
+def main(ctx, version: bool = False, log_file=None, debug=False, log_format=None, profile_startup=False) -> None:
     import logging
 
+    profiler = None
+    if profile_startup and ctx.invoked_subcommand is None:
+        from dasshh.core.startup import StartupProfiler
+
+        profiler = StartupProfiler()
+        profiler.install()
+
+    from dasshh.core.config import get_config
+
+    log_config = get_config().logging
     log_level = logging.DEBUG if debug else logging.INFO
-    setup_logging(log_file=log_file, log_level=log_level)
+    setup_logging(
+        log_file=log_file,
+        log_level=log_level,
+        json_format=(log_format or log_config.format) == "json",
+        sample_rates=log_config.sample_rates,
+    )
     logger = logging.getLogger("dasshh.main")
 
     if version:
@@ -39,23 +61,206 @@ def main(ctx, version: bool = False, log_file=None, debug=False) -> None:
         ctx.exit()
 
     if ctx.invoked_subcommand is None:
-        console = Console()
-        with console.status("Starting Dasshh 🗲 ", spinner="dots"):
-            time.sleep(1.2)
-            console.clear()
-            from dasshh.ui.app import Dasshh
+        import asyncio
+
+        from dasshh.ui.app import Dasshh
+
+        if profiler is None:
+            Dasshh().run()
+            return
 
+        profiler.mark("app imported")
         app = Dasshh()
-        app.run()
+        profiler.mark("app created")
+
+        async def wait_until_ready(pilot) -> None:
+            # the auto pilot starts once the first screen is shown
+            profiler.mark("ui shown")
+            while not app.runtime.ready:
+                await asyncio.sleep(0.01)
+            profiler.mark("litellm loaded (background)")
+            app.exit()
+
+        app.run(auto_pilot=wait_until_ready)
+        profiler.uninstall()
+        report = profiler.report()
+        logger.info(report)
+        click.echo(report)
 
 
 @main.command()
 def init_config():
     """Initialize the configuration file."""
+    from dasshh.ui.utils import load_config, DEFAULT_CONFIG_PATH
+
     load_config()
     click.echo(f"Config file created at: {DEFAULT_CONFIG_PATH}")
     click.echo("Please edit this file to set your model API key before starting the application.")
 
 
+@main.command()
+@click.argument("prompts", nargs=-1)
+@click.option(
+    "--file",
+    "prompt_file",
+    type=click.File("r"),
+    help='Read prompts from a JSONL file, one JSON string or {"id": ..., "prompt": ...} object per line. - reads it from stdin.',
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="The number of prompts run at the same time, each in its own session.",
+)
+@click.option(
+    "--output",
+    type=click.Choice(["text", "jsonl"]),
+    help="text prints the answers, jsonl writes one result record per prompt. "
+    "Default is text with a concurrency of 1, jsonl otherwise.",
+)
+@click.option("--timeout", type=float, help="The longest a prompt may take, in seconds.")
+@click.pass_context
+def run(ctx, prompts, prompt_file=None, concurrency=1, output=None, timeout=None):
+    """
+    Run prompts without the UI.
+
+    Prompts are taken from the arguments, from --file, or one per line from stdin. Every prompt
+    runs in a new session. With a concurrency of 1 and text output the answers and tool calls
+    are streamed as they arrive.
+    """
+    import asyncio
+    import sys
+
+    from dasshh.core.batch import BatchPrompt, parse_prompt_lines
+    from dasshh.core.config import get_config
+
+    if prompt_file is not None:
+        source = parse_prompt_lines(prompt_file, jsonl=True)
+    elif prompts:
+        source = [BatchPrompt(id=number, text=prompt) for number, prompt in enumerate(prompts, start=1)]
+    elif not sys.stdin.isatty():
+        source = parse_prompt_lines(sys.stdin)
+    else:
+        raise click.UsageError("No prompts given, pass them as arguments, with --file or on stdin")
+
+    config = get_config()
+    if config.model is None:
+        raise click.UsageError("No model is configured, run `dasshh init-config` and set the model")
+    output = output or ("text" if concurrency == 1 else "jsonl")
+
+    try:
+        failed = asyncio.run(_run_batch(source, config, concurrency, output, timeout))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if failed:
+        ctx.exit(1)
+
+
+async def _run_batch(prompts, config, concurrency: int, output: str, timeout: float | None) -> int:
+    """Run prompts on a runtime without the UI, returns the number of prompts that failed."""
+    import sys
+
+    from dasshh.core.batch import BatchRunner
+    from dasshh.core.runtime import DasshhRuntime
+    from dasshh.data.client import DBClient
+    from dasshh.data.session import SessionService
+    from dasshh.ui.utils import load_tools, save_tool_manifest
+
+    manifest = load_tools()
+    db_config = config.db
+    session_service = SessionService(
+        DBClient(config=db_config.model_dump()),
+        write_behind=db_config.write_behind,
+        blob_threshold=db_config.blob_threshold_kb * 1024,
+        fast_path=db_config.fast_path,
+    )
+    # every prompt is its own session, the scheduler must not hold them back
+    settings = config.dasshh.model_copy(update={"max_parallel_sessions": concurrency})
+    runtime = DasshhRuntime(session_service, config.model_copy(update={"dasshh": settings}))
+    streaming = output == "text" and concurrency == 1
+    runner = BatchRunner(
+        runtime,
+        session_service,
+        concurrency=concurrency,
+        timeout=timeout,
+        stream=sys.stdout if streaming else None,
+    )
+
+    def on_result(result) -> None:
+        if output == "jsonl":
+            click.echo(result.to_json())
+            return
+        if not streaming:
+            click.echo(f"[{result.id}] {result.prompt}")
+            click.echo(result.response)
+        if result.error is not None:
+            click.echo(f"[{result.id}] failed: {result.error}", err=True)
+
+    await runtime.start()
+    try:
+        return await runner.run(prompts, on_result)
+    finally:
+        await runtime.stop()
+        session_service.close()
+        save_tool_manifest(manifest)
+
+
+@main.group()
+def db():
+    """Manage the session database."""
+
+
+@db.command()
+@click.option(
+    "--idle-days",
+    type=float,
+    help="Archive sessions idle for longer than this many days. Default is db.archive_after_days from the config (30).",
+)
+def compact(idle_days: float | None = None):
+    """Compress idle sessions and shrink the database file."""
+    from datetime import timedelta
+
+    from dasshh.data.client import DBClient
+    from dasshh.data.session import SessionService
+    from dasshh.core.config import get_config
+
+    db_config = get_config().db
+    if idle_days is None:
+        idle_days = db_config.archive_after_days
+
+    client = DBClient(config=db_config.model_dump())
+    service = SessionService(client)
+    size_before = _db_size(client.db_path)
+
+    report = service.archive_idle_sessions(timedelta(days=idle_days))
+    client.vacuum()
+    client.engine.dispose()
+    size_after = _db_size(client.db_path)
+
+    click.echo(f"Archived {report.events} events of {report.sessions} sessions idle for over {idle_days:g} days")
+    click.echo(f"Compressed {_format_size(report.bytes_before)} to {_format_size(report.bytes_after)}")
+    click.echo(
+        f"Database size: {_format_size(size_before)} -> {_format_size(size_after)} "
+        f"({_format_size(max(size_before - size_after, 0))} reclaimed)"
+    )
+
+
+def _db_size(db_path) -> int:
+    """The size of the database file and its write-ahead log."""
+    return sum(
+        path.stat().st_size
+        for path in (db_path, db_path.with_name(db_path.name + "-wal"))
+        if path.exists()
+    )
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
 if __name__ == "__main__":
     main()
@@ -11,11 +11,7 @@ def get_available_tools() -> dict:
         A list of dictionaries containing tool information (name, description, parameters).
     """
     registry = Registry()
-    tools = registry.get_tools()
 
     return {
-        "available_tools": [
-            tool.get_declaration()
-            for tool in tools
-        ]
+        "available_tools": registry.get_tool_declarations()
     }
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, TextIO
+
+from dasshh.core.runtime import DasshhRuntime
+from dasshh.data.session import SessionService
+from dasshh.ui.events import (
+    AssistantResponseComplete,
+    AssistantResponseError,
+    AssistantResponseUpdate,
+    AssistantToolCallComplete,
+    AssistantToolCallError,
+    AssistantToolCallStart,
+)
+
+logger = logging.getLogger(__name__)
+
+SESSION_DETAIL_LENGTH = 80
+"""The number of characters of a prompt used as the detail of its session."""
+
+
+@dataclass(slots=True)
+class BatchPrompt:
+    """A prompt to run without the UI."""
+    id: Any
+    """Identifies the prompt in its result, the line number unless the input gives one."""
+    text: str
+    """The prompt."""
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """The outcome of a prompt."""
+    id: Any
+    """The id of the prompt."""
+    prompt: str
+    """The prompt."""
+    session_id: str
+    """The session the prompt ran in."""
+    response: str = ""
+    """The final answer of the assistant."""
+    tool_calls: List[dict] = field(default_factory=list)
+    """The `name`, `args` and `result` or `error` of every tool call, in the order they started."""
+    error: str | None = None
+    """Why the prompt failed."""
+    duration_s: float = 0.0
+    """The time from submitting the prompt until its invocation was done, in seconds."""
+
+    def to_json(self) -> str:
+        """The result as a single line of JSON."""
+        return json.dumps(asdict(self), default=str)
+
+
+def parse_prompt_lines(lines: Iterable[str], jsonl: bool = False) -> Iterator[BatchPrompt]:
+    """
+    Read one prompt per line, blank lines are skipped.
+
+    Args:
+        lines: The lines to read.
+        jsonl: Every line is a JSON string, or an object with a `prompt` and an optional `id`.
+    """
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if not jsonl:
+            yield BatchPrompt(id=number, text=line)
+            continue
+        value = json.loads(line)
+        if isinstance(value, str):
+            yield BatchPrompt(id=number, text=value)
+        elif isinstance(value, dict) and isinstance(value.get("prompt"), str):
+            yield BatchPrompt(id=value.get("id", number), text=value["prompt"])
+        else:
+            raise ValueError(f"Line {number} is neither a string nor an object with a prompt")
+
+
+class _Collector:
+    """Collects the events of one invocation into its result, and optionally echoes them."""
+
+    def __init__(self, result: BatchResult, output: TextIO | None = None):
+        self.result = result
+        self.output = output
+        self._tool_calls: dict[str, dict] = {}
+
+    def __call__(self, event) -> None:
+        if isinstance(event, AssistantResponseUpdate):
+            self._write(event.content)
+        elif isinstance(event, AssistantResponseComplete):
+            self.result.response = event.content
+            self._write("\n")
+        elif isinstance(event, AssistantResponseError):
+            self.result.error = event.error
+        elif isinstance(event, AssistantToolCallStart):
+            tool_call = {"name": event.tool_name, "args": event.args}
+            self._tool_calls[event.tool_call_id] = tool_call
+            self.result.tool_calls.append(tool_call)
+            self._write(f"[tool] {event.tool_name}({event.args})\n")
+        elif isinstance(event, AssistantToolCallComplete):
+            self._tool_calls[event.tool_call_id]["result"] = event.result
+            self._write(f"[result] {event.tool_name}: {event.result}\n")
+        elif isinstance(event, AssistantToolCallError):
+            self._tool_calls[event.tool_call_id]["error"] = event.error
+            self._write(f"[error] {event.tool_name}: {event.error}\n")
+
+    def _write(self, text: str) -> None:
+        if self.output is not None:
+            self.output.write(text)
+            self.output.flush()
+
+
+class BatchRunner:
+    """
+    Runs prompts on a runtime without the UI.
+
+    Every prompt gets a new session, up to `concurrency` prompts run at the same time. Prompts
+    are read lazily, so a long stream on stdin is not loaded up front. A result is reported as
+    soon as its invocation is done, so results can come out of order, their `id` tells them apart.
+    """
+    concurrency: int
+    """The maximum number of prompts run at the same time."""
+    timeout: float | None
+    """The longest a prompt may take, in seconds."""
+    stream: TextIO | None
+    """Echo the answers and tool calls as they arrive, only with a concurrency of 1."""
+
+    def __init__(
+        self,
+        runtime: DasshhRuntime,
+        session_service: SessionService,
+        concurrency: int = 1,
+        timeout: float | None = None,
+        stream: TextIO | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.runtime = runtime
+        self.session_service = session_service
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.stream = stream if concurrency == 1 else None
+
+    async def run(self, prompts: Iterable[BatchPrompt], on_result: Callable[[BatchResult], None]) -> int:
+        """
+        Run the prompts.
+
+        Args:
+            prompts: The prompts to run.
+            on_result: Called with the result of each prompt as soon as it is done.
+
+        Returns:
+            The number of prompts that failed.
+        """
+        # one producer reads the prompts, a generator can not be advanced from several threads at once
+        queue: asyncio.Queue[BatchPrompt] = asyncio.Queue(maxsize=self.concurrency)
+        failed = 0
+
+        async def produce() -> None:
+            iterator = iter(prompts)
+            try:
+                while True:
+                    # reading the next prompt may block on stdin
+                    prompt = await asyncio.to_thread(next, iterator, None)
+                    if prompt is None:
+                        break
+                    await queue.put(prompt)
+            finally:
+                # does not wait, also after an invalid prompt line the prompts already read still run
+                queue.shutdown()
+
+        async def worker() -> None:
+            nonlocal failed
+            while True:
+                try:
+                    prompt = await queue.get()
+                except asyncio.QueueShutDown:
+                    return
+                result = await self.run_prompt(prompt)
+                if result.error is not None:
+                    failed += 1
+                on_result(result)
+
+        producer = asyncio.create_task(produce())
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        except BaseException:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+            raise
+        # raises the error of an invalid prompt line
+        await producer
+        return failed
+
+    async def run_prompt(self, prompt: BatchPrompt) -> BatchResult:
+        """Run a single prompt in a new session."""
+        session = self.session_service.new_session(detail=prompt.text[:SESSION_DETAIL_LENGTH])
+        result = BatchResult(id=prompt.id, prompt=prompt.text, session_id=session.id)
+        start = time.perf_counter()
+        invocation_id = await self.runtime.submit_query(
+            message=prompt.text,
+            session_id=session.id,
+            post_message_callback=_Collector(result, self.stream),
+        )
+        try:
+            await asyncio.wait_for(self.runtime.wait_for_invocation(invocation_id), self.timeout)
+        except asyncio.TimeoutError:
+            result.error = f"Timed out after {self.timeout:g}s"
+            # free its session slot for the next prompt
+            await self.runtime.cancel_invocation(invocation_id)
+        result.duration_s = round(time.perf_counter() - start, 3)
+        logger.info(f"-- Prompt {prompt.id} done in {result.duration_s:.2f}s --")
+        return result
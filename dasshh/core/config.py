@@ -0,0 +1,198 @@
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Annotated, Callable, List, Literal
+
+import yaml
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = Path.home() / ".dasshh" / "config.yaml"
+
+
+class _Section(BaseModel):
+    """A section of the configuration file, keys left empty in the file get their default."""
+
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_empty(cls, data):
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value is not None}
+        return data
+
+
+class DasshhConfig(_Section):
+    """The `dasshh` section of the configuration."""
+
+    skip_summarization: bool = Field(False, description="Skip summarization of tool call results.")
+    system_prompt: str | None = Field(None, description="The system prompt, defaults to the built-in one.")
+    tool_workers: int = Field(4, ge=1, description="The maximum number of threads used to run tools.")
+    max_parallel_tool_calls: int = Field(
+        4, ge=1, description="The maximum number of tool calls from a single response run at the same time."
+    )
+    max_parallel_sessions: int = Field(
+        4, ge=1, description="The maximum number of sessions whose queries are processed at the same time."
+    )
+    prompt_cache_size: int = Field(32, ge=1, description="The maximum number of session histories kept in memory.")
+    context_window_tokens: int | None = Field(
+        None, ge=1, description="The token budget for prompts, defaults to the model's max input tokens."
+    )
+    stream_flush_interval_ms: int = Field(
+        33, ge=0, description="The time window over which streamed text is batched, in milliseconds."
+    )
+    stream_flush_chars: int = Field(
+        256, ge=1, description="The number of batched characters that makes streamed text show right away."
+    )
+    tool_directories: List[str] = Field(default_factory=list, description="The directories to load tools from.")
+
+
+class DBConfig(_Section):
+    """The `db` section of the configuration, read by `DBClient` and `SessionService`."""
+
+    write_behind: bool = Field(True, description="Write events on a background thread.")
+    journal_mode: str = Field("wal", description="The SQLite journal mode.")
+    synchronous: str = Field("normal", description="The SQLite synchronous mode.")
+    busy_timeout_ms: int = Field(5000, ge=0, description="How long to wait for a lock, in milliseconds.")
+    mmap_size_mb: int = Field(64, ge=0, description="The size of the memory mapped part of the file, in megabytes.")
+    cache_size_mb: int = Field(16, ge=0, description="The page cache size of each connection, in megabytes.")
+    pool_size: int = Field(5, ge=1, description="The number of connections kept open.")
+    max_overflow: int = Field(10, ge=0, description="The number of connections opened beyond `pool_size`.")
+    pool_timeout: int = Field(30, ge=0, description="How long to wait for a connection, in seconds.")
+    backup_before_migration: bool = Field(True, description="Copy the database file before migrating it.")
+    migration_batch_size: int = Field(1000, ge=1, description="The number of rows a migration backfill updates at once.")
+    archive_after_days: float = Field(30, ge=0, description="Compress sessions idle for longer than this many days.")
+    blob_threshold_kb: int = Field(16, ge=1, description="Event text longer than this goes to the blob store, in KB.")
+    fast_path: bool = Field(True, description="Use plain sqlite3 statements for the hot session operations.")
+    reclaim_interval: float = Field(60, ge=0, description="How often free pages are reclaimed, in seconds, 0 never.")
+
+
+class ModelConfig(_Section):
+    """The `model` section of the configuration."""
+
+    name: str = Field("", description="The litellm model name.")
+    api_base: str | None = Field(None, description="The base URL of the API.")
+    api_key: str | None = Field(None, description="The API key.")
+    api_version: str | None = Field(None, description="The API version.")
+    temperature: float = Field(1.0, description="The sampling temperature.")
+    top_p: float = Field(1.0, description="The nucleus sampling probability.")
+    max_tokens: int | None = Field(None, ge=1, description="The maximum number of tokens to generate.")
+    max_completion_tokens: int | None = Field(
+        None, ge=1, description="The maximum number of tokens to generate, including reasoning tokens."
+    )
+
+
+class LoggingConfig(_Section):
+    """The `logging` section of the configuration, read when Dasshh starts."""
+
+    format: Literal["text", "json"] = Field("text", description="`json` writes one JSON object per line.")
+    sample_rates: dict[str, Annotated[float, Field(ge=0, le=1)]] = Field(
+        default_factory=dict, description="The fraction of the records below WARNING kept, by logger name."
+    )
+
+
+class Config(_Section):
+    """The configuration file."""
+
+    dasshh: DasshhConfig = Field(default_factory=DasshhConfig)
+    db: DBConfig = Field(default_factory=DBConfig)
+    logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    model: ModelConfig | None = Field(None, description="The model, `None` when the file has no model section.")
+
+
+ConfigListener = Callable[[Config, Config], None]
+"""Called with the previous and the new configuration when the file changes."""
+
+
+class ConfigStore:
+    """
+    The parsed configuration file, shared by the whole process.
+
+    The file is parsed and validated once, and parsed again only when its modification time or
+    size changes, so looking up a setting costs a `stat` instead of a YAML parse. A file that fails
+    to parse or validate is logged and the last good configuration is kept. Listeners are called
+    with the previous and the new configuration whenever a change is picked up, on the thread
+    that picked it up.
+    """
+    path: Path
+    """The configuration file."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else DEFAULT_CONFIG_PATH
+        self._config: Config | None = None
+        self._stamp: tuple[int, int] | None = None
+        """The modification time and size of the file the configuration was parsed from."""
+        self._listeners: List[ConfigListener] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> Config:
+        """Get the configuration, parsing the file again if it changed."""
+        self.refresh()
+        return self._config
+
+    def refresh(self) -> bool:
+        """
+        Parse the file again if it changed since it was last parsed, and notify the listeners.
+
+        Returns:
+            Whether the configuration changed.
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            if self._config is not None and stamp == self._stamp:
+                return False
+            previous = self._config
+            self._stamp = stamp
+            config = self._parse() if stamp is not None else Config()
+            if config is None:
+                if previous is not None:
+                    return False
+                config = Config()
+            self._config = config
+            changed = previous is not None and config != previous
+            listeners = list(self._listeners) if changed else []
+
+        for listener in listeners:
+            try:
+                listener(previous, config)
+            except Exception as e:
+                logger.error(f"-- Failed to apply the configuration change: {e} --")
+        return changed
+
+    def subscribe(self, listener: ConfigListener) -> None:
+        """Call `listener` with the previous and the new configuration whenever the file changes."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ConfigListener) -> None:
+        """Stop calling `listener`."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _parse(self) -> Config | None:
+        """Parse and validate the file, `None` if it is not a valid configuration."""
+        try:
+            with open(self.path, "r") as f:
+                data = yaml.safe_load(f) or {}
+            config = Config.model_validate(data)
+        except (OSError, yaml.YAMLError, ValidationError) as e:
+            logger.error(f"-- Invalid configuration file {self.path}: {e} --")
+            return None
+        logger.debug(f"-- Loaded configuration from {self.path} --")
+        return config
+
+
+config_store = ConfigStore()
+"""The configuration of the process."""
+
+
+def get_config() -> Config:
+    """Get the configuration of the process."""
+    return config_store.get()
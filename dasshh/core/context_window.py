@@ -0,0 +1,209 @@
+import json
+import logging
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+def get_model_info(model: str) -> dict:
+    """`litellm.get_model_info`, litellm is imported on first use."""
+    from litellm import get_model_info
+
+    return get_model_info(model)
+
+
+def token_counter(model: str, messages: List[dict]) -> int:
+    """`litellm.token_counter`, litellm is imported on first use."""
+    from litellm import token_counter
+
+    return token_counter(model=model, messages=messages)
+
+
+class ContextWindow:
+    """
+    Fits a session history into a token budget.
+
+    The history is split into turns, where an assistant message with tool calls and the tool
+    messages answering it form a single turn. The oldest turns are dropped until the rest fits
+    the budget, so a tool call is never sent without its result. The most recent turn is always kept.
+    """
+    model: str
+    """The model used to count tokens."""
+    max_tokens: int | None
+    """The token budget for the prompt, `None` sends the full history."""
+
+    def __init__(self, model: str = "", max_tokens: int | None = None, cache_size: int = 4096):
+        self.model = model
+        self.max_tokens = max_tokens
+        self._cache_size = cache_size
+        # message id -> (message, token count), the message is kept so its id can not be reused
+        self._counts: OrderedDict[int, tuple[dict, int]] = OrderedDict()
+
+    @classmethod
+    def for_model(cls, model: str, max_tokens: int | None = None) -> "ContextWindow":
+        """
+        Create a context window for a model.
+
+        Args:
+            model: The model name.
+            max_tokens: The token budget, defaults to the model's max input tokens when known.
+        """
+        if max_tokens is None and model:
+            try:
+                max_tokens = get_model_info(model).get("max_input_tokens")
+            except Exception:
+                logger.debug(f"-- No context window size known for model {model} --")
+        return cls(model=model, max_tokens=max_tokens)
+
+    def count_tokens(self, message: dict) -> int:
+        """
+        Count the tokens of a message.
+
+        Counts are cached per message object, so the history of a session is only counted once.
+        """
+        cached = self._counts.get(id(message))
+        if cached is not None and cached[0] is message:
+            self._counts.move_to_end(id(message))
+            return cached[1]
+
+        try:
+            count = token_counter(model=self.model, messages=[message])
+        except Exception:
+            count = len(json.dumps(message, default=str)) // 4 + 4
+
+        self._counts[id(message)] = (message, count)
+        while len(self._counts) > self._cache_size:
+            self._counts.popitem(last=False)
+        return count
+
+    def history(self, messages: Iterable[dict] = ()) -> "TurnHistory":
+        """Start a history that counts its messages with this context window and trims to its budget."""
+        return TurnHistory(self.count_tokens, max_tokens=self.max_tokens, messages=messages)
+
+    def fit(self, history: List[dict], reserved: int = 0) -> List[dict]:
+        """
+        Drop the oldest turns of a history until it fits the token budget.
+
+        A history that is fitted again and again as it grows is better kept as a `TurnHistory`,
+        see `history`.
+
+        Args:
+            history: The session history, oldest message first.
+            reserved: Tokens already used by the rest of the prompt, such as the system prompt.
+
+        Returns:
+            The messages that fit, oldest message first.
+        """
+        if self.max_tokens is None:
+            return history
+        return self.history(history).fit(reserved)
+
+
+class TurnHistory:
+    """
+    A session history split into turns, with the token counts of its turns.
+
+    The turns and their counts are kept up to date as messages are appended, so fitting the
+    history to the budget does not split or count it again. Turns that are too old to ever fit
+    the budget again are dropped, so the history stays about the size of the budget however
+    long the session gets.
+    """
+    max_tokens: int | None
+    """The token budget, `None` keeps and sends every message."""
+
+    def __init__(
+        self,
+        count_tokens: Callable[[dict], int],
+        max_tokens: int | None = None,
+        messages: Iterable[dict] = (),
+    ):
+        self.max_tokens = max_tokens
+        self._count_tokens = count_tokens
+        self._messages: List[dict] = []
+        # the index of the first message of each turn
+        self._starts: List[int] = []
+        # the tokens of the turns before each turn, and of all turns at the end
+        self._totals: List[int] = [0]
+        # the turns starting with a user message, in order
+        self._user_turns: List[int] = []
+        self._dropped = 0
+        for message in messages:
+            self._add(message)
+        self._trim()
+
+    @property
+    def messages(self) -> List[dict]:
+        """The messages kept, oldest first, callers must not modify them."""
+        return self._messages
+
+    @property
+    def tokens(self) -> int:
+        """The tokens of the messages kept."""
+        return self._totals[-1]
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def append(self, message: dict) -> None:
+        """Append a message, a tool message belongs to the turn before it."""
+        self._add(message)
+        self._trim()
+
+    def fit(self, reserved: int = 0) -> List[dict]:
+        """
+        Get the newest turns that fit the token budget, see `ContextWindow.fit`.
+
+        Args:
+            reserved: Tokens already used by the rest of the prompt, such as the system prompt.
+
+        Returns:
+            The messages that fit, oldest message first.
+        """
+        turns = len(self._starts)
+        if self.max_tokens is None or not turns:
+            return self._messages
+
+        # the first turn from which the rest fits, the most recent turn is always kept
+        first = self._first_fitting(self.max_tokens - reserved)
+        # providers expect the conversation to start with a user message
+        user_turn = bisect_left(self._user_turns, first)
+        if user_turn < len(self._user_turns):
+            first = self._user_turns[user_turn]
+
+        dropped = self._dropped + first
+        if dropped:
+            logger.debug(f"-- Dropped {dropped} of {self._dropped + turns} turns to fit the context window --")
+        return self._messages[self._starts[first]:]
+
+    def _add(self, message: dict) -> None:
+        """Add a message to the turns and their counts."""
+        cost = self._count_tokens(message)
+        if message.get("role") == "tool" and self._starts:
+            self._totals[-1] += cost
+        else:
+            if message.get("role") == "user":
+                self._user_turns.append(len(self._starts))
+            self._starts.append(len(self._messages))
+            self._totals.append(self._totals[-1] + cost)
+        self._messages.append(message)
+
+    def _first_fitting(self, budget: int) -> int:
+        """The oldest turn from which the turns fit `budget`, the most recent turn when none do."""
+        return bisect_left(self._totals, self._totals[-1] - budget, 0, len(self._starts) - 1)
+
+    def _trim(self) -> None:
+        """Drop the turns that can no longer fit the budget, once they are half of the history."""
+        if self.max_tokens is None or not self._starts:
+            return
+        # appending only makes the newer turns larger, so these never fit again
+        first = self._first_fitting(self.max_tokens)
+        if not first or first * 2 < len(self._starts):
+            return
+        start, base = self._starts[first], self._totals[first]
+        self._messages = self._messages[start:]
+        self._starts = [index - start for index in self._starts[first:]]
+        self._totals = [total - base for total in self._totals[first:]]
+        self._user_turns = [turn - first for turn in self._user_turns[bisect_left(self._user_turns, first):]]
+        self._dropped += first
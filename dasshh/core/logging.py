@@ -1,26 +1,105 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-import litellm
 
 DEFAULT_LOG_DIR = Path.home() / ".dasshh" / "logs"
 DEFAULT_LOG_FILE = DEFAULT_LOG_DIR / "dasshh.log"
 
 DEFAULT_LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+LITELLM_LOGGER = "LiteLLM"
+"""The name of litellm's `verbose_logger`, looked up by name so litellm is not imported at startup."""
+LITELLM_LOGGERS = (LITELLM_LOGGER, "LiteLLM Router", "LiteLLM Proxy")
+"""The loggers litellm attaches its own console handler to when it is imported."""
 
-def setup_logging(log_file=None, log_level=logging.INFO):
-    log_file = log_file or DEFAULT_LOG_FILE
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+_listener: QueueListener | None = None
+"""Writes the queued records to the log file, while logging is set up."""
 
-    litellm_logger = litellm.verbose_logger
-    root_logger = logging.getLogger()
 
-    for handler in root_logger.handlers[:] + litellm_logger.handlers[:]:
-        litellm_logger.removeHandler(handler)
-        root_logger.removeHandler(handler)
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single line of JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the records of chosen loggers.
+
+    Rates apply to a logger and its children, the most specific one wins. Records are kept at
+    even intervals rather than at random, a rate of 0.1 keeps every tenth record. Warnings and
+    errors are always kept.
+    """
+    rates: dict[str, float]
+    """The fraction of the records below WARNING kept, by logger name."""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self._credit = {name: 0.0 for name in self.rates}
+        self._matches: dict[str, str | None] = {}
+        """The sampled logger each logger name falls under."""
+        self._lock = threading.Lock()
+
+    def _match(self, name: str) -> str | None:
+        match = self._matches.get(name, "")
+        if match == "":
+            candidates = [key for key in self.rates if name == key or name.startswith(f"{key}.")]
+            match = max(candidates, key=len) if candidates else None
+            self._matches[name] = match
+        return match
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        name = self._match(record.name)
+        if name is None:
+            return True
+        with self._lock:
+            credit = self._credit[name] + self.rates[name]
+            keep = credit >= 1
+            self._credit[name] = credit - 1 if keep else credit
+        return keep
+
+
+def setup_logging(log_file=None, log_level=logging.INFO, json_format=False, sample_rates=None):
+    """
+    Send the logs of Dasshh and litellm to a rotating log file.
+
+    A record is put on a queue by the thread that logs it and written by a background thread,
+    so logging never waits on file I/O or rotation.
+
+    Args:
+        log_file: The log file, defaults to ~/.dasshh/logs/dasshh.log.
+        log_level: The lowest level logged.
+        json_format: Write one JSON object per line instead of plain text.
+        sample_rates: The fraction of the records below WARNING kept, by logger name.
+    """
+    global _listener
+    stop_logging()
+
+    log_file = log_file or DEFAULT_LOG_FILE
+    if json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
 
     file_handler = RotatingFileHandler(
         log_file,
@@ -29,12 +108,56 @@ def setup_logging(log_file=None, log_level=logging.INFO):
         encoding="utf-8"
     )
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
     root_logger.setLevel(log_level)
-    litellm_logger.addHandler(file_handler)
-    litellm_logger.setLevel(log_level)
+
+    _listener = QueueListener(log_queue, file_handler)
+    _listener.start()
+    route_litellm_logs()
     logging.info(f"-- Dasshh logging initialized. Log file: {log_file} --")
 
 
+def route_litellm_logs() -> None:
+    """
+    Send litellm's logs to the log file instead of the console.
+
+    litellm adds a console handler to its loggers when it is imported, call this once it is.
+    Does nothing unless logging is set up.
+    """
+    if _listener is None:
+        return
+    level = logging.getLogger().level
+    for name in LITELLM_LOGGERS:
+        litellm_logger = logging.getLogger(name)
+        for handler in litellm_logger.handlers[:]:
+            litellm_logger.removeHandler(handler)
+        litellm_logger.setLevel(level)
+        # the root logger's queue handler writes them
+        litellm_logger.propagate = True
+
+
+def stop_logging() -> None:
+    """Write the queued records and close the log file."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name):
     return logging.getLogger(name)
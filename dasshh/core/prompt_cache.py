@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from typing import Callable
+
+from dasshh.core.context_window import TurnHistory
+
+
+class PromptCache:
+    """
+    An in-memory, least-recently-used cache of session histories in prompt format.
+
+    The runtime appends every event it saves, so a cached history is kept up to date without
+    reading the session back from the database. A session is only loaded from the database
+    when it is not in the cache. Histories are kept as `TurnHistory`, which keeps their turns
+    and token counts as messages are appended and drops what no longer fits the budget.
+    """
+    max_sessions: int
+    """The maximum number of sessions kept in the cache."""
+
+    def __init__(self, max_sessions: int = 32):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, TurnHistory] = OrderedDict()
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str, loader: Callable[[], TurnHistory]) -> TurnHistory:
+        """
+        Get the history of a session.
+
+        Args:
+            session_id: The session id.
+            loader: Called to load the history from the database when the session is not cached.
+
+        Returns:
+            The cached history, callers must not modify it.
+        """
+        history = self._sessions.get(session_id)
+        if history is None:
+            history = loader()
+            self._sessions[session_id] = history
+            self._evict()
+        else:
+            self._sessions.move_to_end(session_id)
+        return history
+
+    def append(self, session_id: str, message: dict) -> None:
+        """
+        Append a message to a cached history.
+
+        Sessions that are not cached are left alone, they are loaded from the database on the next `get`.
+        """
+        history = self._sessions.get(session_id)
+        if history is not None:
+            history.append(message)
+
+    def invalidate(self, session_id: str | None = None) -> None:
+        """Drop one session, or every session, from the cache."""
+        if session_id is None:
+            self._sessions.clear()
+        else:
+            self._sessions.pop(session_id, None)
+
+    def _evict(self) -> None:
+        """Drop the least recently used sessions until the cache fits."""
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
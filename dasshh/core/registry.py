@@ -1,4 +1,5 @@
 from dasshh.core.tools.base import BaseTool
+from dasshh.core.tools.lazy_tool import LazyTool
 
 
 class Registry:
@@ -9,6 +10,8 @@ class Registry:
     """The singleton instance of the registry."""
     tools: dict[str, BaseTool] = {}
     """The tools in the registry."""
+    _tool_declarations: list[dict] | None = None
+    """The cached declarations of all tools, reset whenever a tool is added."""
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -18,10 +21,14 @@ class Registry:
     def add_tool(self, tool: BaseTool):
         """
         Add a tool to the registry.
+
+        A tool replaces the `LazyTool` placeholder of the same name, when its module is imported.
         """
-        if tool.name in self.tools:
+        existing = self.tools.get(tool.name)
+        if existing is not None and not isinstance(existing, LazyTool):
             raise ValueError(f"Tool name must be unique, there is already a tool named {tool.name}")
         self.tools[tool.name] = tool
+        Registry._tool_declarations = None
 
     def get_tools(self) -> list[BaseTool]:
         """
@@ -38,5 +45,10 @@ class Registry:
     def get_tool_declarations(self) -> list[dict]:
         """
         Get all registered tool declarations.
+
+        The list is built once and reused for every completion request until the registry changes,
+        callers must not modify it.
         """
-        return [tool.get_declaration() for tool in self.get_tools()]
+        if Registry._tool_declarations is None:
+            Registry._tool_declarations = [tool.get_declaration() for tool in self.get_tools()]
+        return Registry._tool_declarations
@@ -1,15 +1,20 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
 from collections import namedtuple
-from typing import Callable, AsyncGenerator, List
-
-from litellm import acompletion
-from litellm.types.utils import ModelResponse, ChatCompletionDeltaToolCall
-from litellm.types.utils import Message
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, AsyncGenerator, List
 
+from dasshh.core.config import Config, get_config
+from dasshh.core.context_window import ContextWindow
+from dasshh.core.logging import route_litellm_logs
+from dasshh.core.prompt_cache import PromptCache
 from dasshh.core.registry import Registry
+from dasshh.core.scheduler import SessionScheduler
+from dasshh.core.streaming import DeltaBuffer
+from dasshh.core.tools.executor import ToolExecutor
 from dasshh.data.session import SessionService
 from dasshh.ui.events import (
     AssistantResponseStart,
@@ -20,11 +25,20 @@ from dasshh.ui.events import (
     AssistantToolCallComplete,
     AssistantToolCallError,
 )
-from dasshh.ui.utils import get_from_config
+
+if TYPE_CHECKING:
+    from litellm.types.utils import ModelResponse, ChatCompletionDeltaToolCall
 
 logger = logging.getLogger(__name__)
 
 
+async def acompletion(**kwargs):
+    """`litellm.acompletion`, litellm is imported on first use."""
+    from litellm import acompletion
+
+    return await acompletion(**kwargs)
+
+
 InvocationContext = namedtuple(
     "InvocationContext",
     [
@@ -60,12 +74,24 @@ class DasshhRuntime:
     """The max_completion_tokens to use for the runtime."""
 
     # -- Dasshh settings --
-    _queue: asyncio.Queue
-    """The queue of queries to be processed."""
-    _worker: asyncio.Task
-    """The worker task for the runtime."""
+    _scheduler: SessionScheduler
+    """The scheduler that queues queries and runs them per session."""
     _session_service: SessionService
     """The database service for the runtime."""
+    _tool_executor: ToolExecutor
+    """The executor that runs tool calls off the event loop."""
+    _prompt_cache: PromptCache
+    """The cache of session histories used to build prompts."""
+    _context_window: ContextWindow
+    """Fits session histories into the token budget of the model."""
+    history_page_size: int = 200
+    """The number of events read at a time when a session history is loaded."""
+    _warm_up_task: asyncio.Task | None = None
+    """Loads litellm and the model info in the background, see `start`."""
+    _pending_queries: dict[str, int]
+    """The number of queued and running queries of each unfinished invocation."""
+    _completions: dict[str, asyncio.Future]
+    """Resolved once every query of an invocation is processed, see `wait_for_invocation`."""
     _post_message_callbacks: dict[str, Callable] = {}
     """The current textual component post_message callback for sending Agent events."""
     _system_prompt: str = """
@@ -79,38 +105,97 @@ class DasshhRuntime:
     """The default error response for the runtime."""
     skip_summarization: bool = False
     """Whether to skip summarization after a tool call."""
-
-    def __init__(self, session_service: SessionService):
+    tool_workers: int = 4
+    """The maximum number of threads used to run synchronous tools."""
+    max_parallel_tool_calls: int = 4
+    """The maximum number of tool calls from a single turn that run at the same time."""
+    max_parallel_sessions: int = 4
+    """The maximum number of sessions whose queries are processed at the same time."""
+    prompt_cache_size: int = 32
+    """The maximum number of session histories kept in memory."""
+    context_window_tokens: int | None = None
+    """The token budget for prompts, defaults to the model's max input tokens."""
+    stream_flush_interval_ms: int = 33
+    """The time window in milliseconds over which streamed deltas are batched before they are posted to the UI."""
+    stream_flush_chars: int = 256
+    """The number of batched characters that triggers posting streamed deltas to the UI right away."""
+
+    def __init__(self, session_service: SessionService, config: Config | None = None):
+        """
+        Args:
+            session_service: The database service.
+            config: The configuration, defaults to the configuration file.
+        """
         self._session_service = session_service
-        self._worker = None
-        self._queue = asyncio.Queue()
-
-        _skip_summarization = get_from_config("dasshh.skip_summarization")
-        if _skip_summarization:
-            self.skip_summarization = True
-
-        _system_prompt = get_from_config("dasshh.system_prompt")
-        if _system_prompt:
-            self._system_prompt = _system_prompt
-
-        self._load_model_config()
+        self._load_config(config or get_config())
+        self._pending_queries = {}
+        self._completions = {}
+
+        self._tool_executor = ToolExecutor(max_workers=self.tool_workers)
+        self._scheduler = SessionScheduler(
+            self._process_query,
+            max_parallel_sessions=self.max_parallel_sessions,
+        )
+        self._prompt_cache = PromptCache(max_sessions=self.prompt_cache_size)
+        # the model's context window size is looked up once litellm is loaded, see `_load_litellm`
+        self._context_window = ContextWindow(model=self.model, max_tokens=self.context_window_tokens)
+
+    def _load_config(self, config: Config) -> None:
+        """Read the settings from the configuration."""
+        model_config = config.model
+        if model_config is not None and not model_config.api_key:
+            raise ValueError("API key is not set")
 
-    def _load_model_config(self) -> None:
-        """Load model configuration."""
-        _model_config = get_from_config("model")
-        if not _model_config:
+        settings = config.dasshh
+        self.skip_summarization = settings.skip_summarization
+        self._system_prompt = settings.system_prompt or DasshhRuntime._system_prompt
+        self.tool_workers = settings.tool_workers
+        self.max_parallel_tool_calls = settings.max_parallel_tool_calls
+        self.max_parallel_sessions = settings.max_parallel_sessions
+        self.prompt_cache_size = settings.prompt_cache_size
+        self.context_window_tokens = settings.context_window_tokens
+        self.stream_flush_interval_ms = settings.stream_flush_interval_ms
+        self.stream_flush_chars = settings.stream_flush_chars
+
+        if model_config is None:
             return
-        self.model = _model_config.get("name", "")
-        self.api_base = _model_config.get("api_base", "")
-        self.api_key = _model_config.get("api_key", "")
-        if not self.api_key:
-            raise ValueError("API key is not set")
+        self.model = model_config.name
+        self.api_base = model_config.api_base
+        self.api_key = model_config.api_key
+        self.api_version = model_config.api_version
+        self.temperature = model_config.temperature
+        self.top_p = model_config.top_p
+        self.max_tokens = model_config.max_tokens
+        self.max_completion_tokens = model_config.max_completion_tokens
+
+    def apply_config(self, config: Config) -> None:
+        """
+        Apply a changed configuration to the running runtime.
+
+        Model and tool settings are used from the next query on, queries in progress finish with
+        the settings they started with. `max_parallel_sessions` and `prompt_cache_size` take effect
+        after a restart.
 
-        self.api_version = _model_config.get("api_version", "")
-        self.temperature = _model_config.get("temperature", 1.0)
-        self.top_p = _model_config.get("top_p", 1.0)
-        self.max_tokens = _model_config.get("max_tokens", None)
-        self.max_completion_tokens = _model_config.get("max_completion_tokens", None)
+        Raises:
+            ValueError: If the configuration has a model without an API key, nothing is changed.
+        """
+        model, context_window_tokens = self.model, self.context_window_tokens
+        max_parallel_sessions, prompt_cache_size = self.max_parallel_sessions, self.prompt_cache_size
+        self._load_config(config)
+
+        self._tool_executor.resize(self.tool_workers)
+        if (self.model, self.context_window_tokens) != (model, context_window_tokens):
+            # the model info comes from litellm, until it is loaded `_load_litellm` looks it up
+            if self.ready:
+                self._context_window = ContextWindow.for_model(self.model, max_tokens=self.context_window_tokens)
+            else:
+                self._context_window = ContextWindow(model=self.model, max_tokens=self.context_window_tokens)
+            # the cached histories were loaded for the previous token budget
+            self._prompt_cache.invalidate()
+        if (self.max_parallel_sessions, self.prompt_cache_size) != (max_parallel_sessions, prompt_cache_size):
+            logger.info("-- max_parallel_sessions and prompt_cache_size take effect after a restart --")
+            self.max_parallel_sessions, self.prompt_cache_size = max_parallel_sessions, prompt_cache_size
+        logger.info(f"-- Applied the configuration, model {self.model} --")
 
     @property
     def system_prompt(self) -> dict:
@@ -121,26 +206,140 @@ class DasshhRuntime:
 
     def _generate_prompt(self, context: InvocationContext) -> List[dict]:
         """Adds system prompt and session history to the message."""
-        prompt = [self.system_prompt]
-        for event in self._session_service.get_events(session_id=context.session_id):
-            prompt.append(event.content)  # current message is included in history already
-        return prompt
+        system_prompt = self.system_prompt
+        history = self._prompt_cache.get(
+            context.session_id,
+            lambda: self._context_window.history(self._load_history(context.session_id)),
+        )
+        history = history.fit(reserved=self._context_window.count_tokens(system_prompt))
+        return [system_prompt, *history]  # current message is included in history already
+
+    def _load_history(self, session_id: str) -> List[dict]:
+        """
+        Load the recent history of a session from the database.
+
+        Pages of events are read from the newest back until they hold more tokens than the
+        context window, so a long session costs about as much to load as the part of it that
+        is sent to the model. The whole session is read when the context window has no budget.
+        """
+        logger.debug(f"-- Loading history of session {session_id} --")
+        max_tokens = self._context_window.max_tokens
+        if max_tokens is None:
+            return [
+                self._session_service.load_content(event.content)
+                for event in self._session_service.get_events(session_id=session_id)
+            ]
+
+        history: List[dict] = []
+        tokens = 0
+        before_seq = None
+        while tokens <= max_tokens:
+            page = self._session_service.get_events(
+                session_id=session_id,
+                after_seq=before_seq,
+                limit=self.history_page_size,
+                reverse=True,
+            )
+            for event in page:
+                message = self._session_service.load_content(event.content)
+                tokens += self._context_window.count_tokens(message)
+                history.append(message)
+            if len(page) < self.history_page_size:
+                break
+            before_seq = page[-1].seq
+        # a turn cut off at the start of the page is dropped by `ContextWindow.fit`
+        history.reverse()
+        return history
+
+    def _add_event(self, context: InvocationContext, content: dict) -> None:
+        """Save an event to the session and keep the prompt cache in sync."""
+        future = self._session_service.add_event(
+            invocation_id=context.invocation_id,
+            content=content,
+            session_id=context.session_id,
+        )
+        future.add_done_callback(lambda f: self._check_event_saved(context, f))
+        self._prompt_cache.append(context.session_id, content)
+
+    @staticmethod
+    def _check_event_saved(context: InvocationContext, future: Future) -> None:
+        """Log an event that could not be saved, called on the writer thread once the write is done."""
+        if future.cancelled() or future.exception() is None:
+            return
+        logger.error(
+            f"-- Failed to save an event of session {context.session_id}, "
+            f"invocation {context.invocation_id}: {future.exception()} --"
+        )
 
     async def start(self):
-        """Start the runtime."""
+        """
+        Start the runtime.
+
+        litellm takes about a second to import, so it is loaded on a background thread and the
+        UI can be shown right away. Queries submitted in the meantime wait in the scheduler.
+        """
         logger.info("-- Starting Dasshh runtime --")
-        self._worker = asyncio.create_task(self._process_queue())
+        self._warm_up_task = asyncio.create_task(self._load_litellm())
+        self._scheduler.start()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the runtime is started and done loading litellm."""
+        return self._warm_up_task is not None and self._warm_up_task.done()
+
+    async def wait_until_ready(self) -> None:
+        """Wait until litellm is loaded, raises the error if it could not be loaded."""
+        if self._warm_up_task is not None:
+            await asyncio.shield(self._warm_up_task)
 
     async def stop(self):
         """Stop the runtime."""
-        if self._worker:
+        if self._scheduler.running:
             logger.info("-- Stopping Dasshh runtime --")
-            self._worker.cancel()
+            await self._scheduler.stop()
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            # the import can not be interrupted, wait for it so its thread does not outlive the runtime
+            await asyncio.wait([self._warm_up_task])
+        for completion in self._completions.values():
+            completion.cancel()
+        self._completions.clear()
+        self._pending_queries.clear()
+        self._tool_executor.shutdown()
+
+    async def _load_litellm(self) -> None:
+        """Run `_warm_up` on a background thread, and use the context window it built."""
+        model, context_window_tokens = self.model, self.context_window_tokens
+        context_window = await asyncio.to_thread(self._warm_up, model, self.api_base, context_window_tokens)
+        # set on the event loop, `apply_config` may have changed the model in the meantime
+        if (self.model, self.context_window_tokens) != (model, context_window_tokens):
+            context_window = ContextWindow.for_model(self.model, max_tokens=self.context_window_tokens)
+        if context_window is not None:
+            self._context_window = context_window
+            # the cached histories were trimmed to the previous token budget
+            self._prompt_cache.invalidate()
+
+    def _warm_up(self, model: str, api_base: str, context_window_tokens: int | None) -> ContextWindow | None:
+        """
+        Import litellm, build the tool declarations and look up the model, called on a background thread.
+
+        Returns:
+            The context window of the model, `None` without a model.
+        """
+        start = time.perf_counter()
+        import litellm
+
+        route_litellm_logs()
+
+        Registry().get_tool_declarations()
+        context_window = None
+        if model:
+            context_window = ContextWindow.for_model(model, max_tokens=context_window_tokens)
             try:
-                await self._worker
-            except asyncio.CancelledError:
-                pass
-            self._worker = None
+                litellm.get_llm_provider(model, api_base=api_base or None)
+            except Exception as e:
+                logger.warning(f"-- No provider found for model {model}, {str(e)} --")
+        logger.info(f"-- Loaded litellm in {time.perf_counter() - start:.2f}s --")
+        return context_window
 
     async def submit_query(
         self,
@@ -148,7 +347,7 @@ class DasshhRuntime:
         message: str,
         session_id: str,
         post_message_callback: Callable,
-    ) -> None:
+    ) -> str:
         """
         Submit a query to the runtime.
 
@@ -156,12 +355,16 @@ class DasshhRuntime:
             message: The message to send to the runtime.
             session_id: The session id to send the message to.
             post_message_callback: The callback to post messages to the UI.
+
+        Returns:
+            The invocation id of the query, see `wait_for_invocation`.
         """
         invocation_id = str(uuid.uuid4())
         logger.info(f"-- Submitting query {invocation_id} --")
 
         self._post_message_callbacks[invocation_id] = post_message_callback
-        await self._queue.put(
+        self._completions[invocation_id] = asyncio.get_running_loop().create_future()
+        await self._enqueue(
             InvocationContext(
                 invocation_id=invocation_id,
                 message={
@@ -172,43 +375,98 @@ class DasshhRuntime:
                 system_instruction=False,
             )
         )
+        return invocation_id
 
-    async def _process_queue(self):
-        """Process the query queue."""
-        while True:
-            try:
-                context: InvocationContext = await self._queue.get()
-                logger.info(f"-- Processing query {context.invocation_id} --")
-
-                if not context.system_instruction:
-                    self._before_query(context)
-                final_response = ""
-                async for response in self._run_async(context):
-                    delta = response.choices[0].delta
-                    if not delta.content and delta.tool_calls:
-                        await self._handle_tool_calls(context, delta.tool_calls)
-                        break
-                    if not delta.content:
-                        continue
-
-                    final_response += delta.content
-                    self._during_query(context, delta.content)
-
-                if final_response:
-                    self._after_query(context, final_response)
-            except Exception as e:
-                logger.error(
-                    f"-- Error processing query {context.invocation_id}, {str(e)} --",
-                    exc_info=True,
-                )
-                self._after_query(context, self._default_error_response)
-                self._on_query_error(context, e)
-                continue
-            except asyncio.CancelledError:
-                logger.info("-- query processing cancelled --")
-                break
+    async def wait_for_invocation(self, invocation_id: str) -> None:
+        """
+        Wait until an invocation is done.
+
+        An invocation is done once its query, the tool calls the model asked for and the
+        summaries of their results are all processed.
+        """
+        completion = self._completions.get(invocation_id)
+        if completion is not None:
+            await asyncio.shield(completion)
+
+    async def cancel_invocation(self, invocation_id: str) -> None:
+        """
+        Stop an invocation that is not done yet.
 
-    async def _run_async(self, context: InvocationContext) -> AsyncGenerator[ModelResponse, None]:
+        Its queued queries are dropped and the one being processed is cancelled, its callback
+        gets no more messages. A tool call already running on the tool workers can not be
+        interrupted, it finishes in the background and its result is dropped.
+        """
+        if invocation_id not in self._completions:
+            return
+        logger.info(f"-- Cancelling query {invocation_id} --")
+        await self._scheduler.cancel(invocation_id)
+        self._finish_invocation(invocation_id)
+
+    async def _enqueue(self, context: InvocationContext) -> None:
+        """Queue a query of an invocation."""
+        self._pending_queries[context.invocation_id] = self._pending_queries.get(context.invocation_id, 0) + 1
+        await self._scheduler.put(context)
+
+    def _query_done(self, context: InvocationContext) -> None:
+        """Count a processed query, and finish the invocation if it was its last one."""
+        pending = self._pending_queries.get(context.invocation_id, 1) - 1
+        if pending > 0:
+            self._pending_queries[context.invocation_id] = pending
+            return
+        self._finish_invocation(context.invocation_id)
+
+    def _finish_invocation(self, invocation_id: str) -> None:
+        """Drop the callback of an invocation and wake up the ones waiting for it."""
+        self._pending_queries.pop(invocation_id, None)
+        self._post_message_callbacks.pop(invocation_id, None)
+        completion = self._completions.pop(invocation_id, None)
+        if completion is not None and not completion.done():
+            completion.set_result(None)
+
+    async def _process_query(self, context: InvocationContext, queue_wait: float) -> None:
+        """Process a single query, called by the scheduler in session order."""
+        logger.info(f"-- Processing query {context.invocation_id}, queued for {queue_wait * 1000:.1f}ms --")
+        buffer = DeltaBuffer(
+            lambda content: self._during_query(context, content),
+            interval=self.stream_flush_interval_ms / 1000,
+            max_chars=self.stream_flush_chars,
+        )
+        try:
+            if not context.system_instruction:
+                self._before_query(context)
+            await self.wait_until_ready()
+            final_response = ""
+            async for response in self._run_async(context):
+                delta = response.choices[0].delta
+                if not delta.content and delta.tool_calls:
+                    buffer.flush()
+                    await self._handle_tool_calls(context, delta.tool_calls)
+                    break
+                if not delta.content:
+                    continue
+
+                final_response += delta.content
+                buffer.add(delta.content)
+
+            buffer.flush()
+            if final_response:
+                self._after_query(context, final_response)
+        except asyncio.CancelledError:
+            buffer.close()
+            raise
+        except Exception as e:
+            buffer.close()
+            logger.error(
+                f"-- Error processing query {context.invocation_id}, {str(e)} --",
+                exc_info=True,
+            )
+            # the error first, completing the query drops the callback
+            self._on_query_error(context, e)
+            self._after_query(context, self._default_error_response)
+        finally:
+            self._query_done(context)
+
+    async def _run_async(self, context: InvocationContext) -> AsyncGenerator["ModelResponse", None]:
         """Run a completion query."""
         response = await acompletion(
             model=self.model,
@@ -232,30 +490,61 @@ class DasshhRuntime:
     async def _handle_tool_calls(
         self,
         context: InvocationContext,
-        tool_calls: list[ChatCompletionDeltaToolCall],
+        tool_calls: list["ChatCompletionDeltaToolCall"],
     ) -> None:
-        """Handle tool calls."""
-        self._session_service.add_event(
-            invocation_id=context.invocation_id,
-            content=Message(
+        """Handle tool calls.
+
+        Tool calls from the same turn run concurrently, up to `max_parallel_tool_calls` at a time.
+        Results are recorded in the order the model requested them, so the session history stays valid.
+        """
+        from litellm.types.utils import Message
+
+        self._add_event(
+            context,
+            Message(
                 role="assistant",
                 tool_calls=[
                     tool_call.model_dump(exclude_unset=True, exclude_none=True)
                     for tool_call in tool_calls
                 ],
             ).model_dump(exclude_unset=True, exclude_none=True),
-            session_id=context.session_id,
         )
-        for tool_call in tool_calls:
-            tool_call_id = tool_call.id
-            tool_name = tool_call.function.name
-            args = tool_call.function.arguments
+        semaphore = asyncio.Semaphore(self.max_parallel_tool_calls)
+        results = await asyncio.gather(
+            *(self._run_tool_call(context, tool_call, semaphore) for tool_call in tool_calls)
+        )
+        for tool_call, result in zip(tool_calls, results):
+            await self._record_tool_result(context, tool_call.id, tool_call.function.name, result)
+
+    async def _run_tool_call(
+        self,
+        context: InvocationContext,
+        tool_call: "ChatCompletionDeltaToolCall",
+        semaphore: asyncio.Semaphore,
+    ) -> str:
+        """Run a single tool call and return its result as a JSON string.
+
+        Errors are reported to the UI and returned as the tool result, so that every tool call
+        in the turn gets a matching tool message.
+        """
+        tool_call_id = tool_call.id
+        tool_name = tool_call.function.name
+        args = tool_call.function.arguments
+        async with semaphore:
             self._before_tool_call(context, tool_call_id, tool_name, args)
-            tool = Registry().get_tool(tool_name)
-            if not tool:
-                raise ValueError(f"Tool {tool_name} not found")
-            result = tool(**json.loads(args))
-            await self._after_tool_call(context, tool_call_id, tool_name, result)
+            try:
+                tool = Registry().get_tool(tool_name)
+                if not tool:
+                    raise ValueError(f"Tool {tool_name} not found")
+                result = await self._tool_executor.run(tool, **json.loads(args or "{}"))
+            except Exception as e:
+                logger.error(f"-- Tool call {tool_call_id} ({tool_name}) failed, {str(e)} --", exc_info=True)
+                self._on_tool_call_error(context, tool_call_id, tool_name, str(e))
+                return json.dumps({"error": str(e)}, indent=2)
+
+        result_json = json.dumps(result, indent=2)
+        self._after_tool_call(context, tool_call_id, tool_name, result_json)
+        return result_json
 
     def __get_post_message_callback(self, context: InvocationContext) -> Callable:
         """Get the post_message_callback for the query."""
@@ -273,11 +562,7 @@ class DasshhRuntime:
         if not post_message_callback:
             return
         post_message_callback(AssistantResponseStart(invocation_id=context.invocation_id))
-        self._session_service.add_event(
-            invocation_id=context.invocation_id,
-            content=context.message,
-            session_id=context.session_id,
-        )
+        self._add_event(context, context.message)
 
     def _during_query(self, context: InvocationContext, content: str) -> None:
         """Callback during the query is run."""
@@ -302,13 +587,12 @@ class DasshhRuntime:
                 content=content
             )
         )
-        self._session_service.add_event(
-            invocation_id=context.invocation_id,
-            content={
+        self._add_event(
+            context,
+            {
                 "role": "assistant",
                 "content": content,
             },
-            session_id=context.session_id,
         )
         self._post_message_callbacks.pop(context.invocation_id, None)
 
@@ -338,39 +622,48 @@ class DasshhRuntime:
             )
         )
 
-    async def _after_tool_call(
+    def _after_tool_call(
         self,
         context: InvocationContext,
         tool_call_id: str,
         tool_name: str,
-        result: dict,
+        result: str,
     ) -> None:
         """Callback after a tool call is run."""
         post_message_callback = self.__get_post_message_callback(context)
         if not post_message_callback:
             return
-        result_json = json.dumps(result, indent=2)
         post_message_callback(
             AssistantToolCallComplete(
                 invocation_id=context.invocation_id,
                 tool_call_id=tool_call_id,
                 tool_name=tool_name,
-                result=result_json,
+                result=result,
             )
         )
-        self._session_service.add_event(
-            invocation_id=context.invocation_id,
-            content={
+
+    async def _record_tool_result(
+        self,
+        context: InvocationContext,
+        tool_call_id: str,
+        tool_name: str,
+        result_json: str,
+    ) -> None:
+        """Save a tool call result to the session and queue its summarization."""
+        if not self.__get_post_message_callback(context):
+            return
+        self._add_event(
+            context,
+            {
                 "role": "tool",
                 "tool_call_id": tool_call_id,
                 "name": tool_name,
                 "content": result_json,
             },
-            session_id=context.session_id,
         )
 
         if not self.skip_summarization:
-            await self._queue.put(
+            await self._enqueue(
                 InvocationContext(
                     invocation_id=context.invocation_id,
                     message={
@@ -389,7 +682,7 @@ class DasshhRuntime:
         tool_name: str,
         error: str,
     ) -> None:
-        """Callback after a tool call is run."""
+        """Callback when error during a tool call."""
         post_message_callback = self.__get_post_message_callback(context)
         if not post_message_callback:
             return
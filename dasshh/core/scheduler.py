@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class SessionScheduler:
+    """
+    Schedules invocations for the runtime.
+
+    Invocations of the same session are processed strictly in the order they were submitted,
+    while different sessions are processed in parallel, up to `max_parallel_sessions` at a time.
+    Each session gets its own worker task, which exits once the session has nothing left to do.
+    """
+    max_parallel_sessions: int
+    """The maximum number of sessions processed at the same time."""
+
+    def __init__(
+        self,
+        handler: Callable[[Any, float], Awaitable[None]],
+        max_parallel_sessions: int = 4,
+    ):
+        """
+        Args:
+            handler: Coroutine called with an invocation and the time (in seconds) it waited in the queue.
+            max_parallel_sessions: The maximum number of sessions processed at the same time.
+        """
+        if max_parallel_sessions < 1:
+            raise ValueError("max_parallel_sessions must be at least 1")
+        self.max_parallel_sessions = max_parallel_sessions
+        self._handler = handler
+        self._semaphore = asyncio.Semaphore(max_parallel_sessions)
+        self._queues: dict[str, deque] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        # session id -> the invocation id and handler task being processed
+        self._current: dict[str, tuple[str, asyncio.Task]] = {}
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler is processing invocations."""
+        return self._running
+
+    def pending(self, session_id: str | None = None) -> int:
+        """Get the number of queued invocations, for one session or for all of them."""
+        if session_id is not None:
+            return len(self._queues.get(session_id, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self) -> None:
+        """Start processing invocations, including the ones queued before starting."""
+        self._running = True
+        for session_id in list(self._queues):
+            self._ensure_worker(session_id)
+
+    async def stop(self) -> None:
+        """Stop all session workers and drop the queued invocations."""
+        self._running = False
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    async def put(self, context: Any) -> None:
+        """
+        Queue an invocation.
+
+        Args:
+            context: The invocation, it must have `session_id` and `invocation_id` attributes.
+        """
+        queue = self._queues.setdefault(context.session_id, deque())
+        queue.append((context, time.monotonic()))
+        if self._running:
+            self._ensure_worker(context.session_id)
+
+    async def cancel(self, invocation_id: str) -> int:
+        """
+        Drop the queued contexts of an invocation, and cancel the one being processed.
+
+        Returns when the cancelled handler has finished, so its parallel session slot is free again.
+
+        Returns:
+            The number of queued contexts dropped.
+        """
+        dropped = 0
+        for queue in self._queues.values():
+            kept = [item for item in queue if item[0].invocation_id != invocation_id]
+            if len(kept) != len(queue):
+                dropped += len(queue) - len(kept)
+                # the worker holds on to the deque, update it in place
+                queue.clear()
+                queue.extend(kept)
+        running = [task for current_id, task in self._current.values() if current_id == invocation_id]
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.wait(running)
+        return dropped
+
+    def _ensure_worker(self, session_id: str) -> None:
+        """Start a worker for the session, unless one is already running."""
+        if session_id in self._workers:
+            return
+        self._workers[session_id] = asyncio.create_task(
+            self._work(session_id),
+            name=f"dasshh-session-{session_id}",
+        )
+
+    async def _work(self, session_id: str) -> None:
+        """Process the invocations of one session in order."""
+        queue = self._queues[session_id]
+        try:
+            while queue:
+                async with self._semaphore:
+                    if not queue:
+                        # cancelled while waiting for a slot
+                        break
+                    context, enqueued_at = queue.popleft()
+                    # a task of its own, so `cancel` can stop one invocation without the worker
+                    task = asyncio.create_task(self._handler(context, time.monotonic() - enqueued_at))
+                    self._current[session_id] = (context.invocation_id, task)
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        if asyncio.current_task().cancelling():
+                            raise
+                        logger.info(f"-- Cancelled query {context.invocation_id} --")
+                    except Exception as e:
+                        logger.error(
+                            f"-- Unhandled error processing query {context.invocation_id}, {str(e)} --",
+                            exc_info=True,
+                        )
+                    finally:
+                        self._current.pop(session_id, None)
+        finally:
+            # no await between the last empty check and here, so a put() can not slip in unnoticed
+            if not queue:
+                self._queues.pop(session_id, None)
+            if self._workers.get(session_id) is asyncio.current_task():
+                self._workers.pop(session_id, None)
@@ -0,0 +1,132 @@
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List
+
+import psutil
+
+
+@dataclass(slots=True)
+class ImportTiming:
+    """The time spent importing a module."""
+    name: str
+    self_time: float
+    """Seconds spent in the module itself."""
+    cumulative: float
+    """Seconds spent in the module and the modules it imported."""
+    thread: str
+    """The thread that imported the module."""
+
+
+class _TimingFinder:
+    """A meta path finder that times the modules other finders load."""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        loader = spec.loader
+        # builtin and frozen modules are loaded by classes shared between modules, they are cheap anyway
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            with self._profiler.time_import(fullname):
+                exec_module(module)
+
+        loader.exec_module = timed_exec_module
+        return spec
+
+
+class StartupProfiler:
+    """
+    Times the imports and phases of startup, for `dasshh --profile-startup`.
+
+    Imports are timed by a meta path finder, on every thread, from `install` until `uninstall`.
+    Phases are marked by the caller.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._process_age = time.time() - psutil.Process().create_time()
+        """Seconds between the process start and the profiler start."""
+        self._finder = _TimingFinder(self)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.imports: List[ImportTiming] = []
+        self.phases: List[tuple[str, float]] = []
+
+    def install(self) -> None:
+        """Start timing imports."""
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        """Stop timing imports."""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def mark(self, phase: str) -> None:
+        """Record that a phase of startup is done."""
+        self.phases.append((phase, time.perf_counter() - self._start))
+
+    @contextmanager
+    def time_import(self, name: str) -> Iterator[None]:
+        """Time the import of a module, the time of nested imports is subtracted from its own."""
+        stack = self._local.__dict__.setdefault("stack", [])
+        frame = [0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cumulative = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += cumulative
+            with self._lock:
+                self.imports.append(
+                    ImportTiming(name, cumulative - frame[0], cumulative, threading.current_thread().name)
+                )
+
+    def report(self, top: int = 10) -> str:
+        """Format the phases, the import time of each package and the slowest imports."""
+        lines = ["Startup profile", "", f"  {'process start':<32} {-self._process_age:>8.3f}s"]
+        lines.append(f"  {'command line parsed':<32} {0:>8.3f}s")
+        lines += [f"  {phase:<32} {elapsed:>8.3f}s" for phase, elapsed in self.phases]
+
+        packages: dict[str, list] = defaultdict(lambda: [0.0, 0, set()])
+        for timing in self.imports:
+            package = packages[timing.name.partition(".")[0]]
+            package[0] += timing.self_time
+            package[1] += 1
+            package[2].add(timing.thread)
+        total = sum(package[0] for package in packages.values())
+        lines += ["", f"Import time by package ({len(self.imports)} modules, {total:.3f}s)", ""]
+        for name, (self_time, count, threads) in sorted(packages.items(), key=lambda item: -item[1][0])[:top]:
+            thread = "" if threads == {"MainThread"} else "  (background)" if "MainThread" not in threads else "  (both)"
+            lines.append(f"  {name:<32} {self_time:>8.3f}s  {count:>5} modules{thread}")
+
+        lines += ["", "Slowest imports (including the modules they import)", ""]
+        for timing in sorted(self.imports, key=lambda timing: -timing.cumulative)[:top]:
+            lines.append(f"  {timing.name:<48} {timing.cumulative:>8.3f}s")
+        return "\n".join(lines)
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Callable
+
+
+class DeltaBuffer:
+    """
+    Coalesces streamed text deltas before they are posted to the UI.
+
+    Deltas are collected until `interval` seconds have passed since the first pending delta,
+    or until `max_chars` characters are pending, whichever comes first.
+    """
+    interval: float
+    """The maximum time in seconds a delta waits before it is flushed, 0 flushes every delta."""
+    max_chars: int
+    """The number of pending characters that triggers an immediate flush."""
+
+    def __init__(self, flush: Callable[[str], None], interval: float = 0.033, max_chars: int = 256):
+        """
+        Args:
+            flush: Called with the coalesced text.
+            interval: The maximum time in seconds a delta waits before it is flushed.
+            max_chars: The number of pending characters that triggers an immediate flush.
+        """
+        self.interval = interval
+        self.max_chars = max_chars
+        self._flush = flush
+        self._pending: list[str] = []
+        self._size = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    def add(self, content: str) -> None:
+        """Add a delta to the buffer."""
+        if not content:
+            return
+        self._pending.append(content)
+        self._size += len(content)
+        if self.interval <= 0 or self._size >= self.max_chars:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self.flush)
+
+    def flush(self) -> None:
+        """Post the pending deltas now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        content = "".join(self._pending)
+        self._pending.clear()
+        self._size = 0
+        self._flush(content)
+
+    def close(self) -> None:
+        """Drop the pending deltas without posting them."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending.clear()
+        self._size = 0
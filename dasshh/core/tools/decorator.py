@@ -15,6 +15,7 @@ def tool(func: Callable):
         parameters=func.__annotations__,
         func=func
     )
+    # the declaration is built by the runtime once litellm is loaded, not at import time
 
     registry = Registry()
     registry.add_tool(tool_instance)
@@ -0,0 +1,80 @@
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from dasshh.core.tools.base import BaseTool
+from dasshh.core.tools.lazy_tool import LazyTool
+
+
+class ToolExecutor:
+    """
+    Runs tools without blocking the event loop.
+
+    Synchronous tools are dispatched to a bounded thread pool, coroutine tools are awaited directly.
+    """
+    max_workers: int
+    """The maximum number of threads used to run synchronous tools."""
+
+    def __init__(self, max_workers: int = 4):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._pool: ThreadPoolExecutor | None = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get the thread pool, creating it on first use."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="dasshh-tool",
+            )
+        return self._pool
+
+    async def run(self, tool: BaseTool, **kwargs) -> Any:
+        """
+        Run a tool and return its result.
+
+        Args:
+            tool: The tool to run.
+            **kwargs: The arguments to call the tool with.
+        """
+        loop = asyncio.get_running_loop()
+        if isinstance(tool, LazyTool):
+            # the module of the tool is imported on first call, off the event loop
+            tool = await loop.run_in_executor(self._get_pool(), tool.load)
+
+        func = getattr(tool, "func", None)
+        if func is not None and inspect.iscoroutinefunction(func):
+            return await tool(**kwargs)
+
+        return await loop.run_in_executor(self._get_pool(), functools.partial(tool, **kwargs))
+
+    def resize(self, max_workers: int) -> None:
+        """
+        Change the number of threads, tool calls already submitted run on the old threads.
+
+        Args:
+            max_workers: The new maximum number of threads.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_workers == self.max_workers:
+            return
+        self.max_workers = max_workers
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Shut down the thread pool, pending tool calls are cancelled.
+
+        Args:
+            wait: Whether to wait for running tool calls to finish.
+        """
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        self._pool = None
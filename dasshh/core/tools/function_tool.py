@@ -1,19 +1,28 @@
 from typing import Callable
-from litellm.utils import function_to_dict
 
 from dasshh.core.tools.base import BaseTool
 
 
+def function_to_dict(func: Callable) -> dict:
+    """`litellm.utils.function_to_dict`, litellm is imported on first use."""
+    from litellm.utils import function_to_dict
+
+    return function_to_dict(func)
+
+
 class FunctionTool(BaseTool):
     """
     A tool is a function that can be used to help the user.
     """
     func: Callable = None
     """The function of the tool."""
+    declaration: dict | None = None
+    """The cached declaration of the tool."""
 
     def __init__(self, name: str, description: str, parameters: dict, func: Callable = None):
         super().__init__(name, description, parameters)
         self.func = func
+        self.declaration = None
 
     def __call__(self, *args, **kwargs):
         if self.func:
@@ -23,5 +32,9 @@ class FunctionTool(BaseTool):
     def get_declaration(self) -> dict:
         """
         Get the declaration of the tool.
+
+        The declaration is built from the function's docstring once and cached.
         """
-        return function_to_dict(self.func)
+        if self.declaration is None:
+            self.declaration = function_to_dict(self.func)
+        return self.declaration
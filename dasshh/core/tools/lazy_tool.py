@@ -0,0 +1,66 @@
+import sys
+import threading
+from importlib import import_module
+
+from dasshh.core.tools.base import BaseTool
+
+
+class LazyTool(BaseTool):
+    """
+    A placeholder for a tool whose module has not been imported yet.
+
+    Registered from the tool manifest with the declaration of the real tool, so the tool can be
+    offered to the model without importing its module. The module is imported the first time the
+    tool is called, which registers the real tool in its place.
+    """
+    module: str
+    """The module that defines the tool."""
+    sys_path: str | None
+    """The directory added to `sys.path` to import the module."""
+    declaration: dict
+    """The declaration of the tool, from the manifest."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        declaration: dict,
+        module: str,
+        sys_path: str | None = None,
+    ):
+        super().__init__(name, description, {})
+        self.declaration = declaration
+        self.module = module
+        self.sys_path = sys_path
+        self._tool: BaseTool | None = None
+        self._lock = threading.Lock()
+
+    def load(self) -> BaseTool:
+        """
+        Import the module of the tool and return the real tool.
+
+        Raises:
+            LookupError: If the module does not define the tool anymore.
+        """
+        # imported here, the registry depends on this module
+        from dasshh.core.registry import Registry
+
+        with self._lock:
+            if self._tool is None:
+                if self.sys_path is not None and self.sys_path not in sys.path:
+                    sys.path.append(self.sys_path)
+                import_module(self.module)
+                tool = Registry().get_tool(self.name)
+                if tool is None or tool is self:
+                    raise LookupError(f"Tool {self.name} is not defined in {self.module}")
+                self._tool = tool
+            return self._tool
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def get_declaration(self) -> dict:
+        """
+        Get the declaration of the tool, without importing its module.
+        """
+        return self.declaration
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from dasshh.core.logging import get_logger
+from dasshh.core.registry import Registry
+from dasshh.core.tools.base import BaseTool
+from dasshh.core.tools.lazy_tool import LazyTool
+
+logger = get_logger(__name__)
+
+MANIFEST_VERSION = 1
+"""Bumped whenever the layout of the manifest changes, older manifests are ignored."""
+
+DEFAULT_MANIFEST_PATH = Path.home() / ".dasshh" / "cache" / "tools.json"
+
+
+def _is_complete(entry: dict) -> bool:
+    """Whether every tool of a directory can be registered from the manifest."""
+    return all(tool["module"] and tool["declaration"] is not None for tool in entry["tools"])
+
+
+def _sys_path(module: str) -> str | None:
+    """The directory that has to be on `sys.path` to import a module."""
+    file = getattr(sys.modules.get(module), "__file__", None)
+    if file is None:
+        return None
+    path = Path(file)
+    depth = module.count(".") + (1 if path.name == "__init__.py" else 0)
+    return str(path.parents[depth])
+
+
+def _describe(tool: BaseTool) -> dict:
+    """The manifest entry of a tool."""
+    func = getattr(tool, "func", None)
+    module = getattr(func, "__module__", None)
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "module": module,
+        "sys_path": _sys_path(module) if module else None,
+        # filled in by `update` once the runtime has built it
+        "declaration": getattr(tool, "declaration", None),
+    }
+
+
+class ToolManifest:
+    """
+    A cache of the tools defined in each tool directory.
+
+    For every directory the manifest keeps the modification time, size and hash of its Python
+    files, and the name, module and declaration of its tools. While the files are unchanged the
+    tools are registered as `LazyTool` placeholders, so starting Dasshh does not import every tool
+    module, and a module is only imported the first time one of its tools is called. A file whose
+    modification time and size are unchanged is not hashed again.
+    """
+    path: Path
+    """The manifest file."""
+    directories: dict[str, dict]
+    """The files and tools of each tool directory."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else DEFAULT_MANIFEST_PATH
+        self.directories = {}
+        self._changed = False
+
+    def load(self) -> None:
+        """Read the manifest file, a missing or outdated manifest is empty."""
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return
+        self.directories = data.get("directories") or {}
+
+    def save(self) -> None:
+        """Write the manifest file, directories with tools that have no declaration yet are left out."""
+        if not self._changed:
+            return
+        directories = {path: entry for path, entry in self.directories.items() if _is_complete(entry)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "directories": directories}))
+        os.replace(tmp_path, self.path)
+        self._changed = False
+
+    def fingerprint(self, dir_path: str) -> dict[str, list]:
+        """
+        Get the modification time, size and hash of the Python files in a directory.
+
+        Returns:
+            `[mtime_ns, size, sha256]` of each file, by its path relative to the directory.
+        """
+        cached = self.directories.get(dir_path, {}).get("files", {})
+        files = {}
+        for root, dirs, names in os.walk(dir_path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for name in sorted(names):
+                if not name.endswith(".py"):
+                    continue
+                file_path = os.path.join(root, name)
+                stat = os.stat(file_path)
+                rel_path = os.path.relpath(file_path, dir_path)
+                previous = cached.get(rel_path)
+                if previous is not None and previous[:2] == [stat.st_mtime_ns, stat.st_size]:
+                    digest = previous[2]
+                else:
+                    digest = hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+                files[rel_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return files
+
+    def lookup(self, dir_path: str, files: dict[str, list]) -> List[dict] | None:
+        """
+        Get the tools of a directory, if its files are the ones the manifest was built from.
+
+        Args:
+            dir_path: The tool directory.
+            files: The fingerprint of the directory.
+        """
+        entry = self.directories.get(dir_path)
+        if entry is None or not _is_complete(entry):
+            return None
+        if {path: f[2] for path, f in entry["files"].items()} != {path: f[2] for path, f in files.items()}:
+            return None
+        if entry["files"] != files:
+            # same contents with new modification times, keep them so the files are not hashed again
+            entry["files"] = files
+            self._changed = True
+        return entry["tools"]
+
+    def record(self, dir_path: str, files: dict[str, list], tools: List[BaseTool]) -> None:
+        """Remember the tools a directory defined when it was imported."""
+        self.directories[dir_path] = {"files": files, "tools": [_describe(tool) for tool in tools]}
+        self._changed = True
+
+    def update(self, registry: Registry) -> None:
+        """Fill in the declarations the registered tools have built since they were recorded."""
+        for entry in self.directories.values():
+            for tool in entry["tools"]:
+                if tool["declaration"] is not None:
+                    continue
+                declaration = getattr(registry.get_tool(tool["name"]), "declaration", None)
+                if declaration is not None:
+                    tool["declaration"] = declaration
+                    self._changed = True
+
+    def register(self, registry: Registry, tools: List[dict]) -> None:
+        """Register the tools of a directory as `LazyTool` placeholders, unless they are already registered."""
+        for tool in tools:
+            if registry.get_tool(tool["name"]) is not None:
+                continue
+            registry.add_tool(
+                LazyTool(
+                    name=tool["name"],
+                    description=tool["description"],
+                    declaration=tool["declaration"],
+                    module=tool["module"],
+                    sys_path=tool["sys_path"],
+                )
+            )
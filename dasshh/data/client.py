@@ -1,8 +1,9 @@
+import zlib
 from pathlib import Path
-from typing import Generator
+from typing import Any, Generator, List
 
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy import create_engine, Engine
+from sqlalchemy import create_engine, event, Engine
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -12,17 +13,161 @@ class Base(DeclarativeBase):
     pass
 
 
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_MODES = ("off", "normal", "full", "extra")
+
+
+def zlib_text(data: bytes | None) -> str | None:
+    """Decompress zlib compressed UTF-8 text, available to SQL on every connection as `zlib_text`."""
+    return zlib.decompress(data).decode("utf-8") if data is not None else None
+
+
 class DBClient:
-    """Dasshh database client."""
+    """
+    Dasshh database client.
+
+    Every connection is set up with the configured pragmas. The defaults use WAL journaling
+    with `synchronous=NORMAL`, so a commit does not wait for a full fsync and readers (such
+    as a second Dasshh instance) are not blocked by a writer. Databases use incremental
+    auto vacuum, so the pages of deleted data can be given back to the disk a few at a time
+    with `incremental_vacuum` instead of rebuilding the whole file.
+    """
 
     db_path = Path.home() / ".dasshh" / "db" / "dasshh.db"
 
-    def __init__(self):
+    journal_mode: str = "wal"
+    """The SQLite journal mode."""
+    synchronous: str = "normal"
+    """The SQLite synchronous mode."""
+    busy_timeout_ms: int = 5000
+    """How long a connection waits for a lock held by another connection, in milliseconds."""
+    mmap_size_mb: int = 64
+    """The size of the memory mapped part of the database file, in megabytes."""
+    cache_size_mb: int = 16
+    """The page cache size of each connection, in megabytes."""
+    pool_size: int = 5
+    """The number of connections kept open in the pool."""
+    max_overflow: int = 10
+    """The number of connections that can be opened beyond `pool_size`."""
+    pool_timeout: int = 30
+    """How long to wait for a connection from the pool, in seconds."""
+    backup_before_migration: bool = True
+    """Copy the database file before migrating it to a new schema version."""
+    migration_batch_size: int = 1000
+    """The number of rows a migration backfill updates per transaction."""
+
+    def __init__(self, db_path: str | Path | None = None, config: dict[str, Any] | None = None):
+        """
+        Args:
+            db_path: The database file, defaults to ~/.dasshh/db/dasshh.db.
+            config: The `db` section of the configuration, missing keys use the defaults.
+        """
+        if db_path is not None:
+            self.db_path = Path(db_path)
+        self._configure(config or {})
+
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.engine: Engine = create_engine(f"sqlite:///{self.db_path}")
+        self.engine: Engine = create_engine(
+            f"sqlite:///{self.db_path}",
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+        )
+        event.listen(self.engine, "connect", self._set_pragmas)
+        event.listen(self.engine, "connect", self._add_functions)
         self.DatabaseSessionFactory: sessionmaker = sessionmaker(bind=self.engine)
 
-        Base.metadata.create_all(bind=self.engine)
+        self.migrate()
+
+    def migrate(self) -> List[int]:
+        """
+        Create the schema, or bring an existing database to the latest schema version.
+
+        Returns:
+            The migration versions that were applied.
+        """
+        # imported here, the models depend on this module
+        from dasshh.data.migrations import MigrationRunner
+
+        runner = MigrationRunner(
+            self.engine,
+            db_path=self.db_path,
+            backup=self.backup_before_migration,
+            batch_size=self.migration_batch_size,
+        )
+        return runner.run()
+
+    def vacuum(self) -> None:
+        """Rebuild the database file to give the space of deleted and compressed data back to the disk."""
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+            if self.journal_mode == "wal":
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def free_pages(self) -> int:
+        """The number of unused pages in the database file."""
+        with self.engine.connect() as conn:
+            return conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """
+        Give up to `pages` unused pages back to the disk.
+
+        Unlike `vacuum`, this only holds the write lock for as long as it takes to move the pages.
+
+        Returns:
+            The number of pages freed.
+        """
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.driver_connection.cursor()
+            before = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            # every step frees one page, so the statement has to be stepped to the end
+            cursor.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            after = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            cursor.close()
+        finally:
+            connection.close()
+        return before - after
+
+    def _configure(self, config: dict[str, Any]) -> None:
+        """Read the settings from the configuration."""
+        journal_mode = str(config.get("journal_mode") or self.journal_mode).lower()
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Invalid journal_mode: {journal_mode}")
+        synchronous = str(config.get("synchronous") or self.synchronous).lower()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {synchronous}")
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+
+        if config.get("backup_before_migration") is not None:
+            self.backup_before_migration = bool(config["backup_before_migration"])
+        for key in ("migration_batch_size", "busy_timeout_ms", "mmap_size_mb", "cache_size_mb", "pool_size", "max_overflow", "pool_timeout"):
+            value = config.get(key)
+            if value is not None:
+                setattr(self, key, int(value))
+
+    def _set_pragmas(self, dbapi_connection, connection_record) -> None:
+        """Apply the pragmas to a new connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            # busy_timeout first, switching the journal mode needs a lock
+            cursor.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+            # only takes effect on a new database, existing ones are converted by a migration
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            cursor.execute(f"PRAGMA synchronous = {self.synchronous}")
+            cursor.execute(f"PRAGMA mmap_size = {self.mmap_size_mb * 1024 * 1024}")
+            # a negative cache size is in KiB
+            cursor.execute(f"PRAGMA cache_size = -{self.cache_size_mb * 1024}")
+        finally:
+            cursor.close()
+
+    def _add_functions(self, dbapi_connection, connection_record) -> None:
+        """Register the SQL functions the schema uses on a new connection."""
+        # the full text index reads the text of archived events and blobs through it
+        dbapi_connection.create_function("zlib_text", 1, zlib_text, deterministic=True)
 
     def get_db(self) -> Generator[Session, None, None]:
         """Get a database session."""
@@ -0,0 +1,180 @@
+import json
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterator, List
+
+from dasshh.data.client import DBClient
+from dasshh.data.models import (
+    EventRecord,
+    SessionSummary,
+    decompress_content,
+    split_blob,
+    summarize_events,
+    utcnow,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def dumps(value: Any) -> str:
+    """Encode event content as JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value)
+
+
+def loads(text: str | bytes) -> Any:
+    """Decode event content, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _timestamp(value: datetime) -> str:
+    """Format a datetime the way SQLAlchemy stores it in SQLite."""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+# sqlite3 keeps the prepared statement of each query text per connection, so the statements
+# below are only compiled once per pooled connection
+NEXT_SEQ = "SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE session_id = ?"
+INSERT_EVENT = (
+    "INSERT INTO events (id, invocation_id, session_id, seq, created_at, content) VALUES (?, ?, ?, ?, ?, ?)"
+)
+INSERT_BLOB = (
+    "INSERT INTO blobs (hash, size, data, created_at) VALUES (?, ?, ?, ?) ON CONFLICT (hash) DO NOTHING"
+)
+UPDATE_SUMMARY = (
+    "UPDATE sessions SET message_count = message_count + ?, last_activity_at = ?, "
+    "preview = COALESCE(?, preview) WHERE id = ?"
+)
+SELECT_EVENTS = (
+    "SELECT id, invocation_id, session_id, seq, created_at, content, content_z FROM events "
+    "WHERE session_id = ? AND seq > ? ORDER BY seq LIMIT ?"
+)
+SELECT_EVENTS_REVERSE = (
+    "SELECT id, invocation_id, session_id, seq, created_at, content, content_z FROM events "
+    "WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?"
+)
+SELECT_RECENT_SESSION = (
+    "SELECT id, detail, created_at, updated_at, message_count, last_activity_at, preview FROM sessions "
+    "ORDER BY updated_at DESC LIMIT 1"
+)
+
+MAX_SEQ = 2**63 - 1
+"""The largest seq SQLite can store."""
+
+
+class FastPath:
+    """
+    Reads and writes events with plain `sqlite3` statements instead of the ORM.
+
+    Used by `SessionService` for its hot paths: appending events, reading the events of a session
+    and finding the most recent session. There is no identity map, no refresh after a write and no
+    ORM instances; rows come back as `EventRecord` and `SessionSummary`. Connections come from the
+    engine's pool, so they have the same pragmas as the ORM's. Event content is encoded with
+    orjson when it is installed (`pip install dasshh[fast]`), the stored JSON is the same either way.
+    """
+
+    def __init__(self, db_client: DBClient):
+        self.db_client = db_client
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection from the pool."""
+        connection = self.db_client.engine.raw_connection()
+        try:
+            yield connection.driver_connection
+        finally:
+            connection.close()
+
+    def add_events(self, rows: List[dict], blob_threshold: int | None = None) -> None:
+        """
+        Append events in a single transaction.
+
+        Args:
+            rows: The `invocation_id`, `session_id` and `content` of each event, in order.
+            blob_threshold: Event text longer than this many characters goes to the blob store.
+        """
+        now = _timestamp(utcnow())
+        with self._connect() as conn:
+            # take the write lock up front, the next seq is read in the same transaction
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                seqs: dict[str, int] = {}
+                contents: dict[str, List[dict]] = {}
+                events = []
+                blobs = []
+                for row in rows:
+                    session_id = row["session_id"]
+                    seq = seqs.get(session_id) or conn.execute(NEXT_SEQ, (session_id,)).fetchone()[0]
+                    seqs[session_id] = seq + 1
+                    content = row["content"]
+                    contents.setdefault(session_id, []).append(content)
+                    if blob_threshold is not None:
+                        content, blob = split_blob(content, blob_threshold)
+                        if blob is not None:
+                            blobs.append((blob["hash"], blob["size"], blob["data"], _timestamp(blob["created_at"])))
+                    events.append((str(uuid.uuid4()), row["invocation_id"], session_id, seq, now, dumps(content)))
+                # before the events, the search index reads the full text from the blobs
+                if blobs:
+                    conn.executemany(INSERT_BLOB, blobs)
+                conn.executemany(INSERT_EVENT, events)
+                summaries = []
+                for session_id, session_contents in contents.items():
+                    count, preview = summarize_events(session_contents)
+                    summaries.append((count, now, preview, session_id))
+                conn.executemany(UPDATE_SUMMARY, summaries)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def get_events(
+        self,
+        session_id: str,
+        after_seq: int | None = None,
+        limit: int | None = None,
+        reverse: bool = False,
+    ) -> List[EventRecord]:
+        """Get the events of a session in order, see `SessionService.get_events`."""
+        # a single statement per direction: no bound is the first seq, no limit is a negative LIMIT
+        if after_seq is None:
+            after_seq = MAX_SEQ if reverse else 0
+        params = (session_id, after_seq, -1 if limit is None else limit)
+        with self._connect() as conn:
+            rows = conn.execute(SELECT_EVENTS_REVERSE if reverse else SELECT_EVENTS, params).fetchall()
+        records = []
+        for event_id, invocation_id, event_session_id, seq, created_at, content, content_z in rows:
+            if content is not None:
+                content = loads(content)
+            elif content_z is not None:
+                content = decompress_content(content_z)
+            records.append(EventRecord(event_id, invocation_id, event_session_id, seq, _datetime(created_at), content))
+        return records
+
+    def get_recent_session(self) -> SessionSummary | None:
+        """Get the summary of the most recently updated session."""
+        with self._connect() as conn:
+            row = conn.execute(SELECT_RECENT_SESSION).fetchone()
+        if row is None:
+            return None
+        session_id, detail, created_at, updated_at, message_count, last_activity_at, preview = row
+        return SessionSummary(
+            session_id,
+            detail,
+            _datetime(created_at),
+            _datetime(updated_at),
+            message_count,
+            _datetime(last_activity_at),
+            preview,
+        )
@@ -0,0 +1,276 @@
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+from sqlalchemy import Connection, Engine, inspect
+
+from dasshh.data.client import Base
+from dasshh.data.models import BLOB_REF, EVENT_TEXT, EVENTS_FTS_DDL, PREVIEW_LENGTH, StorageBlob
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A schema change, applied once to every database older than its version."""
+    version: int
+    """The schema version after the migration, stored in `PRAGMA user_version`."""
+    description: str
+    """What the migration changes."""
+    apply: Callable[[Connection, int], None]
+    """Applies the migration, given a connection and the backfill batch size."""
+
+
+MIGRATIONS: List[Migration] = []
+"""All migrations, ordered by version."""
+
+
+def migration(version: int, description: str) -> Callable:
+    """Register a migration function."""
+    def decorator(func: Callable[[Connection, int], None]) -> Callable[[Connection, int], None]:
+        MIGRATIONS.append(Migration(version=version, description=description, apply=func))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return decorator
+
+
+def latest_version() -> int:
+    """The schema version of a fully migrated database."""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+class MigrationRunner:
+    """
+    Brings a database to the latest schema version.
+
+    A new database is created with the current schema and stamped with the latest version. An
+    existing database gets every migration newer than its `PRAGMA user_version`, after a backup
+    copy of the file is made. Migrations check what already exists, so an interrupted run can
+    be repeated, and backfills commit in batches so a large database does not hold one long
+    write transaction.
+    """
+    batch_size: int
+    """The number of rows a backfill updates per transaction."""
+
+    def __init__(self, engine: Engine, db_path: Path | None = None, backup: bool = True, batch_size: int = 1000):
+        self.engine = engine
+        self.db_path = db_path
+        self.backup = backup
+        self.batch_size = batch_size
+
+    def current_version(self) -> int:
+        """The schema version of the database."""
+        with self.engine.connect() as conn:
+            return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+    def pending(self) -> List[Migration]:
+        """The migrations that have not been applied yet."""
+        current = self.current_version()
+        return [m for m in MIGRATIONS if m.version > current]
+
+    def run(self) -> List[int]:
+        """
+        Apply the pending migrations.
+
+        Returns:
+            The versions that were applied.
+        """
+        if not inspect(self.engine).has_table("sessions"):
+            Base.metadata.create_all(bind=self.engine)
+            self._set_version(latest_version())
+            logger.debug(f"-- Created database schema version {latest_version()} --")
+            return []
+
+        pending = self.pending()
+        if pending and self.backup:
+            self._backup()
+
+        applied = []
+        for m in pending:
+            logger.info(f"-- Applying migration {m.version}: {m.description} --")
+            with self.engine.connect() as conn:
+                m.apply(conn, self.batch_size)
+                conn.commit()
+            self._set_version(m.version)
+            applied.append(m.version)
+
+        # tables added to the models without a migration
+        Base.metadata.create_all(bind=self.engine)
+        return applied
+
+    def _set_version(self, version: int) -> None:
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+    def _backup(self) -> Path | None:
+        """Copy the database next to it before it is migrated."""
+        if self.db_path is None:
+            return None
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        path = self.db_path.with_name(f"{self.db_path.name}.v{self.current_version()}-{stamp}.bak")
+        source = self.engine.raw_connection()
+        target = sqlite3.connect(path)
+        try:
+            source.driver_connection.backup(target)
+        finally:
+            target.close()
+            source.close()
+        logger.info(f"-- Backed up database to {path} --")
+        return path
+
+
+# -- Migrations --
+
+
+@migration(1, "number events per session")
+def _add_event_seq(conn: Connection, batch_size: int) -> None:
+    if "seq" not in _columns(conn, "events"):
+        conn.exec_driver_sql("ALTER TABLE events ADD COLUMN seq INTEGER")
+    # the index also speeds up the backfill, NULL seqs do not conflict
+    conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_events_session_seq ON events (session_id, seq)")
+    conn.commit()
+
+    while True:
+        session_ids = conn.exec_driver_sql(
+            # events of deleted sessions have no session, they are left without a seq
+            "SELECT DISTINCT session_id FROM events WHERE seq IS NULL AND session_id IS NOT NULL LIMIT ?",
+            (batch_size,),
+        ).scalars().all()
+        if not session_ids:
+            break
+        placeholders = ", ".join("?" for _ in session_ids)
+        # older versions had no reliable timestamps, the insertion order is the event order
+        conn.exec_driver_sql(
+            "UPDATE events SET seq = numbered.seq FROM ("
+            "SELECT rowid AS event_rowid, ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY rowid) AS seq "
+            f"FROM events WHERE session_id IN ({placeholders})) AS numbered "
+            "WHERE events.rowid = numbered.event_rowid",
+            tuple(session_ids),
+        )
+        conn.commit()
+
+
+@migration(2, "index sessions by last update")
+def _index_sessions_updated_at(conn: Connection, batch_size: int) -> None:
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_sessions_updated_at ON sessions (updated_at)")
+
+
+@migration(3, "add session summary columns")
+def _add_session_summaries(conn: Connection, batch_size: int) -> None:
+    columns = _columns(conn, "sessions")
+    if "message_count" not in columns:
+        conn.exec_driver_sql("ALTER TABLE sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0")
+    if "last_activity_at" not in columns:
+        conn.exec_driver_sql("ALTER TABLE sessions ADD COLUMN last_activity_at DATETIME")
+    if "preview" not in columns:
+        conn.exec_driver_sql("ALTER TABLE sessions ADD COLUMN preview VARCHAR")
+    conn.commit()
+
+    chat_message = (
+        "json_extract(content, '$.role') IN ('user', 'assistant') "
+        "AND json_type(content, '$.tool_calls') IS NULL"
+    )
+    last_rowid = 0
+    while True:
+        bounds = conn.exec_driver_sql(
+            "SELECT MAX(session_rowid), COUNT(*) FROM ("
+            "SELECT rowid AS session_rowid FROM sessions WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+            (last_rowid, batch_size),
+        ).one()
+        if not bounds[1]:
+            break
+        conn.exec_driver_sql(
+            "UPDATE sessions SET "
+            f"message_count = (SELECT COUNT(*) FROM events WHERE session_id = sessions.id AND {chat_message}), "
+            "last_activity_at = COALESCE("
+            "(SELECT MAX(created_at) FROM events WHERE session_id = sessions.id), updated_at), "
+            f"preview = (SELECT substr(json_extract(content, '$.content'), 1, {PREVIEW_LENGTH}) FROM events "
+            f"WHERE session_id = sessions.id AND {chat_message} "
+            "AND COALESCE(json_extract(content, '$.content'), '') != '' ORDER BY seq DESC LIMIT 1) "
+            "WHERE rowid > ? AND rowid <= ?",
+            (last_rowid, bounds[0]),
+        )
+        conn.commit()
+        last_rowid = bounds[0]
+
+
+@migration(4, "index event text for full text search")
+def _add_events_fts(conn: Connection, batch_size: int) -> None:
+    # the index reads columns and tables added by later migrations, migration 9 creates it
+    pass
+
+
+@migration(5, "add compressed event content")
+def _add_event_content_z(conn: Connection, batch_size: int) -> None:
+    if "content_z" not in _columns(conn, "events"):
+        conn.exec_driver_sql("ALTER TABLE events ADD COLUMN content_z BLOB")
+
+
+@migration(6, "add the blob store")
+def _add_blobs(conn: Connection, batch_size: int) -> None:
+    StorageBlob.__table__.create(conn, checkfirst=True)
+
+
+@migration(7, "delete the events of deleted sessions")
+def _delete_orphaned_events(conn: Connection, batch_size: int) -> None:
+    # deleting a session used to only clear the session_id of its events
+    while True:
+        deleted = conn.exec_driver_sql(
+            "DELETE FROM events WHERE rowid IN (SELECT rowid FROM events "
+            "WHERE session_id IS NULL OR session_id NOT IN (SELECT id FROM sessions) LIMIT ?)",
+            (batch_size,),
+        ).rowcount
+        conn.commit()
+        if not deleted:
+            break
+
+    conn.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS ix_events_content_blob ON events ({BLOB_REF}) WHERE {BLOB_REF} IS NOT NULL"
+    )
+    conn.exec_driver_sql(f"DELETE FROM blobs WHERE NOT EXISTS (SELECT 1 FROM events WHERE {BLOB_REF} = blobs.hash)")
+
+
+@migration(8, "reclaim the space of deleted data incrementally")
+def _enable_incremental_vacuum(conn: Connection, batch_size: int) -> None:
+    # 2 is INCREMENTAL. An existing database only switches on its next full vacuum, which rewrites
+    # the whole file, so that is left to `dasshh db compact` rather than done while Dasshh starts.
+    if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        logger.info("-- Run `dasshh db compact` once so free pages can be reclaimed while Dasshh is idle --")
+
+
+@migration(9, "index event text without storing a copy of it")
+def _add_events_fts_external_content(conn: Connection, batch_size: int) -> None:
+    # the index of migration 4 kept its own copy of the text
+    sql = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'events_fts'").scalar()
+    if sql is not None and "content_rowid" not in sql:
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS events_fts_insert")
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS events_fts_delete")
+        conn.exec_driver_sql("DROP TABLE events_fts")
+    for statement in EVENTS_FTS_DDL:
+        conn.exec_driver_sql(statement)
+    conn.commit()
+
+    # the index reads its rows from the events, the rowids it has indexed are in its docsize table
+    last_rowid = conn.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM events_fts_docsize").scalar()
+    while True:
+        end = conn.exec_driver_sql(
+            "SELECT MAX(event_rowid) FROM (SELECT rowid AS event_rowid FROM events WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+            (last_rowid, batch_size),
+        ).scalar()
+        if end is None:
+            break
+        conn.exec_driver_sql(
+            f"INSERT INTO events_fts (rowid, text) SELECT rowid, {EVENT_TEXT.format(row='events')} FROM events "
+            f"WHERE rowid > ? AND rowid <= ? AND {EVENT_TEXT.format(row='events')} IS NOT NULL",
+            (last_rowid, end),
+        )
+        conn.commit()
+        last_rowid = end
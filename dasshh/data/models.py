@@ -1,29 +1,307 @@
+import hashlib
+import json
 import uuid
+import zlib
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from typing import List
+from sqlalchemy import (
+    DDL,
+    Column,
+    String,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    LargeBinary,
+    event,
+    func,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, relationship
 
 from dasshh.data.client import Base
 
 
+def utcnow() -> datetime:
+    """The current time in UTC, used as a column default."""
+    return datetime.now(timezone.utc)
+
+
+BLOB_REF = "json_extract(content, '$.content_blob')"
+"""SQL for the blob hash an event references, the expression of the `ix_events_content_blob` index."""
+
+
 class StorageSession(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_updated_at", "updated_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     detail = Column(String)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow)
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    """The number of user and assistant messages in the session."""
+    last_activity_at = Column(DateTime)
+    """When the last event was added to the session."""
+    preview = Column(String)
+    """The start of the last message in the session."""
 
-    events = relationship("StorageEvent", back_populates="session")
+    events = relationship(
+        "StorageEvent",
+        back_populates="session",
+        order_by="StorageEvent.seq",
+        cascade="all, delete-orphan",
+    )
 
 
 class StorageEvent(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_session_seq", "session_id", "seq", unique=True),
+        # finds the events still referencing a blob when blobs are cleaned up
+        Index("ix_events_content_blob", text(BLOB_REF), sqlite_where=text(f"{BLOB_REF} IS NOT NULL")),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     invocation_id = Column(String)
     session_id = Column(String, ForeignKey("sessions.id"))
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    content = Column(JSON)
+    seq = Column(Integer)
+    """The position of the event in its session, starting at 1."""
+    created_at = Column(DateTime, default=utcnow)
+    raw_content = Column("content", JSON)
+    """The event data, `None` once the event is archived."""
+    content_z = Column(LargeBinary)
+    """The event data as zlib compressed JSON, once the event is archived."""
 
     session = relationship("StorageSession", back_populates="events")
+
+    @property
+    def content(self) -> dict | None:
+        """The event data, decompressed for archived events."""
+        if self.raw_content is None and self.content_z is not None:
+            return decompress_content(self.content_z)
+        return self.raw_content
+
+    @content.setter
+    def content(self, value: dict | None) -> None:
+        self.raw_content = value
+
+
+class StorageBlob(Base):
+    """A large event text stored once, by the sha256 hash of its content."""
+    __tablename__ = "blobs"
+
+    hash = Column(String, primary_key=True)
+    size = Column(Integer, nullable=False)
+    """The size of the text in bytes, before compression."""
+    data = Column(LargeBinary, nullable=False)
+    """The zlib compressed text."""
+    created_at = Column(DateTime, default=utcnow)
+
+
+BLOB_PREVIEW_LENGTH = 1024
+"""The number of characters of a blob's text kept in the event."""
+
+
+def split_blob(content: dict, threshold: int) -> tuple[dict, dict | None]:
+    """
+    Split the text of an event larger than `threshold` characters off into a blob.
+
+    Returns:
+        The content to save in the event, and the values of the blob row or `None` when the
+        text stays in the event. The given content is not changed.
+    """
+    text = content.get("content")
+    if not isinstance(text, str) or len(text) <= threshold:
+        return content, None
+
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    blob = {"hash": digest, "size": len(data), "data": zlib.compress(data), "created_at": utcnow()}
+    return {**content, "content": text[:BLOB_PREVIEW_LENGTH], "content_blob": digest}, blob
+
+
+def store_blob(db: Session, content: dict, threshold: int) -> dict:
+    """
+    Move the text of an event to the blob store when it is larger than `threshold` characters.
+
+    The text is stored once however many events reference it. The event keeps the start of the
+    text in `content` and the blob hash in `content_blob`. The blob is written first, the search
+    index reads the full text from it when the event is inserted.
+
+    Returns:
+        The content to save in the event, the given content is not changed.
+    """
+    content, blob = split_blob(content, threshold)
+    if blob is not None:
+        db.execute(insert(StorageBlob).values(**blob).on_conflict_do_nothing(index_elements=["hash"]))
+    return content
+
+
+def delete_unreferenced_blobs(db: Session, hashes: List[str]) -> int:
+    """
+    Delete the blobs among `hashes` that no event references any more, in the caller's transaction.
+
+    Returns:
+        The number of blobs deleted.
+    """
+    deleted = 0
+    for hash_ in hashes:
+        deleted += db.execute(
+            text(
+                "DELETE FROM blobs WHERE hash = :hash AND NOT EXISTS "
+                f"(SELECT 1 FROM events WHERE {BLOB_REF} = :hash)"
+            ),
+            {"hash": hash_},
+        ).rowcount
+    return deleted
+
+
+def compress_content(content: str) -> bytes:
+    """Compress the JSON text of an event."""
+    return zlib.compress(content.encode("utf-8"), 9)
+
+
+def decompress_content(data: bytes) -> dict:
+    """Decompress the data of an archived event."""
+    return json.loads(zlib.decompress(data))
+
+
+EVENT_CONTENT = "COALESCE({row}.content, zlib_text({row}.content_z))"
+"""SQL for the JSON text of an event, decompressed for archived events."""
+
+EVENT_TEXT = (
+    f"CASE WHEN json_extract({EVENT_CONTENT}, '$.role') IN ('user', 'assistant', 'tool') THEN COALESCE("
+    f"zlib_text((SELECT data FROM blobs WHERE hash = json_extract({EVENT_CONTENT}, '$.content_blob'))), "
+    f"json_extract({EVENT_CONTENT}, '$.content')) END"
+)
+"""SQL for the searchable text of an event, the full text of a blob in place of its preview, tool calls have none."""
+
+EVENTS_FTS_DDL = [
+    # the index reads the text from this view when it needs it, so the text is not stored twice
+    "CREATE VIEW IF NOT EXISTS events_text (event_rowid, text) AS "
+    f"SELECT rowid, {EVENT_TEXT.format(row='events')} FROM events",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(text, content = 'events_text', "
+    "content_rowid = 'event_rowid', tokenize = 'unicode61 remove_diacritics 2')",
+    # the full text index shares the rowid of the events table
+    "CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events "
+    f"WHEN {EVENT_TEXT.format(row='new')} IS NOT NULL BEGIN "
+    f"INSERT INTO events_fts (rowid, text) VALUES (new.rowid, {EVENT_TEXT.format(row='new')}); END",
+    # an external content index needs the indexed text to remove a row
+    "CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events "
+    f"WHEN {EVENT_TEXT.format(row='old')} IS NOT NULL BEGIN "
+    "INSERT INTO events_fts (events_fts, rowid, text) "
+    f"VALUES ('delete', old.rowid, {EVENT_TEXT.format(row='old')}); END",
+]
+"""The full text index of event text, kept in sync with the events table by triggers, archiving keeps the text."""
+
+for statement in EVENTS_FTS_DDL:
+    event.listen(StorageEvent.__table__, "after_create", DDL(statement))
+
+
+@dataclass(slots=True)
+class SessionSummary:
+    """The columns of a session needed to list it, without its events."""
+    id: str
+    detail: str | None
+    created_at: datetime | None
+    updated_at: datetime | None
+    message_count: int
+    last_activity_at: datetime | None
+    preview: str | None
+
+
+@dataclass(slots=True)
+class EventRecord:
+    """An event read without the ORM, with the same attributes as `StorageEvent`."""
+    id: str
+    invocation_id: str | None
+    session_id: str
+    seq: int
+    created_at: datetime | None
+    content: dict | None
+    """The event data, decompressed for archived events."""
+
+
+MATCH_START = "\x02"
+"""Marks the start of a match in a search snippet."""
+MATCH_END = "\x03"
+"""Marks the end of a match in a search snippet."""
+
+
+@dataclass(slots=True)
+class SearchResult:
+    """An event matching a full text search."""
+    session_id: str
+    detail: str | None
+    invocation_id: str
+    seq: int
+    role: str
+    snippet: str
+    """The matching part of the event text, matches are wrapped in `MATCH_START` and `MATCH_END`."""
+    rank: float
+    """The bm25 rank of the match, lower is better."""
+
+
+@dataclass(slots=True)
+class ArchiveReport:
+    """The result of archiving idle sessions."""
+    sessions: int = 0
+    """The number of sessions with newly archived events."""
+    events: int = 0
+    """The number of events archived."""
+    bytes_before: int = 0
+    """The size of the archived events before compression."""
+    bytes_after: int = 0
+    """The size of the archived events after compression."""
+
+    @property
+    def bytes_saved(self) -> int:
+        """The bytes saved by compression, the file only shrinks once the database is vacuumed."""
+        return self.bytes_before - self.bytes_after
+
+
+PREVIEW_LENGTH = 120
+"""The number of characters of a message kept as the session preview."""
+
+
+def is_chat_message(content: dict) -> bool:
+    """Whether an event is a user or assistant message, as opposed to a tool call or tool result."""
+    return content.get("role") in ("user", "assistant") and "tool_calls" not in content
+
+
+def summarize_events(contents: List[dict]) -> tuple[int, str | None]:
+    """Get the number of chat messages in new events and the preview of the last one, if any."""
+    count = 0
+    preview = None
+    for content in contents:
+        if is_chat_message(content):
+            count += 1
+            if content.get("content"):
+                preview = str(content["content"])[:PREVIEW_LENGTH]
+    return count, preview
+
+
+def update_session_summary(db: Session, session_id: str, contents: List[dict]) -> None:
+    """Update the summary columns of a session for new events, in the caller's transaction."""
+    count, preview = summarize_events(contents)
+    values = {
+        "message_count": StorageSession.message_count + count,
+        "last_activity_at": utcnow(),
+    }
+    if preview is not None:
+        values["preview"] = preview
+    db.execute(update(StorageSession).where(StorageSession.id == session_id).values(**values))
+
+
+def next_event_seq(db: Session, session_id: str) -> int:
+    """Get the sequence number for the next event of a session."""
+    last = db.execute(select(func.max(StorageEvent.seq)).where(StorageEvent.session_id == session_id)).scalar()
+    return (last or 0) + 1
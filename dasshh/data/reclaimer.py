@@ -0,0 +1,74 @@
+import logging
+import threading
+from typing import Callable
+
+from dasshh.data.client import DBClient
+
+logger = logging.getLogger(__name__)
+
+
+class SpaceReclaimer:
+    """
+    Gives the free pages of the database file back to the disk while Dasshh is idle.
+
+    Deleting sessions and archiving events leaves free pages in the file. A background thread
+    checks for them every `interval` seconds and, once nothing has been written for `idle_after`
+    seconds, runs incremental vacuum steps of `pages_per_step` pages until the pages are gone or
+    a write comes in. Each step is a short transaction, so a new event never waits long.
+    """
+    interval: float
+    """How often to check for free pages, in seconds."""
+    idle_after: float
+    """How long nothing has to be written before pages are reclaimed, in seconds."""
+    pages_per_step: int
+    """The number of pages given back per transaction."""
+
+    def __init__(
+        self,
+        db_client: DBClient,
+        idle_time: Callable[[], float],
+        interval: float = 60.0,
+        idle_after: float = 10.0,
+        pages_per_step: int = 256,
+    ):
+        self.interval = interval
+        self.idle_after = idle_after
+        self.pages_per_step = pages_per_step
+        self._db_client = db_client
+        self._idle_time = idle_time
+        """Returns the number of seconds since the last write."""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="dasshh-space-reclaimer", daemon=True)
+        self._thread.start()
+
+    def reclaim(self) -> int:
+        """
+        Reclaim free pages for as long as the database stays idle.
+
+        Returns:
+            The number of pages given back to the disk.
+        """
+        freed = 0
+        while not self._stop.is_set() and self._idle_time() >= self.idle_after:
+            if not self._db_client.free_pages():
+                break
+            pages = self._db_client.incremental_vacuum(self.pages_per_step)
+            freed += pages
+            if pages < self.pages_per_step:
+                break
+        if freed:
+            logger.debug(f"-- Reclaimed {freed} free pages --")
+        return freed
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Reclaim pages every `interval` seconds until closed."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.reclaim()
+            except Exception as e:
+                logger.error(f"-- Failed to reclaim free pages: {e} --")
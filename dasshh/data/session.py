@@ -1,16 +1,98 @@
-from datetime import datetime, timezone
+import logging
+import time
+import zlib
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import delete, func, select, text
 from sqlalchemy.orm import noload
 
 from dasshh.data.client import DBClient
-from dasshh.data.models import StorageSession, StorageEvent
+from dasshh.data.fast_path import FastPath
+from dasshh.data.models import (
+    ArchiveReport,
+    BLOB_REF,
+    EventRecord,
+    MATCH_END,
+    MATCH_START,
+    SearchResult,
+    SessionSummary,
+    StorageBlob,
+    StorageSession,
+    StorageEvent,
+    compress_content,
+    decompress_content,
+    delete_unreferenced_blobs,
+    next_event_seq,
+    store_blob,
+    update_session_summary,
+    utcnow,
+)
+from dasshh.data.reclaimer import SpaceReclaimer
+from dasshh.data.writer import EventWriter
+
+logger = logging.getLogger(__name__)
 
 
 class SessionService:
-    """Dasshh database session service."""
+    """
+    Dasshh database session service.
+
+    With `write_behind`, events are written by a background `EventWriter`. Reading or deleting
+    the events of a session waits for its queued events first, so callers always see their writes.
+
+    With `fast_path`, adding events, reading events and getting the recent session skip the ORM,
+    see `FastPath`. Events are then returned as `EventRecord` and the recent session as a
+    `SessionSummary`, which have the same attributes as the ORM models.
 
-    def __init__(self, db_client: DBClient):
+    With `reclaim_interval`, a background `SpaceReclaimer` gives the space of deleted data back
+    to the disk while no events are being written.
+    """
+
+    def __init__(
+        self,
+        db_client: DBClient,
+        write_behind: bool = False,
+        blob_threshold: int | None = 16 * 1024,
+        fast_path: bool = False,
+        reclaim_interval: float | None = None,
+    ):
+        """
+        Args:
+            db_client: The database client.
+            write_behind: Write events on a background thread.
+            blob_threshold: Event text longer than this many characters is saved once in the blob store
+                and referenced from the event, `None` keeps all text in the events.
+            fast_path: Use plain sqlite3 statements for the hot paths instead of the ORM.
+            reclaim_interval: How often to check for free pages to reclaim while idle, in seconds,
+                `None` leaves them to `DBClient.vacuum`.
+        """
         self.db_client = db_client
+        self.blob_threshold = blob_threshold
+        self._fast_path: FastPath | None = FastPath(db_client) if fast_path else None
+        self._writer: EventWriter | None = (
+            EventWriter(db_client, blob_threshold=blob_threshold, fast_path=self._fast_path) if write_behind else None
+        )
+        self._last_write = time.monotonic()
+        self._reclaimer: SpaceReclaimer | None = (
+            SpaceReclaimer(db_client, self.idle_time, interval=reclaim_interval) if reclaim_interval else None
+        )
+
+    def close(self) -> None:
+        """Write the queued events and stop the background threads."""
+        if self._reclaimer is not None:
+            self._reclaimer.close()
+        if self._writer is not None:
+            self._writer.close()
+
+    def idle_time(self) -> float:
+        """The number of seconds since an event was last added or a session deleted."""
+        return time.monotonic() - self._last_write
+
+    def flush(self, session_id: str | None = None) -> None:
+        """Wait until the queued events, of one session or all sessions, are written."""
+        if self._writer is not None:
+            self._writer.flush(session_id)
 
     def new_session(
         self,
@@ -32,14 +114,42 @@ class SessionService:
                 return None
             return session
 
-    def get_events(self, *, session_id: str) -> list[StorageEvent]:
-        """Get all events for a session."""
+    def get_events(
+        self,
+        *,
+        session_id: str,
+        after_seq: int | None = None,
+        limit: int | None = None,
+        reverse: bool = False,
+    ) -> list[StorageEvent] | list[EventRecord]:
+        """
+        Get the events of a session in order, a page at a time.
+
+        Pages are read with the (session_id, seq) index, so reading a page costs the same
+        however long the session is.
+
+        Args:
+            session_id: The session id.
+            after_seq: Only return events after this sequence number, in the direction of `reverse`.
+            limit: The maximum number of events to return.
+            reverse: Return the newest events first.
+        """
+        self.flush(session_id)
+        if self._fast_path is not None:
+            return self._fast_path.get_events(session_id, after_seq=after_seq, limit=limit, reverse=reverse)
         with self.db_client.get_db() as db:
-            events = db.query(StorageEvent).filter(StorageEvent.session_id == session_id).all()
-            return events
+            query = db.query(StorageEvent).filter(StorageEvent.session_id == session_id)
+            if after_seq is not None:
+                query = query.filter(StorageEvent.seq < after_seq if reverse else StorageEvent.seq > after_seq)
+            query = query.order_by(StorageEvent.seq.desc() if reverse else StorageEvent.seq)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
 
-    def get_recent_session(self) -> StorageSession | None:
+    def get_recent_session(self) -> StorageSession | SessionSummary | None:
         """Get the most recent session."""
+        if self._fast_path is not None:
+            return self._fast_path.get_recent_session()
         with self.db_client.get_db() as db:
             session: StorageSession | None = (
                 db.query(StorageSession).order_by(StorageSession.updated_at.desc()).first()
@@ -63,6 +173,8 @@ class SessionService:
 
     def list_sessions(self, include_events: bool = False) -> list[StorageSession]:
         """List all sessions."""
+        if include_events:
+            self.flush()
         with self.db_client.get_db() as db:
             if include_events:
                 sessions = db.query(StorageSession).all()
@@ -70,13 +182,162 @@ class SessionService:
                 sessions = db.query(StorageSession).options(noload(StorageSession.events)).all()
             return sessions
 
+    def list_session_summaries(self) -> list[SessionSummary]:
+        """
+        List all sessions without their events.
+
+        Only the summary columns are read, so listing sessions costs the same however many
+        events they have.
+        """
+        with self.db_client.get_db() as db:
+            rows = db.execute(
+                select(
+                    StorageSession.id,
+                    StorageSession.detail,
+                    StorageSession.created_at,
+                    StorageSession.updated_at,
+                    StorageSession.message_count,
+                    StorageSession.last_activity_at,
+                    StorageSession.preview,
+                )
+            ).all()
+            return [SessionSummary(*row) for row in rows]
+
+    def get_blob(self, blob_hash: str) -> str | None:
+        """Get the text of a blob by its hash."""
+        with self.db_client.get_db() as db:
+            data = db.execute(select(StorageBlob.data).where(StorageBlob.hash == blob_hash)).scalar()
+        return zlib.decompress(data).decode("utf-8") if data is not None else None
+
+    def load_content(self, content: dict) -> dict:
+        """
+        Get the full content of an event, with the text of a blob in place of its preview.
+
+        Returns:
+            The content itself when it references no blob, otherwise a copy.
+        """
+        blob_hash = content.get("content_blob")
+        if not blob_hash:
+            return content
+        text = self.get_blob(blob_hash)
+        if text is None:
+            logger.warning(f"-- Blob {blob_hash} not found, using the preview --")
+            return content
+        return {key: value for key, value in content.items() if key != "content_blob"} | {"content": text}
+
+    def search(self, query: str, limit: int = 50) -> list[SearchResult]:
+        """
+        Search the text of user, assistant and tool events across all sessions.
+
+        Every word of the query has to match, the last word also matches as a prefix so results
+        can be shown while typing.
+
+        Returns:
+            The best matches first.
+        """
+        terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+        if not terms:
+            return []
+        terms[-1] += "*"
+
+        self.flush()
+        with self.db_client.get_db() as db:
+            rows = db.execute(
+                text(
+                    "SELECT events.session_id, sessions.detail, events.invocation_id, events.seq, "
+                    "json_extract(events.content, '$.role'), "
+                    "snippet(events_fts, 0, :start, :end, '…', 12), events_fts.rank, events.content_z "
+                    "FROM events_fts JOIN events ON events.rowid = events_fts.rowid "
+                    "JOIN sessions ON sessions.id = events.session_id "
+                    "WHERE events_fts MATCH :query ORDER BY events_fts.rank LIMIT :limit"
+                ),
+                {"query": " ".join(terms), "limit": limit, "start": MATCH_START, "end": MATCH_END},
+            ).all()
+        results = []
+        for *columns, content_z in rows:
+            if columns[4] is None and content_z is not None:
+                # archived event, the role is in the compressed content
+                columns[4] = decompress_content(content_z).get("role")
+            results.append(SearchResult(*columns))
+        return results
+
+    def archive_idle_sessions(self, idle_for: timedelta, batch_size: int = 500) -> ArchiveReport:
+        """
+        Compress the events of sessions without activity for a while.
+
+        Archived events keep their place in the session and stay searchable, `get_events`
+        decompresses them. The database file only shrinks after it is vacuumed.
+
+        Args:
+            idle_for: How long a session has to be idle to be archived.
+            batch_size: The number of events compressed per transaction.
+        """
+        self.flush()
+        cutoff = utcnow() - idle_for
+        report = ArchiveReport()
+        with self.db_client.get_db() as db:
+            session_ids = db.execute(
+                select(StorageSession.id).where(
+                    func.coalesce(StorageSession.last_activity_at, StorageSession.updated_at) < cutoff
+                )
+            ).scalars().all()
+
+        for session_id in session_ids:
+            archived = False
+            while True:
+                with self.db_client.get_db() as db:
+                    # events referencing a blob stay uncompressed so the blob cleanup can see the
+                    # reference, their content is only a short preview anyway
+                    rows = db.execute(
+                        text(
+                            "SELECT rowid, content FROM events "
+                            f"WHERE session_id = :session_id AND content IS NOT NULL AND {BLOB_REF} IS NULL "
+                            "LIMIT :limit"
+                        ),
+                        {"session_id": session_id, "limit": batch_size},
+                    ).all()
+                    if not rows:
+                        break
+                    updates = []
+                    for rowid, content in rows:
+                        content_z = compress_content(content)
+                        report.bytes_before += len(content.encode("utf-8"))
+                        report.bytes_after += len(content_z)
+                        updates.append({"rowid": rowid, "content_z": content_z})
+                    db.execute(
+                        text("UPDATE events SET content = NULL, content_z = :content_z WHERE rowid = :rowid"),
+                        updates,
+                    )
+                    db.commit()
+                report.events += len(rows)
+                archived = True
+            report.sessions += archived
+
+        logger.info(
+            f"-- Archived {report.events} events of {report.sessions} sessions, "
+            f"{report.bytes_saved} bytes saved --"
+        )
+        return report
+
     def delete_session(self, *, session_id: str) -> None:
-        """Delete a session by its ID."""
+        """
+        Delete a session by its ID, with its events and the blobs no other event references.
+
+        The events are deleted with a single statement rather than loaded into the ORM first.
+        """
+        self.flush(session_id)
+        self._last_write = time.monotonic()
         with self.db_client.get_db() as db:
-            session = db.get(StorageSession, session_id)
-            if session is None:
-                return
-            db.delete(session)
+            blob_hashes = db.execute(
+                text(
+                    f"SELECT DISTINCT {BLOB_REF} FROM events "
+                    f"WHERE session_id = :session_id AND {BLOB_REF} IS NOT NULL"
+                ),
+                {"session_id": session_id},
+            ).scalars().all()
+            db.execute(delete(StorageEvent).where(StorageEvent.session_id == session_id))
+            db.execute(delete(StorageSession).where(StorageSession.id == session_id))
+            delete_unreferenced_blobs(db, blob_hashes)
             db.commit()
 
     def add_event(
@@ -85,14 +346,35 @@ class SessionService:
         invocation_id: str,
         session_id: str,
         content: dict,
-    ) -> None:
-        """Append an event to a session."""
-        event = StorageEvent(
-            invocation_id=invocation_id,
-            session_id=session_id,
-            content=content,
-        )
+    ) -> Future:
+        """
+        Append an event to a session.
+
+        Returns:
+            A future resolved once the event is committed, already resolved without `write_behind`.
+        """
+        self._last_write = time.monotonic()
+        if self._writer is not None:
+            return self._writer.submit(invocation_id=invocation_id, session_id=session_id, content=content)
+
+        if self._fast_path is not None:
+            row = {"invocation_id": invocation_id, "session_id": session_id, "content": content}
+            self._fast_path.add_events([row], self.blob_threshold)
+        else:
+            self._add_event_orm(invocation_id=invocation_id, session_id=session_id, content=content)
+        future: Future = Future()
+        future.set_result(None)
+        return future
+
+    def _add_event_orm(self, *, invocation_id: str, session_id: str, content: dict) -> None:
+        """Append an event to a session with the ORM."""
         with self.db_client.get_db() as db:
+            event = StorageEvent(
+                invocation_id=invocation_id,
+                session_id=session_id,
+                seq=next_event_seq(db, session_id),
+                content=content if self.blob_threshold is None else store_blob(db, content, self.blob_threshold),
+            )
             db.add(event)
+            update_session_summary(db, session_id, [content])
             db.commit()
-            db.refresh(event)
@@ -0,0 +1,173 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import List
+
+from dasshh.data.client import DBClient
+from dasshh.data.fast_path import FastPath
+from dasshh.data.models import StorageEvent, next_event_seq, store_blob, update_session_summary
+
+logger = logging.getLogger(__name__)
+
+
+class EventWriter:
+    """
+    Writes events to the database on a background thread.
+
+    Events are queued and written in batches, each batch in a single transaction (a group commit),
+    so saving an event does not block the caller on the database. Events are written in the order
+    they were submitted. Every submitted event gets a future that is resolved once the event is
+    committed, for callers that need to know the event is durable.
+    """
+    max_batch: int
+    """The maximum number of events written in a single transaction."""
+    max_delay: float
+    """How long to wait for more events before a batch is written, in seconds."""
+    blob_threshold: int | None
+    """Event text longer than this many characters goes to the blob store, `None` keeps it inline."""
+    fast_path: FastPath | None
+    """Write batches with plain sqlite3 statements instead of the ORM."""
+
+    def __init__(
+        self,
+        db_client: DBClient,
+        max_batch: int = 256,
+        max_delay: float = 0.005,
+        blob_threshold: int | None = None,
+        fast_path: FastPath | None = None,
+    ):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.blob_threshold = blob_threshold
+        self.fast_path = fast_path
+        self._db_client = db_client
+        self._queue: queue.Queue[tuple[dict, Future] | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._last: Future | None = None
+        """The future of the last submitted event."""
+        self._last_by_session: dict[str, Future] = {}
+        """The future of the last submitted event of each session."""
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="dasshh-event-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, *, invocation_id: str, session_id: str, content: dict) -> Future:
+        """
+        Queue an event to be written.
+
+        Returns:
+            A future resolved once the event is committed.
+        """
+        future: Future = Future()
+        row = {"invocation_id": invocation_id, "session_id": session_id, "content": content}
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EventWriter is closed")
+            self._last = future
+            self._last_by_session[session_id] = future
+            self._queue.put((row, future))
+        future.add_done_callback(lambda f: self._forget(session_id, f))
+        return future
+
+    def flush(self, session_id: str | None = None, timeout: float | None = None) -> None:
+        """
+        Wait until the queued events are written.
+
+        Args:
+            session_id: Only wait for the events of this session.
+            timeout: The maximum time to wait, in seconds.
+        """
+        with self._lock:
+            future = self._last if session_id is None else self._last_by_session.get(session_id)
+        if future is not None:
+            # errors are logged by the writer, callers of flush only need the events out of the queue
+            future.exception(timeout=timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Write the queued events and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _forget(self, session_id: str, future: Future) -> None:
+        """Drop the future of a written event unless a newer event was submitted."""
+        with self._lock:
+            if self._last_by_session.get(session_id) is future:
+                del self._last_by_session[session_id]
+            if self._last is future:
+                self._last = None
+
+    def _run(self) -> None:
+        """Write batches until the writer is closed."""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=self.max_delay)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[tuple[dict, Future]]) -> None:
+        """
+        Write a batch of events in a single transaction.
+
+        The events of a batch can belong to any session, so when the transaction fails the events
+        are written again one by one, and only the ones that still fail get the error.
+        """
+        try:
+            self._write_rows([row for row, _ in batch])
+        except Exception as e:
+            if len(batch) > 1:
+                logger.warning(f"-- Failed to write {len(batch)} events, writing them one by one: {e} --")
+                for item in batch:
+                    self._write([item])
+                return
+            row, future = batch[0]
+            logger.error(f"-- Failed to write an event of session {row['session_id']}: {e} --")
+            future.set_exception(e)
+            return
+
+        for _, future in batch:
+            future.set_result(None)
+
+    def _write_rows(self, rows: List[dict]) -> None:
+        """Write events in a single transaction."""
+        if self.fast_path is not None:
+            self.fast_path.add_events(rows, self.blob_threshold)
+        else:
+            self._write_orm(rows)
+
+    def _write_orm(self, rows: List[dict]) -> None:
+        """Write a batch of events with the ORM."""
+        with self._db_client.get_db() as db:
+            seqs: dict[str, int] = {}
+            contents: dict[str, List[dict]] = {}
+            events = []
+            for row in rows:
+                session_id = row["session_id"]
+                seq = seqs.get(session_id) or next_event_seq(db, session_id)
+                seqs[session_id] = seq + 1
+                content = row["content"]
+                contents.setdefault(session_id, []).append(content)
+                if self.blob_threshold is not None:
+                    content = store_blob(db, content, self.blob_threshold)
+                events.append(
+                    StorageEvent(invocation_id=row["invocation_id"], session_id=session_id, seq=seq, content=content)
+                )
+            db.add_all(events)
+            for session_id, session_contents in contents.items():
+                update_session_summary(db, session_id, session_contents)
+            db.commit()
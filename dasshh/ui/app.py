@@ -5,7 +5,9 @@ from dasshh.ui.screens.main import MainScreen
 from dasshh.data.client import DBClient
 from dasshh.data.session import SessionService
 from dasshh.core.runtime import DasshhRuntime
-from dasshh.ui.utils import load_tools, load_config
+from dasshh.core.tools.manifest import ToolManifest
+from dasshh.core.config import Config, config_store, get_config
+from dasshh.ui.utils import DEFAULT_TOOLS_PATH, load_tools, load_config, save_tool_manifest
 from dasshh.ui.theme import lime_theme
 
 
@@ -29,13 +31,27 @@ class Dasshh(App):
     session_service: SessionService
     """The database service."""
 
+    tool_manifest: ToolManifest
+    """The cached tools of the tool directories."""
+
+    config_check_interval: float = 2.0
+    """How often the configuration file is checked for changes, in seconds."""
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         load_config()
-        load_tools()
+        config = get_config()
+        self.tool_manifest = load_tools()
 
-        self.session_service = SessionService(DBClient())
-        self.runtime = DasshhRuntime(self.session_service)
+        db_config = config.db
+        self.session_service = SessionService(
+            DBClient(config=db_config.model_dump()),
+            write_behind=db_config.write_behind,
+            blob_threshold=db_config.blob_threshold_kb * 1024,
+            fast_path=db_config.fast_path,
+            reclaim_interval=db_config.reclaim_interval or None,
+        )
+        self.runtime = DasshhRuntime(self.session_service, config)
         self.logger = logging.getLogger("dasshh.app")
         self.logger.debug("-- Dasshh 🗲 initialized --")
 
@@ -44,11 +60,37 @@ class Dasshh(App):
         self.theme = "lime"
         self.logger.debug("Pushing main screen")
         self.push_screen("main")
-        await self.runtime.start()
+        # litellm is loaded in the background, once the first frame is drawn
+        self.call_after_refresh(self.runtime.start)
+        config_store.subscribe(self._on_config_change)
+        self.set_interval(self.config_check_interval, config_store.refresh)
 
     async def on_unmount(self):
         self.logger.debug("Application shutting down")
+        config_store.unsubscribe(self._on_config_change)
         await self.runtime.stop()
+        self.session_service.close()
+        # the runtime has built the declarations of the tools imported this time
+        save_tool_manifest(self.tool_manifest)
+
+    def _on_config_change(self, previous: Config, config: Config) -> None:
+        """Apply a change of the configuration file without a restart."""
+        try:
+            self.runtime.apply_config(config)
+        except ValueError as e:
+            self.notify(f"Configuration not applied: {e}", severity="error")
+            return
+
+        previous_dirs = previous.dasshh.tool_directories or [DEFAULT_TOOLS_PATH]
+        added_dirs = [d for d in config.dasshh.tool_directories or [DEFAULT_TOOLS_PATH] if d not in previous_dirs]
+        if added_dirs:
+            try:
+                load_tools(self.tool_manifest, added_dirs)
+            except ValueError as e:
+                self.notify(f"Tools not loaded: {e}", severity="error")
+        if config.db != previous.db:
+            self.logger.info("-- Database settings take effect after a restart --")
+        self.notify("Configuration reloaded")
 
 
 if __name__ == "__main__":
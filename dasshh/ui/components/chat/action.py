@@ -6,6 +6,8 @@ from rich.syntax import Syntax
 from rich.console import Group
 from rich.text import Text
 
+from dasshh.ui.events import LoadActionResult
+
 
 class Action(Static):
     """A action display component."""
@@ -32,15 +34,23 @@ class Action(Static):
         args: str,
         result: str,
         *a: Any,
+        result_blob: str | None = None,
         **kw: Any,
     ) -> None:
         super().__init__(*a, **kw)
         self.invocation_id = invocation_id
         self.tool_call_id = tool_call_id
+        self.result_blob = result_blob
+        """The blob with the full result, while only the start of it is shown."""
         self.name = name
         self.args = args
         self.result = result
 
+    def on_click(self) -> None:
+        """Load the full result when only the start of it is shown."""
+        if self.result_blob:
+            self.post_message(LoadActionResult(self.invocation_id, self.tool_call_id, self.result_blob))
+
     def render(self):
         tool_call_title = Text(f"󰓦 Using tool: {self.name}", style="bold green")
         panel_color = self.app.get_css_variables().get("panel", "")
@@ -49,6 +59,15 @@ class Action(Static):
         if self.result:
             result_title = Text(f"󰄬 Result: {self.name}", style="bold blue")
             result_syntax = Syntax(self.result, "json", background_color=panel_color, word_wrap=True)
+            if self.result_blob:
+                return Group(
+                    tool_call_title,
+                    args_syntax,
+                    Text(""),
+                    result_title,
+                    result_syntax,
+                    Text("… click to show the full result", style="dim italic"),
+                )
             return Group(
                 tool_call_title,
                 args_syntax,
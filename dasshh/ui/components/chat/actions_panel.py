@@ -9,6 +9,8 @@ from dasshh.ui.types import UIAction
 
 
 class ActionsPanel(Widget):
+    """Panel listing the tool calls of the current session."""
+
     DEFAULT_CSS = """
     ActionsPanel {
         border: round $secondary;
@@ -39,6 +41,11 @@ class ActionsPanel(Widget):
     }
     """
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._actions: dict[tuple[str, str], Action] = {}
+        """The mounted action widgets, by invocation id and tool call id."""
+
     def compose(self) -> ComposeResult:
         yield Static("Actions", id="actions-header")
         yield ScrollableContainer(id="actions-container")
@@ -51,10 +58,12 @@ class ActionsPanel(Widget):
         """Reset the actions panel."""
         container = self.query_one("#actions-container")
         container.remove_children()
+        self._actions.clear()
 
     def load_actions(self, actions: List[UIAction]):
         container = self.query_one("#actions-container", ScrollableContainer)
         container.remove_children()
+        self._actions.clear()
         for action in actions:
             self.add_action(action)
         container.scroll_end()
@@ -62,31 +71,45 @@ class ActionsPanel(Widget):
     def add_action(self, action: UIAction) -> None:
         """Add a action to the actions panel."""
         container = self.query_one("#actions-container", ScrollableContainer)
+        container.mount(self._create_widget(action))
+        container.scroll_end()
+
+    def prepend_actions(self, actions: List[UIAction]) -> None:
+        """Add actions older than the ones shown, above them."""
+        if not actions:
+            return
+        container = self.query_one("#actions-container", ScrollableContainer)
+        widgets = [self._create_widget(action) for action in actions]
+        if container.children:
+            container.mount(*widgets, before=0)
+        else:
+            container.mount(*widgets)
+
+    def _create_widget(self, action: UIAction) -> Action:
+        """Create the widget of an action."""
         action_widget = Action(
             invocation_id=action.invocation_id,
             tool_call_id=action.tool_call_id,
             name=action.name,
             args=action.args,
             result=action.result,
+            result_blob=action.result_blob,
         )
-        container.mount(action_widget)
-        container.scroll_end()
+        self._actions[(action.invocation_id, action.tool_call_id)] = action_widget
+        return action_widget
 
     def update_action(self, invocation_id: str, tool_call_id: str, result: str) -> None:
         """Update an action in the actions panel."""
         action_widget = self.get_action_widget(invocation_id, tool_call_id)
         if action_widget:
+            action_widget.result_blob = None
             action_widget.result = result
             container = self.query_one("#actions-container", ScrollableContainer)
             container.scroll_end()
 
     def get_action_widget(self, invocation_id: str, tool_call_id: str) -> Action | None:
         """Get an action widget by invocation id and tool call id."""
-        container = self.query_one("#actions-container", ScrollableContainer)
-        for action in container.query(Action):
-            if action.invocation_id == invocation_id and action.tool_call_id == tool_call_id:
-                return action
-        return None
+        return self._actions.get((invocation_id, tool_call_id))
 
     def handle_error(self, error: str) -> None:
         """Handle an error during an action by showing a toast notification."""
@@ -3,11 +3,11 @@ from typing import List
 from textual.widget import Widget
 from textual.widgets import Static
 from textual.app import ComposeResult
-from textual.containers import ScrollableContainer
 from rich.text import Text
 from dasshh.ui.types import UIMessage
 
 from dasshh.ui.components.chat.message import ChatMessage
+from dasshh.ui.components.chat.message_list import MessageList
 from dasshh.ui.components.chat.chat_input import ChatInput
 
 
@@ -34,7 +34,7 @@ class ChatPanel(Widget):
             text-style: bold;
         }
 
-        ScrollableContainer {
+        MessageList {
             scrollbar-color: $secondary $background;
             scrollbar-background: $background;
             scrollbar-corner-color: $background;
@@ -46,17 +46,22 @@ class ChatPanel(Widget):
 
     def compose(self) -> ComposeResult:
         yield Static("Chat", id="chat-header")
-        yield ScrollableContainer(id="messages-container")
+        yield MessageList(id="messages-container")
         yield ChatInput(id="chat-input")
 
     def on_show(self) -> None:
         """Chat panel shown."""
         self.query_one("#messages-container").scroll_end(animate=False)
 
+    @property
+    def message_list(self) -> MessageList:
+        """Get the message list."""
+        return self.query_one("#messages-container", MessageList)
+
     def reset(self) -> None:
         """Reset the chat panel."""
-        container = self.query_one("#messages-container")
-        container.remove_children()
+        container = self.message_list
+        container.clear()
 
         text = Static(Text("Start a new session or load a previous one.", style="dim"), classes="chat-message")
         text.styles.text_align = "center"
@@ -66,45 +71,24 @@ class ChatPanel(Widget):
         chat_input = self.query_one(ChatInput)
         chat_input.disable()
 
-    def load_messages(self, messages: List[UIMessage]) -> None:
-        """Load messages from a previous chat session."""
-        container = self.query_one("#messages-container")
-        container.remove_children()
-        for message in messages:
-            self.add_new_message(message)
+    def load_messages(self, messages: List[UIMessage], more_above: bool = False) -> None:
+        """Load messages from a previous chat session, `more_above` if older messages are not loaded yet."""
+        self.message_list.set_messages(messages, more_above=more_above)
         chat_input = self.query_one(ChatInput)
         chat_input.enable()
 
+    def load_older_messages(self, messages: List[UIMessage], more_above: bool = False) -> None:
+        """Add messages older than the ones shown, `more_above` if there are still older ones."""
+        self.message_list.prepend_messages(messages, more_above=more_above)
+
     def add_new_message(self, message: UIMessage) -> None:
         """Add a new message to the chat history."""
-        container = self.query_one("#messages-container")
-        message_widget = ChatMessage(
-            invocation_id=message.invocation_id,
-            role=message.role,
-            content=message.content,
-            classes="chat-message"
-        )
-        container.mount(message_widget)
-        container.scroll_end()
+        self.message_list.add_message(message)
 
     def update_assistant_message(self, *, invocation_id: str, content: str, final: bool = False) -> None:
         """Update the content of the most recent assistant message (used for streaming)."""
-        message_widget = self.get_message_widget(invocation_id)
-        if not message_widget:
-            return
-
-        if final:
-            message_widget.content = content
-        else:
-            message_widget.content += content
-
-        container = self.query_one("#messages-container")
-        container.scroll_end()
+        self.message_list.update_message(invocation_id=invocation_id, content=content, final=final)
 
     def get_message_widget(self, invocation_id: str) -> ChatMessage | None:
-        """Get the message widget for a given invocation id."""
-        container = self.query_one("#messages-container")
-        for message in container.query(ChatMessage):
-            if message.invocation_id == invocation_id:
-                return message
-        return None
+        """Get the message widget for a given invocation id, if it is in view."""
+        return self.message_list.get_message_widget(invocation_id)
@@ -6,6 +6,7 @@ from textual.reactive import reactive
 from rich.console import Group
 from rich.text import Text
 
+from dasshh.data.models import MATCH_END, MATCH_START
 from dasshh.ui.events import LoadSession, DeleteSession
 
 
@@ -58,6 +59,8 @@ class HistoryItem(Static):
     """
 
     detail: reactive[str] = reactive("", layout=True)
+    message_count: reactive[int] = reactive(0)
+    preview: reactive[str | None] = reactive(None, layout=True)
     selected: reactive[bool] = reactive(False, layout=True)
 
     def __init__(
@@ -65,6 +68,8 @@ class HistoryItem(Static):
         session_id: str,
         detail: str,
         created_at: datetime,
+        message_count: int = 0,
+        preview: str | None = None,
         *args: Any,
         **kwargs: Any
     ) -> None:
@@ -72,6 +77,15 @@ class HistoryItem(Static):
         self.session_id = session_id
         self.detail = detail
         self.created_at = created_at
+        self.message_count = message_count
+        self.preview = preview
+
+    def add_message(self, content: str) -> None:
+        """Count a new message of the session and show it as the preview."""
+        self.created_at = datetime.now(timezone.utc)
+        if content:
+            self.preview = content
+        self.message_count += 1
 
     def watch_selected(self, selected: bool) -> None:
         """Watch for changes to the selected state."""
@@ -98,11 +112,55 @@ class HistoryItem(Static):
             date_str = f"Yesterday at {time_str}"
         else:
             date_str = local_timestamp.strftime("%b %d at %I:%M %p")
+        if self.message_count:
+            date_str += f" · {self.message_count} message{'s' if self.message_count != 1 else ''}"
 
         title = Text(truncated_detail, style="bold")
         date = Text(date_str, style="dim")
+        if not self.preview:
+            return Group(title, date)
 
+        first_line = self.preview.strip().split("\n", 1)[0]
+        preview = Text((first_line[:40] + "...") if len(first_line) > 40 else first_line, style="italic")
         return Group(
             title,
+            preview,
             date
         )
+
+
+class SearchResultItem(Static):
+    """A search match in a chat session."""
+
+    DEFAULT_CSS = """
+    SearchResultItem {
+        margin-top: 1;
+        padding: 0 1;
+    }
+    """
+
+    def __init__(self, session_id: str, detail: str, role: str, snippet: str, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.session_id = session_id
+        self.detail = detail
+        self.role = role
+        self.snippet = snippet
+
+    def on_click(self) -> None:
+        """Handle click events on this widget."""
+        self.post_message(LoadSession(self.session_id))
+
+    def render(self):
+        truncated_detail = (self.detail[:40] + "...") if len(self.detail) > 40 else self.detail
+
+        snippet = Text(f"{self.role}: ", style="dim")
+        for part in self.snippet.split(MATCH_START):
+            match, _, rest = part.rpartition(MATCH_END)
+            if match:
+                snippet.append(match, style="bold reverse")
+            snippet.append(rest)
+
+        return Group(
+            Text(truncated_detail, style="bold"),
+            snippet,
+        )
@@ -1,14 +1,15 @@
 from typing import List
 
+from textual.timer import Timer
 from textual.widget import Widget
-from textual.widgets import Static, Button
+from textual.widgets import Static, Button, Input
 from textual.app import ComposeResult
 from textual.containers import ScrollableContainer
 from textual import on
 
-from dasshh.ui.events import NewSession, DeleteSession
-from dasshh.ui.components.chat.history_item import HistoryItem, DeleteIcon
-from dasshh.ui.types import UISession
+from dasshh.ui.events import NewSession, DeleteSession, SearchSessions
+from dasshh.ui.components.chat.history_item import HistoryItem, DeleteIcon, SearchResultItem
+from dasshh.ui.types import UISession, UISearchResult
 
 
 class HistoryPanel(Widget):
@@ -27,11 +28,34 @@ class HistoryPanel(Widget):
             text-style: bold;
         }
 
-        #history-container {
+        #history-container, #search-results {
             height: 1fr;
             margin: 1;
         }
 
+        #search-results {
+            display: none;
+        }
+
+        &.-searching {
+            #history-container {
+                display: none;
+            }
+
+            #search-results {
+                display: block;
+            }
+        }
+
+        #history-search {
+            border: round $secondary;
+            background: $background;
+
+            &:focus {
+                border: round $primary;
+            }
+        }
+
         #new-session {
             width: 100%;
             min-width: 10;
@@ -61,6 +85,18 @@ class HistoryPanel(Widget):
             scrollbar-gutter: stable;
         }
 
+        SearchResultItem {
+            width: 100%;
+            height: auto;
+            border-left: thick $accent-darken-2;
+            background: $panel-darken-1;
+
+            &:hover {
+                border-left: thick $accent;
+                background: $panel 20%;
+            }
+        }
+
         HistoryItem, DeleteIcon {
             width: 100%;
             height: auto;
@@ -80,9 +116,22 @@ class HistoryPanel(Widget):
     }
     """
 
+    search_delay: float = 0.15
+    """How long to wait after the last key press before searching, in seconds."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._items: dict[str, tuple[HistoryItem, DeleteIcon]] = {}
+        """The mounted history item and delete icon of each session."""
+        self._current: str | None = None
+        """The id of the selected session."""
+        self._search_timer: Timer | None = None
+
     def compose(self) -> ComposeResult:
         yield Static("Sessions", id="history-header")
+        yield Input(placeholder="Search", id="history-search")
         yield ScrollableContainer(id="history-container")
+        yield ScrollableContainer(id="search-results")
         yield Button("New Session", id="new-session")
 
     def on_show(self) -> None:
@@ -94,63 +143,96 @@ class HistoryPanel(Widget):
         """Handle button presses."""
         self.post_message(NewSession())
 
+    @on(Input.Changed, "#history-search")
+    def on_search_changed(self, event: Input.Changed) -> None:
+        """Search once typing pauses, an empty query shows the sessions again."""
+        if self._search_timer is not None:
+            self._search_timer.stop()
+            self._search_timer = None
+
+        query = event.value.strip()
+        if not query:
+            self.remove_class("-searching")
+            self.query_one("#search-results").remove_children()
+            return
+        self._search_timer = self.set_timer(self.search_delay, lambda: self.post_message(SearchSessions(query)))
+
+    def show_search_results(self, query: str, results: List[UISearchResult]) -> None:
+        """Show search results in place of the sessions, unless the query was changed since."""
+        if query != self.query_one("#history-search", Input).value.strip():
+            return
+        container = self.query_one("#search-results", ScrollableContainer)
+        container.remove_children()
+        if results:
+            container.mount_all(
+                SearchResultItem(
+                    session_id=result.session_id,
+                    detail=result.detail,
+                    role=result.role,
+                    snippet=result.snippet,
+                )
+                for result in results
+            )
+        else:
+            container.mount(Static("No results", classes="no-results"))
+        container.scroll_home(animate=False)
+        self.add_class("-searching")
+
     @on(DeleteSession)
     def on_delete_session(self, event: DeleteSession) -> None:
         """Handle session deletion request."""
-        item = self.get_history_item_widget(event.session_id)
-        if item:
-            item.remove()
-
-        container = self.query_one("#history-container", ScrollableContainer)
-        for item in container.query(DeleteIcon):
-            if item.session_id == event.session_id:
-                item.remove()
-                break
+        widgets = self._items.pop(event.session_id, None)
+        if widgets:
+            for widget in widgets:
+                widget.remove()
+        if self._current == event.session_id:
+            self._current = None
 
     def load_sessions(self, sessions: List[UISession], current: str) -> None:
         """Load session history from a list of sessions."""
         container = self.query_one("#history-container", ScrollableContainer)
         container.remove_children()
+        self._items.clear()
+        self._current = None
 
         for session in sessions:
-            history_item = HistoryItem(
-                session_id=session.id,
-                detail=session.detail,
-                created_at=session.updated_at,
-            )
-            delete_icon = DeleteIcon(session_id=session.id)
-            # Mark current session
-            if session.id == current:
-                history_item.selected = True
-                delete_icon.selected = True
-            container.mount(history_item, delete_icon)
+            self._mount_session(container, session)
+        self.set_current_session(current)
         container.scroll_end()
 
     def add_session(self, session: UISession) -> None:
         """Add a session to the history panel."""
         container = self.query_one("#history-container", ScrollableContainer)
+        self._mount_session(container, session)
+        container.scroll_end()
+
+    def _mount_session(self, container: ScrollableContainer, session: UISession) -> None:
+        """Mount the history item and delete icon of a session."""
         history_item = HistoryItem(
             session_id=session.id,
             detail=session.detail,
-            created_at=session.updated_at,
+            created_at=session.last_activity_at or session.updated_at,
+            message_count=session.message_count,
+            preview=session.preview,
         )
         delete_icon = DeleteIcon(session_id=session.id)
+        self._items[session.id] = (history_item, delete_icon)
         container.mount(history_item, delete_icon)
-        container.scroll_end()
 
     def set_current_session(self, session_id: str) -> None:
         """Set the current selected session."""
-        # Update selected state for all items
-        container = self.query_one("#history-container", ScrollableContainer)
-        for item in container.query(HistoryItem):
-            item.selected = item.session_id == session_id
-        for item in container.query(DeleteIcon):
-            item.selected = item.session_id == session_id
+        # only the previously selected session and the new one change
+        previous = self._items.get(self._current) if self._current else None
+        if previous:
+            for widget in previous:
+                widget.selected = False
+        current = self._items.get(session_id)
+        if current:
+            for widget in current:
+                widget.selected = True
+        self._current = session_id
 
     def get_history_item_widget(self, session_id: str) -> HistoryItem | None:
         """Get a history item widget by session id."""
-        container = self.query_one("#history-container", ScrollableContainer)
-        for item in container.query(HistoryItem):
-            if item.session_id == session_id:
-                return item
-        return None
+        widgets = self._items.get(session_id)
+        return widgets[0] if widgets else None
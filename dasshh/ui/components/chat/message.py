@@ -1,10 +1,11 @@
 from textual.reactive import reactive
 from textual.widgets import Static
-from rich.markdown import Markdown
 from rich.console import Group
 from rich.text import Text
 from typing import Any
 
+from dasshh.ui.components.chat.streaming_markdown import StreamingMarkdown
+
 
 class ChatMessage(Static):
     """A chat message display component."""
@@ -38,6 +39,7 @@ class ChatMessage(Static):
 
     def __init__(self, invocation_id: str, role: str, content: str, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
+        self._markdown = StreamingMarkdown()
         self.invocation_id = invocation_id
         if role == "user":
             self.role = "you"
@@ -48,6 +50,14 @@ class ChatMessage(Static):
         # Add CSS class based on role
         self.add_class(role)
 
+    def on_mount(self) -> None:
+        self.app.theme_changed_signal.subscribe(self, self._on_theme_changed)
+
+    def _on_theme_changed(self, _) -> None:
+        """Render the markdown again with the new theme."""
+        self._markdown.clear_cache()
+        self.refresh(layout=True)
+
     def render(self):
         # Show typing indicator if the message is from assistant but empty
         if self.role == "dasshh" and not self.content:
@@ -57,7 +67,7 @@ class ChatMessage(Static):
         role_style = "bold #ffff8d" if self.role == "you" else "bold #76ff03"
 
         title = Text(f"{role_icon} {self.role.capitalize()}", style=role_style)
-        text = Markdown(self.content) if self.content else Text("")
+        text = self._markdown.update(self.content) if self.content else Text("")
 
         return Group(
             title,
@@ -0,0 +1,320 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, List
+
+from textual.app import ComposeResult
+from textual.containers import ScrollableContainer
+from textual.widgets import Static
+
+from dasshh.ui.components.chat.message import ChatMessage
+from dasshh.ui.events import LoadOlderMessages
+from dasshh.ui.types import UIMessage
+
+
+class MessageList(ScrollableContainer):
+    """
+    A scrollable list of chat messages that only mounts the messages in view.
+
+    Messages outside the visible window (plus `overscan` messages on each side) are not mounted,
+    the space they take up is filled by a spacer above and below the window. Heights are estimated
+    from the message text until a message is mounted and measured. While the list is scrolled to
+    the end it follows new content, otherwise the scroll position is kept.
+
+    A long session is loaded a page at a time. While `more_above` is set, scrolling to the top
+    posts `LoadOlderMessages`, and the older messages are added with `prepend_messages`.
+    """
+
+    DEFAULT_CSS = """
+    MessageList > .spacer {
+        height: 0;
+        margin: 0;
+        padding: 0;
+    }
+    """
+
+    overscan: int = 3
+    """The number of messages mounted above and below the visible window."""
+    more_above: bool = False
+    """Whether the session has older messages that are not loaded yet."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._messages: List[UIMessage] = []
+        self._heights: List[int] = []
+        """The height of each message, estimated until the message is mounted and measured."""
+        self._offsets: List[int] | None = None
+        """The cumulative heights, `None` when they need to be computed again."""
+        self._widgets: dict[int, ChatMessage] = {}
+        """The mounted message widgets, by message index."""
+        self._index: dict[str, int] = {}
+        """The index of the latest assistant message of each invocation."""
+        self._window = range(0, 0)
+        self._follow = True
+        self._top_spacer = Static(classes="spacer")
+        self._bottom_spacer = Static(classes="spacer")
+
+    def compose(self) -> ComposeResult:
+        yield self._top_spacer
+        yield self._bottom_spacer
+
+    # -- Data --
+
+    @property
+    def messages(self) -> List[UIMessage]:
+        """The messages in the list, callers must not modify it."""
+        return self._messages
+
+    def clear(self) -> None:
+        """Remove all messages and any other content."""
+        for child in list(self.children):
+            if child is not self._top_spacer and child is not self._bottom_spacer:
+                child.remove()
+        self._messages = []
+        self._heights = []
+        self._offsets = None
+        self._widgets = {}
+        self._index = {}
+        self._window = range(0, 0)
+        self._follow = True
+        self.more_above = False
+        self._update_spacers()
+
+    def set_messages(self, messages: List[UIMessage], more_above: bool = False) -> None:
+        """
+        Replace all messages and scroll to the end.
+
+        Args:
+            messages: The messages, oldest first.
+            more_above: Whether the session has older messages than these.
+        """
+        self.clear()
+        self._messages = list(messages)
+        for index, message in enumerate(self._messages):
+            self._index_message(index, message)
+        self._heights = [self._estimate_height(message) for message in self._messages]
+        self._offsets = None
+        self.more_above = more_above
+        self._refresh_window()
+        self.call_after_refresh(self.scroll_end, animate=False)
+        self.call_after_refresh(self._check_fills_view)
+
+    def prepend_messages(self, messages: List[UIMessage], more_above: bool = False) -> None:
+        """
+        Add messages older than the loaded ones, keeping the scroll position.
+
+        Args:
+            messages: The messages, oldest first.
+            more_above: Whether the session has older messages than these.
+        """
+        self.more_above = more_above
+        count = len(messages)
+        if not count:
+            return
+
+        self._messages[:0] = messages
+        self._index = {invocation_id: index + count for invocation_id, index in self._index.items()}
+        for index, message in enumerate(messages):
+            # an invocation that continues on the newer page keeps its latest message
+            if message.invocation_id not in self._index:
+                self._index_message(index, message)
+        heights = [self._estimate_height(message) for message in messages]
+        self._heights[:0] = heights
+        self._offsets = None
+        self._widgets = {index + count: widget for index, widget in self._widgets.items()}
+        self._window = range(self._window.start + count, self._window.stop + count)
+        self._update_spacers()
+
+        if self._follow:
+            self._refresh_window()
+        else:
+            # the spacer above the view grew, move down with it once the layout is updated
+            y = self.scroll_y + sum(heights)
+            self.call_after_refresh(self._scroll_to_loaded, y)
+        self.call_after_refresh(self._check_fills_view)
+
+    def add_message(self, message: UIMessage) -> None:
+        """Append a message."""
+        self._messages.append(message)
+        self._index_message(len(self._messages) - 1, message)
+        self._heights.append(self._estimate_height(message))
+        self._offsets = None
+        self._refresh_window()
+        if self._follow:
+            self.scroll_end(animate=False)
+
+    def update_message(self, *, invocation_id: str, content: str, final: bool = False) -> ChatMessage | None:
+        """
+        Update the content of an assistant message (used for streaming).
+
+        Returns:
+            The widget of the message, if it is mounted.
+        """
+        index = self._find_message(invocation_id)
+        if index is None:
+            return None
+
+        message = self._messages[index]
+        message.content = content if final else message.content + content
+        widget = self._widgets.get(index)
+        if widget is not None:
+            widget.content = message.content
+            self.call_after_refresh(self._measure)
+        else:
+            self._heights[index] = self._estimate_height(message)
+            self._offsets = None
+            self._update_spacers()
+
+        if self._follow:
+            self.scroll_end(animate=False)
+        return widget
+
+    def get_message_widget(self, invocation_id: str) -> ChatMessage | None:
+        """Get the widget of an assistant message, if it is mounted."""
+        index = self._find_message(invocation_id)
+        if index is None:
+            return None
+        return self._widgets.get(index)
+
+    def _index_message(self, index: int, message: UIMessage) -> None:
+        """Index an assistant message by its invocation, streamed content only goes to assistant messages."""
+        if message.invocation_id and message.role == "assistant":
+            self._index[message.invocation_id] = index
+
+    def _find_message(self, invocation_id: str) -> int | None:
+        """Find the most recent assistant message of an invocation."""
+        return self._index.get(invocation_id)
+
+    def _scroll_to_loaded(self, y: float) -> None:
+        """Scroll to where the view was before older messages were added above it."""
+        self.scroll_to(y=y, animate=False)
+        self._refresh_window()
+
+    def _check_top(self) -> None:
+        """Ask for older messages when the list is scrolled to the top."""
+        if self.more_above and self.scroll_y <= 0:
+            self.more_above = False
+            self.post_message(LoadOlderMessages())
+
+    def _check_fills_view(self) -> None:
+        """Ask for older messages when the messages do not fill the view, it can not be scrolled up then."""
+        if self.max_scroll_y <= 0:
+            self._check_top()
+
+    # -- Windowing --
+
+    def _estimate_height(self, message: UIMessage) -> int:
+        """Estimate the height of a message from its text."""
+        width = max((self.size.width or 80) - 12, 10)
+        lines = sum(len(line) // width + 1 for line in message.content.split("\n"))
+        # title, padding and the margin shared with the next message
+        return lines + 4
+
+    def _get_offsets(self) -> List[int]:
+        """Get the cumulative heights, the first offset is 0."""
+        if self._offsets is None:
+            self._offsets = [0, *accumulate(self._heights)]
+        return self._offsets
+
+    def _visible_range(self) -> range:
+        """Get the range of messages to mount for the current scroll position."""
+        count = len(self._messages)
+        if not count:
+            return range(0, 0)
+
+        offsets = self._get_offsets()
+        height = self.size.height or 40
+        top = offsets[-1] - height if self._follow else self.scroll_y
+        top = max(top, 0)
+        start = max(bisect_right(offsets, top) - 1, 0)
+        end = min(bisect_right(offsets, top + height), count)
+        return range(max(start - self.overscan, 0), min(end + self.overscan, count))
+
+    def _refresh_window(self) -> None:
+        """Mount the messages in view and remove the ones out of view."""
+        window = self._visible_range()
+        if window == self._window:
+            self._update_spacers()
+            return
+
+        for index in [index for index in self._widgets if index not in window]:
+            self._widgets.pop(index).remove()
+
+        before = [index for index in window if index not in self._widgets and index < self._window.start]
+        after = [index for index in window if index not in self._widgets and index not in before]
+        if not self._widgets:
+            before, after = [], list(window)
+
+        if before:
+            self.mount(*self._create_widgets(before), after=self._top_spacer)
+        if after:
+            self.mount(*self._create_widgets(after), before=self._bottom_spacer)
+
+        self._window = window
+        self._update_spacers()
+        self.call_after_refresh(self._measure)
+
+    def _create_widgets(self, indexes: List[int]) -> List[ChatMessage]:
+        """Create the widgets for messages."""
+        widgets = []
+        for index in indexes:
+            message = self._messages[index]
+            widget = ChatMessage(
+                invocation_id=message.invocation_id,
+                role=message.role,
+                content=message.content,
+                classes="chat-message",
+            )
+            self._widgets[index] = widget
+            widgets.append(widget)
+        return widgets
+
+    def _update_spacers(self) -> None:
+        """Size the spacers to the messages above and below the window."""
+        offsets = self._get_offsets()
+        if self._window:
+            top = offsets[self._window.start]
+            bottom = offsets[-1] - offsets[self._window.stop]
+        else:
+            top, bottom = 0, 0
+        self._top_spacer.styles.height = top
+        self._bottom_spacer.styles.height = bottom
+
+    def _measure(self) -> None:
+        """Measure the mounted messages, keeping the scroll position when messages above the view change."""
+        offsets = self._get_offsets()
+        shift = 0
+        changed = False
+        for index, widget in self._widgets.items():
+            if not widget.is_mounted or not widget.outer_size.height:
+                continue
+            height = widget.outer_size.height + 1
+            if height == self._heights[index]:
+                continue
+            if offsets[index + 1] <= self.scroll_y:
+                shift += height - self._heights[index]
+            self._heights[index] = height
+            changed = True
+
+        if not changed:
+            return
+        self._offsets = None
+        if self._follow:
+            self.scroll_end(animate=False)
+        elif shift:
+            self.scroll_to(y=self.scroll_y + shift, animate=False)
+
+    # -- Events --
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if new_value < old_value:
+            self._follow = new_value >= self.max_scroll_y - 1
+        elif new_value >= self.max_scroll_y - 1:
+            self._follow = True
+        self._refresh_window()
+        if new_value < old_value:
+            self._check_top()
+
+    def on_resize(self) -> None:
+        self._refresh_window()
+        self.call_after_refresh(self._measure)
@@ -0,0 +1,188 @@
+import re
+from typing import List
+
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.markdown import Markdown
+from rich.segment import Segment
+
+FENCES = ("```", "~~~")
+
+LIST_ITEM = re.compile(r"\s{0,3}(?:[-+*]|\d{1,9}[.)])(?:\s|$)")
+"""The start of a bullet or ordered list item."""
+THEMATIC_BREAK = re.compile(r"\s{0,3}([-*_])(?:\s*\1){2,}\s*")
+"""A horizontal rule, which is not followed by a blank line when rendered."""
+PARTIAL_LIST_ITEM = re.compile(r"\s{0,3}(?:[-+*]|\d{1,9}[.)]?)$")
+"""A streamed line that may still turn out to start a list item."""
+LINK_DEFINITION = re.compile(r"^ {0,3}\[[^\]\n]+\]:", re.MULTILINE)
+"""A link reference definition, which applies to links in every block of the document."""
+
+
+def _continues(first: str, line: str, complete: bool) -> bool:
+    """
+    Whether a line after a blank line still belongs to the block starting with `first`.
+
+    Lists, block quotes and indented code can span blank lines, other blocks end at one.
+    """
+    if LIST_ITEM.match(first):
+        return (
+            bool(LIST_ITEM.match(line))
+            or line.startswith((" ", "\t"))
+            or (not complete and bool(PARTIAL_LIST_ITEM.match(line)))
+        )
+    if first.lstrip().startswith(">"):
+        return line.lstrip().startswith(">")
+    if first.startswith(("    ", "\t")):
+        return line.startswith(("    ", "\t"))
+    return False
+
+
+def split_blocks(text: str) -> tuple[List[str], str]:
+    """
+    Split markdown text into finished blocks and the trailing open block.
+
+    A block is finished once a blank line outside of a fenced code block is followed by text
+    that does not continue it. The last block is still open, since more text may be streamed
+    into it.
+
+    Returns:
+        The finished blocks, and the rest of the text starting at the open block.
+    """
+    blocks: List[str] = []
+    lines = text.split("\n")
+    fence: str | None = None
+    # the first line of the open block, and whether a blank line follows it
+    first: str | None = None
+    blank = False
+    # the offsets of the open block, of the end of its last line and of the current line
+    start = end = offset = 0
+    for index, line in enumerate(lines):
+        # the text after the last newline is a line that is still being streamed
+        complete = index < len(lines) - 1
+        stripped = line.lstrip()
+        if fence is None and stripped:
+            if first is not None and blank and not _continues(first, line, complete):
+                blocks.append(text[start:end])
+                first = None
+            if first is None:
+                first, start = line, offset
+            blank = False
+
+        if fence is not None:
+            if stripped.startswith(fence):
+                fence = None
+        elif stripped.startswith(FENCES):
+            fence = stripped[:3]
+        elif not stripped:
+            blank = blank or (complete and first is not None)
+
+        if stripped or fence is not None:
+            end = offset + len(line)
+        offset += len(line) + 1
+    return blocks, text[start:] if first is not None else ""
+
+
+class StreamingMarkdown:
+    """
+    A markdown renderable for text that grows while it is streamed.
+
+    Blocks that are finished are parsed and rendered once, and the rendered lines are reused
+    for as long as the width does not change. Only the trailing open block is rendered again
+    when more text arrives. Text with a link reference definition is rendered as a whole, so
+    the definition applies to the links of every block. Call `clear_cache` when the theme changes.
+    """
+
+    def __init__(self, markup: str = "", code_theme: str = "monokai"):
+        self.code_theme = code_theme
+        self._markup = ""
+        self._blocks: List[str] = []
+        """The finished blocks."""
+        self._tail = ""
+        """The open block at the end of the text."""
+        self._stable_end = 0
+        """The offset in the text where the open block starts."""
+        self._width: int | None = None
+        self._rendered: List[List[List[Segment]]] = []
+        """The rendered lines of the finished blocks, for `_width`."""
+        self._rendered_tail: tuple[str, List[List[Segment]]] | None = None
+        self._whole = False
+        """Whether the text has a link reference definition, the whole text is then the open block."""
+        self.update(markup)
+
+    @property
+    def markup(self) -> str:
+        """The markdown text."""
+        return self._markup
+
+    def update(self, markup: str) -> "StreamingMarkdown":
+        """
+        Set the markdown text.
+
+        Appending to the previous text only scans the new part, any other change starts over.
+        """
+        if markup == self._markup:
+            return self
+        if not markup.startswith(self._markup[:self._stable_end]):
+            self._blocks.clear()
+            self._rendered.clear()
+            self._stable_end = 0
+            self._whole = False
+
+        # the finished blocks were scanned while they were open
+        if not self._whole and LINK_DEFINITION.search(markup, self._stable_end):
+            self._blocks.clear()
+            self._rendered.clear()
+            self._stable_end = 0
+            self._whole = True
+        if self._whole:
+            self._tail = markup
+            self._markup = markup
+            return self
+
+        blocks, tail = split_blocks(markup[self._stable_end:])
+        if blocks:
+            self._blocks.extend(blocks)
+            # the open block starts after the last blank line separating it from the finished blocks
+            self._stable_end = len(markup) - len(tail) if tail else len(markup)
+        self._tail = tail
+        self._markup = markup
+        return self
+
+    def clear_cache(self) -> None:
+        """Drop all rendered lines, for example after a theme change."""
+        self._rendered.clear()
+        self._rendered_tail = None
+
+    def _render_block(self, console: Console, options: ConsoleOptions, block: str) -> List[List[Segment]]:
+        """Render a single block to lines."""
+        return console.render_lines(
+            Markdown(block, code_theme=self.code_theme),
+            options.update(height=None),
+            pad=False,
+            new_lines=False,
+        )
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        if options.max_width != self._width:
+            self.clear_cache()
+            self._width = options.max_width
+
+        for block in self._blocks[len(self._rendered):]:
+            self._rendered.append(self._render_block(console, options, block))
+
+        if self._tail and (self._rendered_tail is None or self._rendered_tail[0] != self._tail):
+            self._rendered_tail = (self._tail, self._render_block(console, options, self._tail))
+
+        blocks = list(zip(self._blocks, self._rendered))
+        if self._tail:
+            blocks.append(self._rendered_tail)
+
+        new_line = Segment.line()
+        for index, (_, lines) in enumerate(blocks):
+            # lists, tables and block quotes start with the blank line that separates them
+            if index and not THEMATIC_BREAK.fullmatch(blocks[index - 1][0]) and (
+                not lines or Segment.get_line_length(lines[0])
+            ):
+                yield new_line
+            for line in lines:
+                yield from line
+                yield new_line
@@ -44,6 +44,31 @@ class DeleteSession(Message):
         self.session_id = session_id
 
 
+class LoadActionResult(Message):
+    """Load the full result of an action from the blob store."""
+
+    def __init__(self, invocation_id: str, tool_call_id: str, blob_hash: str):
+        super().__init__()
+        self.invocation_id = invocation_id
+        self.tool_call_id = tool_call_id
+        self.blob_hash = blob_hash
+
+
+class LoadOlderMessages(Message):
+    """Load the messages of the current session from before the ones shown."""
+
+    def __init__(self):
+        super().__init__()
+
+
+class SearchSessions(Message):
+    """Search the messages of all sessions."""
+
+    def __init__(self, query: str):
+        super().__init__()
+        self.query = query
+
+
 # -- Agent runtime events -- #
 
 class AssistantResponseStart(Message):
@@ -19,6 +19,9 @@ class UIAction(BaseModel):
     name: str = Field(..., description="The name of the action.")
     args: str = Field(..., description="The arguments of the action. This has to be a JSON string with indent=2.")
     result: str = Field(..., description="The result of the action. This has to be a JSON string with indent=2.")
+    result_blob: str | None = Field(
+        None, description="The blob with the full result, when `result` only holds the start of it."
+    )
 
 
 class UISession(BaseModel):
@@ -28,5 +31,17 @@ class UISession(BaseModel):
     detail: str = Field(..., description="The detail of the session.")
     created_at: datetime = Field(..., description="The creation time of the session.")
     updated_at: datetime = Field(..., description="The last update time of the session.")
+    message_count: int = Field(0, description="The number of user and assistant messages in the session.")
+    last_activity_at: datetime | None = Field(None, description="When the last event was added to the session.")
+    preview: str | None = Field(None, description="The start of the last message in the session.")
     messages: List[UIMessage] = Field(..., description="The messages of the session.")
     actions: List[UIAction] = Field(..., description="The actions of the session.")
+
+
+class UISearchResult(BaseModel):
+    """A search match to be displayed in the UI."""
+
+    session_id: str = Field(..., description="The id of the session with the match.")
+    detail: str = Field(..., description="The detail of the session with the match.")
+    role: str = Field(..., description="The role of the matching event.")
+    snippet: str = Field(..., description="The matching text, matches are wrapped in MATCH_START and MATCH_END.")
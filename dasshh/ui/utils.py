@@ -1,24 +1,26 @@
 import json
 import os
 import sys
-import yaml
 from pathlib import Path
 from typing import List
 from importlib import import_module
 import importlib.resources as pkg_resources
 
-from dasshh.data.models import StorageSession, StorageEvent
+from dasshh.data.models import SearchResult, SessionSummary, StorageSession, StorageEvent
 from dasshh.ui.types import (
     UISession,
     UIMessage,
     UIAction,
+    UISearchResult,
 )
+from dasshh.core.config import DEFAULT_CONFIG_PATH, get_config
 from dasshh.core.logging import get_logger
+from dasshh.core.registry import Registry
+from dasshh.core.tools.manifest import ToolManifest
 
 logger = get_logger(__name__)
 
 
-DEFAULT_CONFIG_PATH = Path.home() / ".dasshh" / "config.yaml"
 try:
     DASSHH_EXEC_PATH = str(Path(pkg_resources.files('dasshh')))
 except (ImportError, TypeError):
@@ -30,9 +32,37 @@ DEFAULT_CONFIG = f"""
 dasshh:
   skip_summarization: false
   system_prompt:
+  tool_workers: 4
+  max_parallel_tool_calls: 4
+  max_parallel_sessions: 4
+  prompt_cache_size: 32
+  context_window_tokens:
+  stream_flush_interval_ms: 33
+  stream_flush_chars: 256
   tool_directories:
     - {DEFAULT_TOOLS_PATH}
 
+db:
+  write_behind: true
+  journal_mode: wal
+  synchronous: normal
+  busy_timeout_ms: 5000
+  mmap_size_mb: 64
+  cache_size_mb: 16
+  pool_size: 5
+  max_overflow: 10
+  pool_timeout: 30
+  backup_before_migration: true
+  migration_batch_size: 1000
+  archive_after_days: 30
+  blob_threshold_kb: 16
+  fast_path: true
+  reclaim_interval: 60
+
+logging:
+  format: text
+  sample_rates:
+
 model:
   name: gemini/gemini-2.0-flash
   api_base:
@@ -45,75 +75,140 @@ model:
 """
 
 
-def convert_session_obj(session_obj: StorageSession, events: List[StorageEvent] | None = None) -> UISession:
+def convert_events(events: List[StorageEvent]) -> tuple[List[UIMessage], List[UIAction]]:
+    """
+    Convert events to the messages and actions shown in the UI.
+
+    A tool result whose call is not among the events, because it was loaded on another page,
+    is left out.
+    """
     messages, actions = [], {}
-    if events:
-        for event in events:
-            invocation_id = event.invocation_id
-            content = event.content
-            if content["role"] == "assistant" and "tool_calls" in content:
-                for tool_call in content["tool_calls"]:
-                    tool_call_id = tool_call["id"]
-                    args = json.dumps(json.loads(tool_call["function"]["arguments"]), indent=2)
-                    actions[tool_call_id] = UIAction(
-                        invocation_id=invocation_id,
-                        tool_call_id=tool_call_id,
-                        name=tool_call["function"]["name"],
-                        args=args,
-                        result="",
-                    )
-            elif content["role"] == "tool":
-                tool_call_id = content["tool_call_id"]
-                actions[tool_call_id].result = content["content"]
-            elif content["role"] in ["user", "assistant"]:
-                messages.append(
-                    UIMessage(invocation_id=invocation_id, role=content["role"], content=content["content"])
+    for event in events:
+        invocation_id = event.invocation_id
+        content = event.content
+        if content["role"] == "assistant" and "tool_calls" in content:
+            for tool_call in content["tool_calls"]:
+                tool_call_id = tool_call["id"]
+                args = json.dumps(json.loads(tool_call["function"]["arguments"]), indent=2)
+                actions[tool_call_id] = UIAction(
+                    invocation_id=invocation_id,
+                    tool_call_id=tool_call_id,
+                    name=tool_call["function"]["name"],
+                    args=args,
+                    result="",
                 )
+        elif content["role"] == "tool":
+            action = actions.get(content["tool_call_id"])
+            if action is not None:
+                action.result = content["content"]
+                action.result_blob = content.get("content_blob")
+        elif content["role"] in ["user", "assistant"]:
+            messages.append(
+                UIMessage(invocation_id=invocation_id, role=content["role"], content=content["content"])
+            )
+    return messages, list(actions.values())
+
+
+def convert_session_obj(session_obj: StorageSession | SessionSummary, events: List[StorageEvent] | None = None) -> UISession:
+    messages, actions = convert_events(events or [])
     return UISession(
         id=session_obj.id,
         detail=session_obj.detail,
         created_at=session_obj.created_at,
         updated_at=session_obj.updated_at,
+        message_count=session_obj.message_count or 0,
+        last_activity_at=session_obj.last_activity_at,
+        preview=session_obj.preview,
         messages=messages,
-        actions=list(actions.values()),
+        actions=actions,
+    )
+
+
+def convert_search_result(result: SearchResult) -> UISearchResult:
+    return UISearchResult(
+        session_id=result.session_id,
+        detail=result.detail or "",
+        role=result.role,
+        snippet=result.snippet,
     )
 
 
-def load_tools() -> None:
+def _import_tool_packages(dir_path: str) -> bool:
+    """
+    Import every package in a tool directory, which registers its tools.
+
+    Returns:
+        Whether every package was imported.
+    """
+    imported = True
+    for root, dirs, files in os.walk(dir_path):
+        if "__init__.py" in files:
+            # Determine full module path
+            rel_path = os.path.relpath(root, dir_path)
+            if rel_path == ".":
+                module_path = os.path.basename(dir_path)
+                module_parent = os.path.dirname(dir_path)
+            else:
+                module_path = rel_path.replace(os.sep, ".")
+                module_parent = dir_path
+
+            if module_parent not in sys.path:
+                sys.path.append(module_parent)
+
+            try:
+                import_module(module_path)
+                logger.info(f"Imported module: {module_path}")
+            except ImportError as e:
+                logger.error(f"Failed to import {module_path}: {e}")
+                imported = False
+    return imported
+
+
+def load_tools(manifest: ToolManifest | None = None, dirs: List[str] | None = None) -> ToolManifest:
     """
     Load all tools from the given directories recursively.
 
+    A directory whose files have not changed since it was last imported is not imported again,
+    its tools are registered from the tool manifest and their modules are imported on first call.
+
     Args:
-        dirs: A list of directory paths to load tools from (absolute file paths).
-              If None, will use paths from config or fall back to default.
+        manifest: The tool manifest, defaults to the one in ~/.dasshh/cache.
+        dirs: The tool directories, defaults to `dasshh.tool_directories` from the config.
+
+    Returns:
+        The tool manifest, with the tools of the directories that were imported.
     """
-    tool_dirs_config = get_from_config("dasshh.tool_directories")
-    if tool_dirs_config:
-        dirs = tool_dirs_config
-    else:
-        dirs = [DEFAULT_TOOLS_PATH]
+    if dirs is None:
+        dirs = get_config().dasshh.tool_directories or [DEFAULT_TOOLS_PATH]
+
+    if manifest is None:
+        manifest = ToolManifest()
+        manifest.load()
+    registry = Registry()
 
     for dir_path in dirs:
         if os.path.exists(dir_path):
-            for root, dirs, files in os.walk(dir_path):
-                if "__init__.py" in files:
-                    # Determine full module path
-                    rel_path = os.path.relpath(root, dir_path)
-                    if rel_path == ".":
-                        module_path = os.path.basename(dir_path)
-                        module_parent = os.path.dirname(dir_path)
-                    else:
-                        module_path = rel_path.replace(os.sep, ".")
-                        module_parent = dir_path
-
-                    if module_parent not in sys.path:
-                        sys.path.append(module_parent)
-
-                    try:
-                        import_module(module_path)
-                        logger.info(f"Imported module: {module_path}")
-                    except ImportError as e:
-                        logger.error(f"Failed to import {module_path}: {e}")
+            dir_path = os.path.abspath(dir_path)
+            files = manifest.fingerprint(dir_path)
+            tools = manifest.lookup(dir_path, files)
+            if tools is not None:
+                manifest.register(registry, tools)
+                logger.info(f"Registered {len(tools)} tools of {dir_path} from the tool manifest")
+                continue
+
+            before = set(registry.tools)
+            if _import_tool_packages(dir_path):
+                manifest.record(dir_path, files, [tool for name, tool in registry.tools.items() if name not in before])
+    return manifest
+
+
+def save_tool_manifest(manifest: ToolManifest) -> None:
+    """Save the tool manifest, with the declarations built since the tools were loaded."""
+    manifest.update(Registry())
+    try:
+        manifest.save()
+    except OSError as e:
+        logger.warning(f"Failed to save the tool manifest: {e}")
 
 
 def load_config() -> None:
@@ -126,20 +221,15 @@ def load_config() -> None:
 
 
 def get_from_config(key: str) -> dict | str | List | None:
-    """Get a value from the configuration file."""
-    if not DEFAULT_CONFIG_PATH.exists():
-        return None
-
-    with open(DEFAULT_CONFIG_PATH, "r") as f:
-        config = yaml.safe_load(f)
-
-    if '.' in key:
-        parts = key.split('.')
-        curr = config
-        for part in parts:
-            if curr is None or part not in curr:
-                return None
-            curr = curr.get(part)
-        return curr
-
-    return config.get(key, None)
+    """
+    Get a value from the configuration file.
+
+    The file is parsed once and again only when it changes, see `dasshh.core.config.ConfigStore`.
+    Missing settings have their default value.
+    """
+    curr = get_config().model_dump()
+    for part in key.split('.'):
+        if not isinstance(curr, dict) or part not in curr:
+            return None
+        curr = curr[part]
+    return curr
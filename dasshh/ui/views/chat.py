@@ -8,7 +8,7 @@ from textual import on
 
 from dasshh.data.session import SessionService
 from dasshh.ui.types import UISession, UIMessage, UIAction
-from dasshh.ui.utils import convert_session_obj
+from dasshh.ui.utils import convert_events, convert_session_obj, convert_search_result
 from dasshh.core.logging import get_logger
 from dasshh.core.runtime import DasshhRuntime
 from dasshh.ui.components.chat import ChatPanel, HistoryPanel, ActionsPanel
@@ -23,8 +23,11 @@ from dasshh.ui.events import (
     AssistantToolCallComplete,
     AssistantToolCallError,
     LoadSession,
+    LoadOlderMessages,
     NewSession,
-    DeleteSession
+    DeleteSession,
+    SearchSessions,
+    LoadActionResult,
 )
 
 logger = get_logger("dasshh.views.chat")
@@ -47,9 +50,18 @@ class Chat(Widget):
 
     current_session_id: str = ""
     """The current session id."""
+    page_size: int = 200
+    """The number of events loaded at a time when a session is shown."""
+    _oldest_seq: int | None = None
+    """The sequence number of the oldest event shown, `None` once the start of the session is shown."""
 
     DEFAULT_GREETING = "Hi! How can I help you today?"
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._invocation_sessions: dict[str, str] = {}
+        """The session of each invocation waiting for its answer, to update its history item."""
+
     @property
     def session_service(self) -> SessionService:
         """Get the session service."""
@@ -102,8 +114,8 @@ class Chat(Widget):
 
         # load history panel
         all_sessions: List[UISession] = [
-            convert_session_obj(session_obj)
-            for session_obj in self.session_service.list_sessions(include_events=True)
+            convert_session_obj(summary)
+            for summary in self.session_service.list_session_summaries()
         ]
         self.history_panel.load_sessions(all_sessions, current=self.current_session_id)
 
@@ -111,15 +123,44 @@ class Chat(Widget):
         self._reload_chat()
 
     def _reload_chat(self) -> None:
-        """Reload current chat window"""
+        """Reload current chat window, with the most recent page of the session."""
+        events, self._oldest_seq = self._load_page()
         current_session: UISession = convert_session_obj(
             self.session_service.get_session(session_id=self.current_session_id),
-            self.session_service.get_events(session_id=self.current_session_id)
+            events,
         )
-        current_session.messages.insert(0, UIMessage(role="assistant", content=self.DEFAULT_GREETING))
-        self.chat_panel.load_messages(current_session.messages)
+        if self._oldest_seq is None:
+            current_session.messages.insert(0, UIMessage(role="assistant", content=self.DEFAULT_GREETING))
+        self.chat_panel.load_messages(current_session.messages, more_above=self._oldest_seq is not None)
         self.actions_panel.load_actions(current_session.actions)
 
+    def _load_page(self, before_seq: int | None = None) -> tuple[list, int | None]:
+        """
+        Load a page of events of the current session, going back from `before_seq`.
+
+        A full page starts at a user message when it has one, so the tool calls of an
+        invocation and their results are loaded together.
+
+        Returns:
+            The events, oldest first, and the sequence number to load the next older page
+            from, `None` when the page reaches the start of the session.
+        """
+        events = self.session_service.get_events(
+            session_id=self.current_session_id,
+            after_seq=before_seq,
+            limit=self.page_size,
+            reverse=True,
+        )
+        if len(events) < self.page_size:
+            return events[::-1], None
+        # the newest events come first, the oldest invocation may have started on the previous page
+        start = next(
+            (index for index in range(len(events) - 1, -1, -1) if events[index].content["role"] == "user"),
+            len(events) - 1,
+        )
+        events = events[:start + 1]
+        return events[::-1], events[-1].seq
+
     # -- Handlers --
 
     @on(LoadSession)
@@ -130,6 +171,18 @@ class Chat(Widget):
 
         self._reload_chat()
 
+    @on(LoadOlderMessages)
+    def on_load_older_messages(self, _: LoadOlderMessages) -> None:
+        """Handle when the chat is scrolled to the top and older messages are not loaded yet."""
+        if self._oldest_seq is None:
+            return
+        events, self._oldest_seq = self._load_page(self._oldest_seq)
+        messages, actions = convert_events(events)
+        if self._oldest_seq is None:
+            messages.insert(0, UIMessage(role="assistant", content=self.DEFAULT_GREETING))
+        self.chat_panel.load_older_messages(messages, more_above=self._oldest_seq is not None)
+        self.actions_panel.prepend_actions(actions)
+
     @on(NewSession)
     def on_new_session(self, _: NewSession) -> None:
         """Handle when a new session is created."""
@@ -149,6 +202,25 @@ class Chat(Widget):
             self.actions_panel.reset()
         self.session_service.delete_session(session_id=event.session_id)
 
+    @on(SearchSessions)
+    def on_search_sessions(self, event: SearchSessions) -> None:
+        """Handle when the sessions are searched."""
+        results = [convert_search_result(result) for result in self.session_service.search(event.query)]
+        self.history_panel.show_search_results(event.query, results)
+
+    @on(LoadActionResult)
+    def on_load_action_result(self, event: LoadActionResult) -> None:
+        """Handle when the full result of an action is requested."""
+        result = self.session_service.get_blob(event.blob_hash)
+        if result is None:
+            self.actions_panel.handle_error("The full result is no longer available")
+            return
+        self.actions_panel.update_action(
+            invocation_id=event.invocation_id,
+            tool_call_id=event.tool_call_id,
+            result=result,
+        )
+
     @on(NewMessage)
     async def on_new_message(self, event: NewMessage) -> None:
         """Handle when a message is sent.
@@ -161,6 +233,7 @@ class Chat(Widget):
         )
         current_session_widget = self.history_panel.get_history_item_widget(self.current_session_id)
         if current_session_widget:
+            current_session_widget.add_message(event.message)
             current_session_widget.detail = event.message
             self.session_service.update_session(
                 session_id=self.current_session_id,
@@ -168,11 +241,12 @@ class Chat(Widget):
             )
 
         logger.debug(f"Submitting query {event.message} to runtime")
-        await self.runtime.submit_query(
+        invocation_id = await self.runtime.submit_query(
             message=event.message,
             session_id=self.current_session_id,
             post_message_callback=self.post_message
         )
+        self._invocation_sessions[invocation_id] = self.current_session_id
 
     # -- Assistant events --
 
@@ -200,11 +274,16 @@ class Chat(Widget):
             content=event.content,
             final=True
         )
+        session_id = self._invocation_sessions.pop(event.invocation_id, None)
+        history_item = self.history_panel.get_history_item_widget(session_id) if session_id else None
+        if history_item:
+            history_item.add_message(event.content)
 
     @on(AssistantResponseError)
     def on_assistant_response_error(self, event: AssistantResponseError) -> None:
         """Handle when the assistant encounters an error."""
         logger.error(f"Assistant response error: {event.error}")
+        self._invocation_sessions.pop(event.invocation_id, None)
 
     @on(AssistantToolCallStart)
     def on_assistant_tool_call_start(self, event: AssistantToolCallStart) -> None:
@@ -38,9 +38,11 @@ def reset_registry():
     """Reset the Registry singleton between tests."""
     Registry._instance = None
     Registry.tools = {}
+    Registry._tool_declarations = None
     yield
     Registry._instance = None
     Registry.tools = {}
+    Registry._tool_declarations = None
 
 
 @pytest.fixture
@@ -83,4 +85,6 @@ def mock_tool():
 @pytest.fixture
 def mock_session_service():
     """Create a mock session service for testing."""
-    return MagicMock(spec=SessionService)
+    service = MagicMock(spec=SessionService)
+    service.load_content.side_effect = lambda content: content
+    return service
@@ -0,0 +1,183 @@
+"""
+Tests for the batch module.
+"""
+import asyncio
+import io
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from dasshh.core.batch import BatchPrompt, BatchRunner, parse_prompt_lines
+from dasshh.ui.events import (
+    AssistantResponseComplete,
+    AssistantResponseError,
+    AssistantResponseUpdate,
+    AssistantToolCallComplete,
+    AssistantToolCallStart,
+)
+
+
+class FakeRuntime:
+    """Answers every prompt with its text reversed, after calling a tool for prompts starting with `tool`."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.cancelled = []
+        self._tasks = {}
+
+    async def submit_query(self, *, message, session_id, post_message_callback):
+        invocation_id = f"inv-{session_id}"
+        self._tasks[invocation_id] = asyncio.create_task(self._answer(invocation_id, message, post_message_callback))
+        return invocation_id
+
+    async def wait_for_invocation(self, invocation_id):
+        await asyncio.shield(self._tasks[invocation_id])
+
+    async def cancel_invocation(self, invocation_id):
+        self.cancelled.append(invocation_id)
+        self._tasks[invocation_id].cancel()
+
+    async def _answer(self, invocation_id, message, post):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        if message == "fail":
+            post(AssistantResponseError(invocation_id=invocation_id, error="boom"))
+            return
+        if message.startswith("tool"):
+            post(AssistantToolCallStart(invocation_id=invocation_id, tool_call_id="1", tool_name="ls", args="{}"))
+            post(AssistantToolCallComplete(invocation_id=invocation_id, tool_call_id="1", tool_name="ls", result="[]"))
+        post(AssistantResponseUpdate(invocation_id=invocation_id, content=message[::-1]))
+        post(AssistantResponseComplete(invocation_id=invocation_id, content=message[::-1]))
+
+
+@pytest.fixture
+def session_service():
+    """A session service that numbers the new sessions."""
+    service = MagicMock()
+    counter = iter(range(1000))
+    service.new_session.side_effect = lambda detail: MagicMock(id=f"s{next(counter)}")
+    return service
+
+
+def prompts(*texts):
+    return [BatchPrompt(id=number, text=text) for number, text in enumerate(texts, start=1)]
+
+
+def test_parse_prompt_lines():
+    """Test reading prompts from plain and JSONL lines."""
+    assert list(parse_prompt_lines(["list files\n", "\n", "uptime\n"])) == [
+        BatchPrompt(id=1, text="list files"),
+        BatchPrompt(id=3, text="uptime"),
+    ]
+    assert list(parse_prompt_lines(['"uptime"', '{"id": "disk", "prompt": "df -h"}'], jsonl=True)) == [
+        BatchPrompt(id=1, text="uptime"),
+        BatchPrompt(id="disk", text="df -h"),
+    ]
+    with pytest.raises(ValueError, match="Line 1"):
+        list(parse_prompt_lines(['{"text": "uptime"}'], jsonl=True))
+
+
+@pytest.mark.asyncio
+async def test_run_collects_results(session_service):
+    """Test that every prompt gets a result with its answer and tool calls."""
+    results = []
+    runner = BatchRunner(FakeRuntime(), session_service, concurrency=2)
+
+    failed = await runner.run(prompts("abc", "tool xy", "fail"), results.append)
+
+    assert failed == 1
+    by_id = {result.id: result for result in results}
+    assert by_id[1].response == "cba"
+    assert by_id[2].tool_calls == [{"name": "ls", "args": "{}", "result": "[]"}]
+    assert by_id[3].error == "boom"
+    assert len({result.session_id for result in results}) == 3
+    assert json.loads(by_id[1].to_json())["response"] == "cba"
+
+
+@pytest.mark.asyncio
+async def test_run_concurrency(session_service):
+    """Test that at most `concurrency` prompts run at the same time."""
+    runtime = FakeRuntime(delay=0.01)
+    runner = BatchRunner(runtime, session_service, concurrency=3)
+
+    await runner.run(prompts(*"abcdefgh"), lambda result: None)
+
+    assert runtime.max_running == 3
+
+
+def slow_lines(text):
+    """Yield the lines of a file like stdin does, a little at a time."""
+    for line in io.StringIO(text):
+        time.sleep(0.001)
+        yield line
+
+
+@pytest.mark.asyncio
+async def test_run_reads_prompts_once(session_service):
+    """Test that concurrent workers share one reader of a prompt file."""
+    results = []
+    text = "".join(f'{{"id": {i}, "prompt": "p{i}"}}\n' for i in range(20))
+    runner = BatchRunner(FakeRuntime(delay=0.001), session_service, concurrency=4)
+
+    failed = await runner.run(parse_prompt_lines(slow_lines(text), jsonl=True), results.append)
+
+    assert failed == 0
+    assert sorted(result.id for result in results) == list(range(20))
+    assert all(result.response == f"p{result.id}"[::-1] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_run_invalid_prompt_line(session_service):
+    """Test that the prompts before an invalid line still run, then the error is raised."""
+    results = []
+    runner = BatchRunner(FakeRuntime(), session_service, concurrency=2)
+
+    with pytest.raises(ValueError, match="Line 3"):
+        await runner.run(parse_prompt_lines(['"a"', '"b"', "[]", '"c"'], jsonl=True), results.append)
+
+    assert sorted(result.prompt for result in results) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_run_result_error_stops_reading(session_service):
+    """Test that an error reporting a result stops the prompt reader instead of leaving it blocked."""
+    def on_result(result):
+        raise RuntimeError("broken pipe")
+
+    runner = BatchRunner(FakeRuntime(), session_service, concurrency=2)
+
+    with pytest.raises(RuntimeError, match="broken pipe"):
+        await runner.run(prompts(*"abcdefgh"), on_result)
+
+    await asyncio.sleep(0)
+    assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+
+
+@pytest.mark.asyncio
+async def test_run_timeout(session_service):
+    """Test that a prompt that takes too long fails."""
+    results = []
+    runtime = FakeRuntime(delay=1)
+    runner = BatchRunner(runtime, session_service, timeout=0.01)
+
+    assert await runner.run(prompts("abc"), results.append) == 1
+    assert results[0].error == "Timed out after 0.01s"
+    assert runtime.cancelled == [f"inv-{results[0].session_id}"]
+
+
+@pytest.mark.asyncio
+async def test_run_streams(session_service):
+    """Test that answers and tool calls are echoed with a concurrency of 1."""
+    output = io.StringIO()
+    runner = BatchRunner(FakeRuntime(), session_service, stream=output)
+
+    await runner.run(prompts("tool xy"), lambda result: None)
+
+    assert output.getvalue() == "[tool] ls({})\n[result] ls: []\nyx loot\n"
+    assert BatchRunner(FakeRuntime(), session_service, concurrency=2, stream=output).stream is None
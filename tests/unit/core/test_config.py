@@ -0,0 +1,117 @@
+"""
+Tests for the config module.
+"""
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import ValidationError
+
+from dasshh.core.config import Config, ConfigStore
+
+CONFIG = """
+dasshh:
+  system_prompt:
+  tool_workers: 2
+model:
+  name: gemini/gemini-2.0-flash
+  api_key: secret
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """A configuration file."""
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG)
+    return path
+
+
+def rewrite(path, text):
+    """Rewrite a file with a new modification time."""
+    stat = os.stat(path)
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_defaults_for_empty_keys(config_path):
+    """Test that missing and empty keys get their default."""
+    config = ConfigStore(config_path).get()
+
+    assert config.dasshh.tool_workers == 2
+    assert config.dasshh.system_prompt is None
+    assert config.dasshh.max_parallel_sessions == 4
+    assert config.db.journal_mode == "wal"
+    assert config.model.name == "gemini/gemini-2.0-flash"
+    assert config.model.temperature == 1.0
+
+
+def test_missing_file(tmp_path):
+    """Test that a missing file is the default configuration, without a model."""
+    config = ConfigStore(tmp_path / "config.yaml").get()
+
+    assert config == Config()
+    assert config.model is None
+
+
+def test_parsed_once(config_path):
+    """Test that the file is only parsed again when it changes."""
+    store = ConfigStore(config_path)
+    with patch("dasshh.core.config.yaml.safe_load", wraps=__import__("yaml").safe_load) as safe_load:
+        first = store.get()
+        assert store.get() is first
+        assert safe_load.call_count == 1
+
+        rewrite(config_path, CONFIG.replace("tool_workers: 2", "tool_workers: 3"))
+        assert store.get().dasshh.tool_workers == 3
+        assert safe_load.call_count == 2
+
+
+def test_listeners_get_changes(config_path):
+    """Test that listeners are called with the previous and the new configuration."""
+    store = ConfigStore(config_path)
+    listener = MagicMock()
+    store.subscribe(listener)
+    previous = store.get()
+    listener.assert_not_called()
+
+    rewrite(config_path, CONFIG.replace("secret", "other"))
+    assert store.refresh()
+
+    listener.assert_called_once_with(previous, store.get())
+    assert store.get().model.api_key == "other"
+
+    # a new modification time with the same settings is not a change
+    rewrite(config_path, CONFIG.replace("secret", "other"))
+    assert not store.refresh()
+    listener.assert_called_once()
+
+
+def test_invalid_file_keeps_last_config(config_path):
+    """Test that an invalid file is ignored and the last good configuration is kept."""
+    store = ConfigStore(config_path)
+    previous = store.get()
+
+    rewrite(config_path, "dasshh:\n  tool_workers: 0\n")
+    assert not store.refresh()
+    assert store.get() is previous
+
+    rewrite(config_path, "dasshh: [")
+    assert store.get() is previous
+
+
+def test_validation():
+    """Test that settings are validated."""
+    with pytest.raises(ValidationError):
+        Config.model_validate({"dasshh": {"tool_workers": "many"}})
+    with pytest.raises(ValidationError):
+        Config.model_validate({"db": {"pool_size": 0}})
+
+
+def test_refresh_without_listeners(config_path):
+    """Test that refresh reports a change when nothing listens for it."""
+    store = ConfigStore(config_path)
+    store.get()
+
+    rewrite(config_path, CONFIG.replace("tool_workers: 2", "tool_workers: 3"))
+    assert store.refresh()
@@ -0,0 +1,156 @@
+"""
+Tests for the context window.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from dasshh.core.context_window import ContextWindow, TurnHistory
+
+
+def fake_token_counter(model, messages):
+    """Count one token per character of content."""
+    return sum(len(message.get("content") or "") for message in messages)
+
+
+@pytest.fixture
+def window():
+    with patch("dasshh.core.context_window.token_counter", side_effect=fake_token_counter) as counter:
+        context_window = ContextWindow(model="test-model", max_tokens=10)
+        context_window.counter = counter
+        yield context_window
+
+
+def user(content):
+    return {"role": "user", "content": content}
+
+
+def assistant(content):
+    return {"role": "assistant", "content": content}
+
+
+def tool_call(call_id):
+    return {
+        "role": "assistant",
+        "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "t", "arguments": "{}"}}],
+    }
+
+
+def tool_result(call_id, content):
+    return {"role": "tool", "tool_call_id": call_id, "name": "t", "content": content}
+
+
+def test_no_budget_returns_history():
+    """Test that the full history is returned when there is no budget."""
+    history = [user("a" * 100), assistant("b" * 100)]
+    assert ContextWindow(max_tokens=None).fit(history) is history
+
+
+def test_count_tokens_is_cached(window):
+    """Test that each message is only counted once."""
+    message = user("hello")
+    assert window.count_tokens(message) == 5
+    assert window.count_tokens(message) == 5
+    window.counter.assert_called_once()
+
+
+def test_count_tokens_fallback():
+    """Test that counting falls back to an estimate when the tokenizer fails."""
+    with patch("dasshh.core.context_window.token_counter", side_effect=Exception("no tokenizer")):
+        assert ContextWindow().count_tokens(user("a" * 40)) > 0
+
+
+def test_fit_drops_oldest_turns(window):
+    """Test that the oldest turns are dropped first."""
+    history = [user("aaaa"), assistant("bbbb"), user("cccc"), assistant("dd")]
+    assert window.fit(history) == [user("cccc"), assistant("dd")]
+
+
+def test_fit_respects_reserved_tokens(window):
+    """Test that reserved tokens count against the budget."""
+    history = [user("aaa"), user("bbb")]
+    assert window.fit(history, reserved=0) == history
+    assert window.fit(history, reserved=5) == [user("bbb")]
+
+
+def test_fit_keeps_tool_results_with_tool_calls(window):
+    """Test that a tool call and its results are kept or dropped together."""
+    history = [
+        user("aa"),
+        tool_call("call_1"),
+        tool_result("call_1", "rrrrrr"),
+        assistant("ok"),
+        user("q"),
+    ]
+    for budget in range(0, 15):
+        window.max_tokens = budget
+        fitted = window.fit(history)
+        call_ids = set()
+        for message in fitted:
+            for call in message.get("tool_calls", []):
+                call_ids.add(call["id"])
+            if message["role"] == "tool":
+                assert message["tool_call_id"] in call_ids
+        if tool_call("call_1") in fitted:
+            assert tool_result("call_1", "rrrrrr") in fitted
+
+
+def test_fit_starts_with_user_message(window):
+    """Test that the fitted history starts with a user message when there is one."""
+    history = [user("aaaaaaaaaa"), assistant("bb"), user("c"), assistant("dd")]
+    assert window.fit(history) == [user("c"), assistant("dd")]
+
+    history = [user("aaaaaaaa"), assistant("bb"), assistant("cc")]
+    assert window.fit(history) == [assistant("bb"), assistant("cc")]
+
+
+def test_fit_always_keeps_latest_turn(window):
+    """Test that the latest turn is kept even if it exceeds the budget."""
+    history = [user("a"), user("x" * 50)]
+    assert window.fit(history) == [user("x" * 50)]
+
+
+def conversation(turns):
+    """A conversation with a tool call in every third turn."""
+    messages = []
+    for i in range(turns):
+        messages.append(user("q" * (i % 4)))
+        if i % 3 == 0:
+            messages.append(tool_call(f"call_{i}"))
+            messages.append(tool_result(f"call_{i}", "r" * (i % 5)))
+        messages.append(assistant("a" * (i % 3)))
+    return messages
+
+
+def test_turn_history_matches_fit(window):
+    """Test that a history fitted as it grows gives the same messages as fitting it from scratch."""
+    messages = conversation(30)
+    history = window.history()
+    for end, message in enumerate(messages, start=1):
+        history.append(message)
+        for reserved in (0, 3):
+            assert history.fit(reserved) == window.fit(messages[:end], reserved)
+
+
+def test_turn_history_counts_each_message_once():
+    """Test that fitting a growing history does not count its messages again."""
+    count_tokens = MagicMock(side_effect=lambda message: len(message.get("content") or ""))
+    history = TurnHistory(count_tokens, max_tokens=10)
+    messages = conversation(20)
+    for message in messages:
+        history.append(message)
+        history.fit(reserved=2)
+
+    assert count_tokens.call_count == len(messages)
+
+
+def test_turn_history_drops_turns_that_can_not_fit():
+    """Test that a long session keeps about as much history as the budget can hold."""
+    history = TurnHistory(lambda message: 1, max_tokens=10, messages=[user("a"), assistant("b")] * 5)
+    for _ in range(1000):
+        history.append(user("c"))
+        history.append(assistant("d"))
+
+    assert len(history) <= 20
+    assert history.fit() == [user("c"), assistant("d")] * 5
+    assert TurnHistory(lambda message: 1, messages=[user("a")] * 50).fit() == [user("a")] * 50
@@ -1,10 +1,41 @@
 """
 Tests for the logging module.
 """
+import json
+import logging
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from dasshh.core.logging import get_logger, DEFAULT_LOG_DIR, DEFAULT_LOG_FILE
+import pytest
+
+from dasshh.core.logging import (
+    get_logger,
+    setup_logging,
+    stop_logging,
+    route_litellm_logs,
+    SamplingFilter,
+    DEFAULT_LOG_DIR,
+    DEFAULT_LOG_FILE,
+    LITELLM_LOGGER,
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Set up logging to a temporary file, and restore the root logger afterwards."""
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    yield tmp_path / "dasshh.log"
+    stop_logging()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    for handler in handlers:
+        root_logger.addHandler(handler)
+    root_logger.setLevel(level)
+
+
+def make_record(name: str, level: int = logging.DEBUG) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "message", None, None)
 
 
 def test_get_logger():
@@ -26,3 +57,71 @@ def test_default_log_dir_exists():
 def test_default_log_file_path():
     """Test the default log file path."""
     assert DEFAULT_LOG_FILE == DEFAULT_LOG_DIR / "dasshh.log"
+
+
+def test_setup_logging_writes_on_listener(log_file):
+    """Test that records are queued and written to the file by the listener."""
+    setup_logging(log_file=log_file)
+    logging.getLogger("dasshh.test").info("hello from the test")
+    stop_logging()
+
+    text = log_file.read_text()
+    assert "Dasshh logging initialized" in text
+    assert "dasshh.test - INFO - hello from the test" in text
+    assert isinstance(logging.getLogger().handlers[0], logging.handlers.QueueHandler)
+
+
+def test_setup_logging_json(log_file):
+    """Test that the JSON format writes one object per line."""
+    setup_logging(log_file=log_file, json_format=True)
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logging.getLogger("dasshh.test").exception("failed")
+    stop_logging()
+
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    entry = entries[-1]
+    assert entry["logger"] == "dasshh.test"
+    assert entry["level"] == "ERROR"
+    assert entry["message"].startswith("failed")
+    assert "RuntimeError: boom" in entry["message"]
+
+
+def test_setup_logging_samples(log_file):
+    """Test that the sample rates apply to the records of a logger."""
+    setup_logging(log_file=log_file, log_level=logging.DEBUG, sample_rates={"dasshh.chatty": 0.25})
+    chatty = logging.getLogger("dasshh.chatty.child")
+    for i in range(8):
+        chatty.debug(f"chunk {i}")
+    chatty.warning("warning")
+    stop_logging()
+
+    lines = [line for line in log_file.read_text().splitlines() if "dasshh.chatty" in line]
+    assert len(lines) == 3
+    assert lines[-1].endswith("warning")
+
+
+def test_sampling_filter():
+    """Test that the most specific rate wins and warnings are always kept."""
+    sampler = SamplingFilter({"LiteLLM": 0.5, "LiteLLM.router": 0.0})
+
+    assert [sampler.filter(make_record("LiteLLM")) for _ in range(4)] == [False, True, False, True]
+    assert not sampler.filter(make_record("LiteLLM.router"))
+    assert sampler.filter(make_record("LiteLLM.router", logging.WARNING))
+    assert sampler.filter(make_record("dasshh.runtime"))
+
+
+def test_route_litellm_logs(log_file):
+    """Test that the console handler litellm adds on import is replaced by the log file."""
+    litellm_logger = logging.getLogger(LITELLM_LOGGER)
+    console = logging.StreamHandler()
+    setup_logging(log_file=log_file, log_level=logging.DEBUG)
+    litellm_logger.addHandler(console)
+    try:
+        route_litellm_logs()
+        assert console not in litellm_logger.handlers
+        assert litellm_logger.level == logging.DEBUG
+        assert litellm_logger.propagate
+    finally:
+        litellm_logger.removeHandler(console)
@@ -0,0 +1,78 @@
+"""
+Tests for the prompt cache.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from dasshh.core.context_window import TurnHistory
+from dasshh.core.prompt_cache import PromptCache
+
+
+def history(*messages):
+    """A history without a token budget."""
+    return TurnHistory(lambda message: 1, messages=messages)
+
+
+def test_invalid_max_sessions():
+    """Test that the cache needs room for at least one session."""
+    with pytest.raises(ValueError, match="max_sessions must be at least 1"):
+        PromptCache(max_sessions=0)
+
+
+def test_get_loads_on_miss_only():
+    """Test that the loader is only called when the session is not cached."""
+    cache = PromptCache()
+    loader = MagicMock(return_value=history({"role": "user", "content": "hi"}))
+
+    first = cache.get("s1", loader)
+    second = cache.get("s1", loader)
+
+    loader.assert_called_once()
+    assert first is second
+    assert first.messages == [{"role": "user", "content": "hi"}]
+
+
+def test_append_updates_cached_session():
+    """Test that appended messages show up in the cached history."""
+    cache = PromptCache()
+    cache.get("s1", lambda: history())
+    cache.append("s1", {"role": "user", "content": "hi"})
+
+    assert cache.get("s1", lambda: pytest.fail("should not reload")).messages == [{"role": "user", "content": "hi"}]
+
+
+def test_append_ignores_uncached_session():
+    """Test that appending to an uncached session does not create a partial history."""
+    cache = PromptCache()
+    cache.append("s1", {"role": "user", "content": "hi"})
+
+    assert "s1" not in cache
+    assert len(cache) == 0
+
+
+def test_least_recently_used_eviction():
+    """Test that the least recently used session is evicted first."""
+    cache = PromptCache(max_sessions=2)
+    cache.get("s1", lambda: history())
+    cache.get("s2", lambda: history())
+    cache.get("s1", lambda: history())
+    cache.get("s3", lambda: history())
+
+    assert "s1" in cache
+    assert "s2" not in cache
+    assert "s3" in cache
+
+
+def test_invalidate():
+    """Test dropping sessions from the cache."""
+    cache = PromptCache()
+    cache.get("s1", lambda: history())
+    cache.get("s2", lambda: history())
+
+    cache.invalidate("s1")
+    assert "s1" not in cache
+    assert "s2" in cache
+
+    cache.invalidate()
+    assert len(cache) == 0
@@ -6,6 +6,7 @@ from unittest.mock import Mock
 
 from dasshh.core.registry import Registry
 from dasshh.core.tools.base import BaseTool
+from dasshh.core.tools.lazy_tool import LazyTool
 
 
 def test_registry_singleton(reset_registry):
@@ -74,3 +75,33 @@ def test_get_tool_declarations(reset_registry, mock_tool):
     declarations = registry.get_tool_declarations()
     assert len(declarations) == 1
     assert declarations[0] == mock_tool.get_declaration()
+
+
+def test_tool_declarations_are_cached(reset_registry, mock_tool):
+    """Test that declarations are built once and rebuilt when a tool is added."""
+    registry = Registry()
+    registry.add_tool(mock_tool)
+
+    declarations = registry.get_tool_declarations()
+    assert registry.get_tool_declarations() is declarations
+
+    other_tool = Mock(spec=BaseTool)
+    other_tool.name = "other_tool"
+    other_tool.get_declaration.return_value = {"name": "other_tool"}
+    registry.add_tool(other_tool)
+
+    updated = registry.get_tool_declarations()
+    assert updated is not declarations
+    assert len(updated) == 2
+
+
+def test_tool_replaces_lazy_placeholder(reset_registry, mock_tool):
+    """Test that a tool replaces its lazy placeholder instead of being a duplicate."""
+    registry = Registry()
+    registry.add_tool(LazyTool(mock_tool.name, mock_tool.description, {}, "tools"))
+    declarations = registry.get_tool_declarations()
+
+    registry.add_tool(mock_tool)
+
+    assert registry.get_tool(mock_tool.name) is mock_tool
+    assert registry.get_tool_declarations() is not declarations
@@ -2,12 +2,18 @@
 Tests for the runtime module.
 """
 import asyncio
+import logging
+import threading
 import uuid
+from concurrent.futures import Future
 from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
 
+from dasshh.core.config import Config
 from dasshh.core.runtime import DasshhRuntime, InvocationContext
+from dasshh.core.registry import Registry
+from dasshh.core.scheduler import SessionScheduler
 from dasshh.ui.events import (
     AssistantResponseUpdate,
     AssistantResponseComplete,
@@ -18,8 +24,10 @@ from dasshh.ui.events import (
 
 @pytest.fixture
 def runtime(mock_session_service, reset_registry):
-    """Create a runtime instance for testing."""
-    return DasshhRuntime(mock_session_service)
+    """Create a runtime instance for testing, `start` does not import litellm."""
+    runtime = DasshhRuntime(mock_session_service, Config())
+    runtime._warm_up = MagicMock(return_value=None)
+    return runtime
 
 
 @pytest.fixture
@@ -54,8 +62,8 @@ def mock_post_message_callback():
 def test_initialization(runtime, mock_session_service):
     """Test initializing the runtime."""
     assert runtime._session_service is mock_session_service
-    assert runtime._worker is None
-    assert isinstance(runtime._queue, asyncio.Queue)
+    assert isinstance(runtime._scheduler, SessionScheduler)
+    assert not runtime._scheduler.running
 
 
 def test_system_prompt(runtime):
@@ -69,18 +77,60 @@ def test_system_prompt(runtime):
 async def test_start_stop(runtime):
     """Test starting and stopping the runtime."""
     await runtime.start()
-    assert runtime._worker is not None
-    assert not runtime._worker.done()
+    assert runtime._scheduler.running
 
     await runtime.stop()
-    assert runtime._worker is None
+    assert not runtime._scheduler.running
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_warm_up(runtime):
+    """Test that stopping the runtime waits for the thread loading litellm."""
+    release = threading.Event()
+    finished = threading.Event()
+
+    def warm_up(*args):
+        release.wait(5)
+        finished.set()
+
+    runtime._warm_up.side_effect = warm_up
+    await runtime.start()
+    asyncio.get_running_loop().call_later(0.05, release.set)
+    await runtime.stop()
+
+    assert finished.is_set()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_sets_context_window_on_loop(runtime):
+    """Test that the context window built by the warm-up is used, unless the model changed meanwhile."""
+    from dasshh.core.context_window import ContextWindow
+
+    window = ContextWindow(model="model-a", max_tokens=100)
+    runtime._warm_up.return_value = window
+    await runtime.start()
+    await runtime.wait_until_ready()
+    assert runtime._context_window is window
+    await runtime.stop()
+
+    def change_model(*args):
+        runtime.model = "model-b"
+        return window
+
+    runtime._warm_up.side_effect = change_model
+    with patch("dasshh.core.runtime.ContextWindow.for_model", return_value=ContextWindow(model="model-b")) as for_model:
+        await runtime.start()
+        await runtime.wait_until_ready()
+    for_model.assert_called_once_with("model-b", max_tokens=None)
+    assert runtime._context_window.model == "model-b"
+    await runtime.stop()
 
 
 @pytest.mark.asyncio
 async def test_submit_query(runtime, invocation_id, session_id, mock_post_message_callback):
     """Test submitting a query to the runtime."""
     with patch("uuid.uuid4", return_value=uuid.UUID(invocation_id)):
-        with patch.object(runtime._queue, "put", new_callable=AsyncMock) as mock_put:
+        with patch.object(runtime._scheduler, "put", new_callable=AsyncMock) as mock_put:
             await runtime.submit_query(
                 message="Test message",
                 session_id=session_id,
@@ -183,3 +233,295 @@ async def test_before_tool_call(runtime, invocation_context, mock_post_message_c
 async def test_handle_tool_calls(runtime, invocation_context, mock_tool):
     """Test the _handle_tool_calls method."""
     pass
+
+
+def make_tool_call(index, name, arguments="{}"):
+    """Create a streamed tool call."""
+    from litellm.types.utils import ChatCompletionDeltaToolCall, Function
+    return ChatCompletionDeltaToolCall(
+        id=f"call_{index}",
+        index=index,
+        type="function",
+        function=Function(name=name, arguments=arguments),
+    )
+
+
+def test_add_event_logs_failed_writes(runtime, invocation_context, caplog):
+    """Test that an event the session service could not save is logged."""
+    future = Future()
+    runtime._session_service.add_event.return_value = future
+    runtime._add_event(invocation_context, {"role": "user", "content": "Test message"})
+
+    with caplog.at_level(logging.ERROR, logger="dasshh.core.runtime"):
+        future.set_exception(RuntimeError("disk full"))
+
+    assert "disk full" in caplog.text
+    assert invocation_context.session_id in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_handle_tool_calls_runs_concurrently(runtime, invocation_context, mock_post_message_callback):
+    """Test that tool calls from one turn run concurrently and are recorded in order."""
+    import threading
+    from dasshh.core.registry import Registry
+    from dasshh.core.tools.function_tool import FunctionTool
+
+    # every tool waits for the others, so the calls only succeed if all three run at once
+    barrier = threading.Barrier(3, timeout=5)
+
+    def make_tool(name):
+        def func():
+            barrier.wait()
+            return {"tool": name}
+        return FunctionTool(name=name, description="", parameters={}, func=func)
+
+    for name in ["tool_a", "tool_b", "tool_c"]:
+        Registry().add_tool(make_tool(name))
+
+    runtime.skip_summarization = True
+    runtime._post_message_callbacks[invocation_context.invocation_id] = mock_post_message_callback
+    tool_calls = [make_tool_call(i, name) for i, name in enumerate(["tool_a", "tool_b", "tool_c"])]
+
+    await runtime._handle_tool_calls(invocation_context, tool_calls)
+    runtime._tool_executor.shutdown()
+
+    assert not barrier.broken
+
+    events = [call.kwargs["content"] for call in runtime._session_service.add_event.call_args_list]
+    assert events[0]["role"] == "assistant"
+    assert [event["tool_call_id"] for event in events[1:]] == ["call_0", "call_1", "call_2"]
+
+
+@pytest.mark.asyncio
+async def test_handle_tool_calls_records_errors(runtime, invocation_context, mock_post_message_callback):
+    """Test that a failing tool call still gets a tool result in the history."""
+    from dasshh.ui.events import AssistantToolCallError
+
+    runtime.skip_summarization = True
+    runtime._post_message_callbacks[invocation_context.invocation_id] = mock_post_message_callback
+
+    await runtime._handle_tool_calls(invocation_context, [make_tool_call(0, "missing_tool")])
+
+    posted = [call.args[0] for call in mock_post_message_callback.call_args_list]
+    assert any(isinstance(event, AssistantToolCallError) for event in posted)
+
+    tool_event = runtime._session_service.add_event.call_args_list[-1].kwargs["content"]
+    assert tool_event["role"] == "tool"
+    assert "Tool missing_tool not found" in tool_event["content"]
+
+
+def test_generate_prompt_uses_cache(runtime, invocation_context):
+    """Test that the session is read from the database once and then kept in sync."""
+    stored_event = MagicMock(content={"role": "user", "content": "Test message"})
+    runtime._session_service.get_events.return_value = [stored_event]
+
+    prompt = runtime._generate_prompt(invocation_context)
+    assert prompt[0] == runtime.system_prompt
+    assert prompt[1:] == [{"role": "user", "content": "Test message"}]
+
+    runtime._add_event(invocation_context, {"role": "assistant", "content": "Test response"})
+    prompt = runtime._generate_prompt(invocation_context)
+
+    runtime._session_service.get_events.assert_called_once_with(session_id=invocation_context.session_id)
+    assert prompt[1:] == [
+        {"role": "user", "content": "Test message"},
+        {"role": "assistant", "content": "Test response"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_process_query_coalesces_deltas(runtime, invocation_context, mock_post_message_callback):
+    """Test that streamed deltas are batched into fewer UI updates."""
+    def chunk(content):
+        return MagicMock(choices=[MagicMock(delta=MagicMock(content=content, tool_calls=None))])
+
+    async def fake_run_async(context):
+        for content in ["a", "b", "c", "d"]:
+            yield chunk(content)
+
+    runtime.stream_flush_interval_ms = 1000
+    runtime._post_message_callbacks[invocation_context.invocation_id] = mock_post_message_callback
+    with patch.object(runtime, "_run_async", fake_run_async):
+        await runtime._process_query(invocation_context, 0.0)
+
+    events = [call.args[0] for call in mock_post_message_callback.call_args_list]
+    updates = [event for event in events if isinstance(event, AssistantResponseUpdate)]
+    assert [update.content for update in updates] == ["abcd"]
+    assert isinstance(events[-1], AssistantResponseComplete)
+    assert events[-1].content == "abcd"
+
+
+def test_load_history_resolves_blobs(runtime, invocation_context):
+    """Test that the history sent to the model has the full text of events stored as blobs."""
+    stored = {"role": "tool", "tool_call_id": "1", "content": "{\"a\": ", "content_blob": "abc"}
+    full = {"role": "tool", "tool_call_id": "1", "content": "{\"a\": 1}"}
+    runtime._session_service.get_events.return_value = [MagicMock(content=stored)]
+    runtime._session_service.load_content.side_effect = lambda content: full if content is stored else content
+
+    assert runtime._load_history(invocation_context.session_id) == [full]
+
+
+def test_load_history_stops_at_the_context_window(runtime, invocation_context):
+    """Test that a long session is read a page at a time, only as far back as the context window reaches."""
+    from dasshh.core.context_window import ContextWindow
+
+    events = [MagicMock(seq=seq, content={"role": "user", "content": str(seq)}) for seq in range(1, 1001)]
+
+    def get_events(session_id, after_seq=None, limit=None, reverse=False):
+        older = [event for event in reversed(events) if after_seq is None or event.seq < after_seq]
+        return older[:limit]
+
+    runtime._session_service.get_events.side_effect = get_events
+    runtime._context_window = ContextWindow(max_tokens=500)
+    runtime.history_page_size = 20
+
+    with patch.object(runtime._context_window, "count_tokens", return_value=10):
+        history = runtime._load_history(invocation_context.session_id)
+
+    assert runtime._session_service.get_events.call_count == 3
+    assert [message["content"] for message in history] == [str(seq) for seq in range(941, 1001)]
+
+    runtime._session_service.get_events.reset_mock()
+    runtime._context_window = ContextWindow(max_tokens=None)
+    runtime._session_service.get_events.side_effect = lambda **kwargs: events
+    assert len(runtime._load_history(invocation_context.session_id)) == 1000
+
+
+@pytest.mark.asyncio
+async def test_queries_wait_until_ready(runtime, invocation_context, mock_post_message_callback):
+    """Test that a query submitted before litellm is loaded is processed once it is."""
+    loaded = asyncio.Event()
+    runtime._warm_up_task = asyncio.create_task(loaded.wait())
+    runtime._post_message_callbacks[invocation_context.invocation_id] = mock_post_message_callback
+
+    async def run_async(context):
+        yield MagicMock(choices=[MagicMock(delta=MagicMock(content="Hi", tool_calls=None))])
+
+    with patch.object(runtime, "_run_async", side_effect=run_async) as mock_run_async:
+        query = asyncio.create_task(runtime._process_query(invocation_context, 0))
+        await asyncio.sleep(0.01)
+        assert not mock_run_async.called
+
+        loaded.set()
+        await query
+
+    mock_run_async.assert_called_once()
+
+
+def test_config_settings(mock_session_service, reset_registry):
+    """Test that the runtime reads its settings from the configuration."""
+    config = Config.model_validate({
+        "dasshh": {"skip_summarization": True, "system_prompt": "Be brief.", "tool_workers": 2},
+        "model": {"name": "openai/gpt-4o", "api_key": "secret", "temperature": 0.2},
+    })
+    runtime = DasshhRuntime(mock_session_service, config)
+
+    assert runtime.skip_summarization
+    assert runtime.system_prompt["content"] == "Be brief."
+    assert runtime._tool_executor.max_workers == 2
+    assert runtime.model == "openai/gpt-4o"
+    assert runtime.temperature == 0.2
+
+
+def test_missing_api_key(mock_session_service, reset_registry):
+    """Test that a model without an API key is rejected."""
+    with pytest.raises(ValueError, match="API key is not set"):
+        DasshhRuntime(mock_session_service, Config.model_validate({"model": {"name": "openai/gpt-4o"}}))
+
+
+def test_apply_config(runtime):
+    """Test that a changed configuration is applied to the running runtime."""
+    config = Config.model_validate({
+        "dasshh": {"tool_workers": 8, "max_parallel_sessions": 1, "context_window_tokens": 1000},
+        "model": {"name": "openai/gpt-4o", "api_key": "secret"},
+    })
+    runtime._prompt_cache.get("session", lambda: [{"role": "user", "content": "Hi"}])
+    runtime.apply_config(config)
+
+    assert runtime.model == "openai/gpt-4o"
+    assert runtime.api_key == "secret"
+    assert runtime._tool_executor.max_workers == 8
+    assert runtime._context_window.model == "openai/gpt-4o"
+    assert runtime._context_window.max_tokens == 1000
+    # histories are loaded again for the new token budget
+    assert "session" not in runtime._prompt_cache
+    # needs a restart
+    assert runtime.max_parallel_sessions == 4
+
+
+def test_apply_config_without_api_key(runtime):
+    """Test that a configuration with a model but no API key changes nothing."""
+    with pytest.raises(ValueError, match="API key is not set"):
+        runtime.apply_config(Config.model_validate({"dasshh": {"tool_workers": 8}, "model": {"name": "openai/gpt-4o"}}))
+
+    assert runtime.model == ""
+    assert runtime.tool_workers == 4
+
+
+@pytest.mark.asyncio
+async def test_wait_for_invocation(runtime, session_id, mock_post_message_callback, mock_tool):
+    """Test that an invocation is done once its tool call results are summarized."""
+    Registry().add_tool(mock_tool)
+    tool_call = MagicMock(id="call-1")
+    tool_call.function.name = mock_tool.name
+    tool_call.function.arguments = "{}"
+    tool_call.model_dump.return_value = {
+        "id": "call-1", "type": "function", "function": {"name": mock_tool.name, "arguments": "{}"}
+    }
+    summarized = asyncio.Event()
+
+    async def run_async(context):
+        if context.system_instruction:
+            await asyncio.sleep(0.01)
+            summarized.set()
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content="Done", tool_calls=None))])
+        else:
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content=None, tool_calls=[tool_call]))])
+
+    runtime._warm_up_task = asyncio.get_running_loop().create_future()
+    runtime._warm_up_task.set_result(None)
+    runtime._scheduler.start()
+    with patch.object(runtime, "_run_async", side_effect=run_async):
+        invocation_id = await runtime.submit_query(
+            message="run the tool", session_id=session_id, post_message_callback=mock_post_message_callback
+        )
+        await asyncio.wait_for(runtime.wait_for_invocation(invocation_id), 1)
+
+    assert summarized.is_set()
+    assert invocation_id not in runtime._post_message_callbacks
+    assert runtime._pending_queries == {}
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancel_invocation(runtime, session_id, mock_post_message_callback):
+    """Test that cancelling an invocation stops its query and frees its session."""
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def run_async(context):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        yield
+
+    runtime._warm_up_task = asyncio.get_running_loop().create_future()
+    runtime._warm_up_task.set_result(None)
+    runtime._scheduler.start()
+    with patch.object(runtime, "_run_async", side_effect=run_async):
+        invocation_id = await runtime.submit_query(
+            message="hang", session_id=session_id, post_message_callback=mock_post_message_callback
+        )
+        await asyncio.wait_for(started.wait(), 1)
+        await runtime.cancel_invocation(invocation_id)
+        await asyncio.wait_for(runtime.wait_for_invocation(invocation_id), 1)
+
+    assert cancelled.is_set()
+    assert invocation_id not in runtime._post_message_callbacks
+    assert invocation_id not in runtime._completions
+    assert runtime._pending_queries == {}
+    assert not runtime._scheduler._workers
+    await runtime.stop()
@@ -0,0 +1,164 @@
+"""
+Tests for the session scheduler.
+"""
+import asyncio
+from collections import namedtuple
+
+import pytest
+
+from dasshh.core.scheduler import SessionScheduler
+
+Context = namedtuple("Context", ["invocation_id", "session_id"])
+
+
+def test_invalid_max_parallel_sessions():
+    """Test that the scheduler needs at least one parallel session."""
+    with pytest.raises(ValueError, match="max_parallel_sessions must be at least 1"):
+        SessionScheduler(handler=None, max_parallel_sessions=0)
+
+
+@pytest.mark.asyncio
+async def test_same_session_runs_in_order():
+    """Test that invocations of one session are processed one after another."""
+    processed = []
+
+    async def handler(context, queue_wait):
+        processed.append(("start", context.invocation_id))
+        await asyncio.sleep(0.01)
+        processed.append(("end", context.invocation_id))
+
+    scheduler = SessionScheduler(handler)
+    scheduler.start()
+    for i in range(3):
+        await scheduler.put(Context(invocation_id=str(i), session_id="s1"))
+
+    while scheduler.pending() or scheduler._workers:
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert processed == [
+        ("start", "0"), ("end", "0"),
+        ("start", "1"), ("end", "1"),
+        ("start", "2"), ("end", "2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sessions_run_in_parallel():
+    """Test that a slow session does not block other sessions."""
+    finished = []
+    release = asyncio.Event()
+
+    async def handler(context, queue_wait):
+        if context.session_id == "slow":
+            await release.wait()
+        finished.append(context.session_id)
+
+    scheduler = SessionScheduler(handler, max_parallel_sessions=2)
+    scheduler.start()
+    await scheduler.put(Context(invocation_id="1", session_id="slow"))
+    await scheduler.put(Context(invocation_id="2", session_id="fast"))
+
+    await asyncio.sleep(0.05)
+    assert finished == ["fast"]
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert finished == ["fast", "slow"]
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_parallel_limit():
+    """Test that no more than max_parallel_sessions sessions run at once."""
+    running = 0
+    peak = 0
+
+    async def handler(context, queue_wait):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    scheduler = SessionScheduler(handler, max_parallel_sessions=2)
+    scheduler.start()
+    for i in range(5):
+        await scheduler.put(Context(invocation_id=str(i), session_id=f"s{i}"))
+
+    while scheduler._workers:
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_reported():
+    """Test that queued invocations report how long they waited."""
+    waits = {}
+
+    async def handler(context, queue_wait):
+        waits[context.invocation_id] = queue_wait
+
+    scheduler = SessionScheduler(handler)
+    await scheduler.put(Context(invocation_id="queued", session_id="s1"))
+    assert scheduler.pending("s1") == 1
+
+    await asyncio.sleep(0.05)
+    scheduler.start()
+    while scheduler._workers:
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert waits["queued"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_handler_error_does_not_stop_session():
+    """Test that a failing invocation does not stop the rest of the session."""
+    processed = []
+
+    async def handler(context, queue_wait):
+        if context.invocation_id == "bad":
+            raise RuntimeError("boom")
+        processed.append(context.invocation_id)
+
+    scheduler = SessionScheduler(handler)
+    scheduler.start()
+    await scheduler.put(Context(invocation_id="bad", session_id="s1"))
+    await scheduler.put(Context(invocation_id="good", session_id="s1"))
+
+    while scheduler._workers:
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert processed == ["good"]
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    """Test that cancelling an invocation stops it and drops its queued contexts, but not the session."""
+    started = asyncio.Event()
+    processed = []
+
+    async def handler(context, queue_wait):
+        if context.invocation_id == "slow":
+            started.set()
+            await asyncio.sleep(10)
+        processed.append(context.invocation_id)
+
+    scheduler = SessionScheduler(handler)
+    scheduler.start()
+    await scheduler.put(Context(invocation_id="slow", session_id="s1"))
+    await scheduler.put(Context(invocation_id="slow", session_id="s1"))
+    await scheduler.put(Context(invocation_id="next", session_id="s1"))
+    await asyncio.wait_for(started.wait(), 1)
+
+    assert await scheduler.cancel("slow") == 1
+
+    while scheduler._workers:
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert processed == ["next"]
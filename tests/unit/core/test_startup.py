@@ -0,0 +1,34 @@
+"""
+Tests for the startup profiler.
+"""
+import importlib
+import sys
+
+from dasshh.core.startup import StartupProfiler
+
+
+def test_times_imports_and_phases(tmp_path, monkeypatch):
+    """Test that imports made while installed are timed and nested time is not counted twice."""
+    (tmp_path / "profiled_outer.py").write_text("import time\nimport profiled_inner\ntime.sleep(0.02)\n")
+    (tmp_path / "profiled_inner.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler()
+    profiler.install()
+    try:
+        importlib.import_module("profiled_outer")
+        profiler.mark("imported")
+    finally:
+        profiler.uninstall()
+        sys.modules.pop("profiled_outer", None)
+        sys.modules.pop("profiled_inner", None)
+
+    timings = {timing.name: timing for timing in profiler.imports}
+    assert timings["profiled_inner"].self_time >= 0.05
+    assert timings["profiled_outer"].cumulative >= 0.07
+    assert 0.02 <= timings["profiled_outer"].self_time < 0.05
+    assert profiler.phases[0][0] == "imported"
+
+    report = profiler.report()
+    assert "profiled_outer" in report
+    assert "imported" in report
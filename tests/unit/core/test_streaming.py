@@ -0,0 +1,64 @@
+"""
+Tests for the streaming delta buffer.
+"""
+import asyncio
+
+import pytest
+
+from dasshh.core.streaming import DeltaBuffer
+
+
+@pytest.mark.asyncio
+async def test_deltas_are_coalesced():
+    """Test that deltas within the interval are posted together."""
+    flushed = []
+    buffer = DeltaBuffer(flushed.append, interval=0.02, max_chars=100)
+
+    for delta in ["Hel", "lo", " wor", "ld"]:
+        buffer.add(delta)
+    assert flushed == []
+
+    await asyncio.sleep(0.05)
+    assert flushed == ["Hello world"]
+
+
+@pytest.mark.asyncio
+async def test_flush_on_max_chars():
+    """Test that reaching max_chars flushes right away."""
+    flushed = []
+    buffer = DeltaBuffer(flushed.append, interval=10, max_chars=5)
+
+    buffer.add("abc")
+    assert flushed == []
+    buffer.add("def")
+    assert flushed == ["abcdef"]
+    assert buffer._timer is None
+
+
+@pytest.mark.asyncio
+async def test_zero_interval_flushes_every_delta():
+    """Test that an interval of 0 disables coalescing."""
+    flushed = []
+    buffer = DeltaBuffer(flushed.append, interval=0)
+
+    buffer.add("a")
+    buffer.add("b")
+    assert flushed == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_explicit_flush_and_close():
+    """Test flushing pending deltas and dropping them."""
+    flushed = []
+    buffer = DeltaBuffer(flushed.append, interval=10)
+
+    buffer.add("a")
+    buffer.flush()
+    buffer.flush()
+    assert flushed == ["a"]
+
+    buffer.add("b")
+    buffer.close()
+    await asyncio.sleep(0)
+    assert flushed == ["a"]
+    assert buffer._timer is None
@@ -0,0 +1,131 @@
+"""
+Tests for the tool executor.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from dasshh.core.tools.executor import ToolExecutor
+from dasshh.core.tools.function_tool import FunctionTool
+from dasshh.core.tools.lazy_tool import LazyTool
+
+
+def make_tool(func):
+    return FunctionTool(name=func.__name__, description="", parameters={}, func=func)
+
+
+def test_invalid_max_workers():
+    """Test that the executor needs at least one worker."""
+    with pytest.raises(ValueError, match="max_workers must be at least 1"):
+        ToolExecutor(max_workers=0)
+
+
+@pytest.mark.asyncio
+async def test_run_sync_tool_in_thread():
+    """Test that synchronous tools run off the event loop thread."""
+    def current_thread() -> dict:
+        return {"thread": threading.current_thread().name}
+
+    executor = ToolExecutor(max_workers=1)
+    result = await executor.run(make_tool(current_thread))
+    executor.shutdown()
+
+    assert result["thread"].startswith("dasshh-tool")
+
+
+@pytest.mark.asyncio
+async def test_run_async_tool():
+    """Test that coroutine tools are awaited on the event loop."""
+    async def echo(value: str) -> dict:
+        return {"value": value}
+
+    executor = ToolExecutor()
+    result = await executor.run(make_tool(echo), value="test")
+
+    assert result == {"value": "test"}
+    assert executor._pool is None
+
+
+@pytest.mark.asyncio
+async def test_sync_tool_does_not_block_loop():
+    """Test that the event loop keeps running while a slow tool runs."""
+    def slow() -> dict:
+        time.sleep(0.2)
+        return {}
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    executor = ToolExecutor(max_workers=1)
+    ticker_task = asyncio.create_task(ticker())
+    await executor.run(make_tool(slow))
+    ticker_task.cancel()
+    executor.shutdown()
+
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_tool_exception_propagates():
+    """Test that exceptions raised by a tool reach the caller."""
+    def failing() -> dict:
+        raise RuntimeError("boom")
+
+    executor = ToolExecutor()
+    with pytest.raises(RuntimeError, match="boom"):
+        await executor.run(make_tool(failing))
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_lazy_tool_loads_off_the_loop(monkeypatch):
+    """Test that a lazy tool is loaded on a worker thread and the real tool is awaited."""
+    async def echo(value: str) -> dict:
+        return {"value": value}
+
+    load_threads = []
+
+    def load(self):
+        load_threads.append(threading.current_thread().name)
+        return make_tool(echo)
+
+    monkeypatch.setattr(LazyTool, "load", load)
+    executor = ToolExecutor(max_workers=1)
+    result = await executor.run(LazyTool("echo", "", {}, "tools"), value="hi")
+    executor.shutdown()
+
+    assert result == {"value": "hi"}
+    assert load_threads[0].startswith("dasshh-tool")
+
+
+@pytest.mark.asyncio
+async def test_resize():
+    """Test that resizing the executor starts a new pool for the next tool calls."""
+    def current_thread() -> dict:
+        return {"thread": threading.current_thread().name}
+
+    executor = ToolExecutor(max_workers=1)
+    await executor.run(make_tool(current_thread))
+    pool = executor._pool
+
+    executor.resize(2)
+    await executor.run(make_tool(current_thread))
+
+    assert executor.max_workers == 2
+    assert executor._pool is not pool
+    assert executor._pool._max_workers == 2
+    executor.shutdown()
+
+
+def test_shutdown_without_pool():
+    """Test shutting down an executor that never ran a tool."""
+    executor = ToolExecutor()
+    executor.shutdown()
+    assert executor._pool is None
@@ -92,3 +92,24 @@ def test_function_tool_get_declaration():
         mock_fn_to_dict.assert_called_once_with(test_func)
 
         assert declaration == expected_declaration
+
+
+def test_function_tool_declaration_is_cached():
+    """Test that the declaration is only built once."""
+    def test_func(test_param=None):
+        """A test function."""
+        return {"result": f"Test result with {test_param}"}
+
+    with patch(
+        "dasshh.core.tools.function_tool.function_to_dict",
+        return_value={"name": "test_function"}
+    ) as mock_fn_to_dict:
+        tool = FunctionTool(
+            name="test_function",
+            description="A test function",
+            parameters={"type": "object", "properties": {}},
+            func=test_func
+        )
+
+        assert tool.get_declaration() is tool.get_declaration()
+        mock_fn_to_dict.assert_called_once_with(test_func)
@@ -0,0 +1,66 @@
+"""
+Tests for the lazy tool placeholder.
+"""
+import sys
+import uuid
+
+import pytest
+
+from dasshh.core.registry import Registry
+from dasshh.core.tools.function_tool import FunctionTool
+from dasshh.core.tools.lazy_tool import LazyTool
+
+TOOL_MODULE = '''
+from dasshh.core.tools.decorator import tool
+
+
+@tool
+def greet(name: str) -> dict:
+    """Greet someone."""
+    return {"message": f"Hello, {name}!"}
+'''
+
+
+@pytest.fixture
+def tool_module(tmp_path):
+    """Write a module that defines a tool, without importing it."""
+    module = f"lazy_tools_{uuid.uuid4().hex}"
+    (tmp_path / f"{module}.py").write_text(TOOL_MODULE)
+    yield module, str(tmp_path)
+    sys.modules.pop(module, None)
+    if str(tmp_path) in sys.path:
+        sys.path.remove(str(tmp_path))
+
+
+def test_declaration_without_import(reset_registry, tool_module):
+    """Test that the declaration comes from the manifest, the module is not imported."""
+    module, sys_path = tool_module
+    declaration = {"type": "function", "function": {"name": "greet"}}
+    lazy = LazyTool("greet", "Greet someone.", declaration, module, sys_path)
+    Registry().add_tool(lazy)
+
+    assert Registry().get_tool_declarations() == [declaration]
+    assert module not in sys.modules
+
+
+def test_call_imports_the_module(reset_registry, tool_module):
+    """Test that the first call imports the module and the real tool replaces the placeholder."""
+    module, sys_path = tool_module
+    lazy = LazyTool("greet", "Greet someone.", {}, module, sys_path)
+    Registry().add_tool(lazy)
+
+    assert lazy(name="Ada") == {"message": "Hello, Ada!"}
+    assert module in sys.modules
+    tool = Registry().get_tool("greet")
+    assert isinstance(tool, FunctionTool)
+    assert lazy.load() is tool
+
+
+def test_tool_missing_from_module(reset_registry, tool_module):
+    """Test that a module that no longer defines the tool raises."""
+    module, sys_path = tool_module
+    lazy = LazyTool("wave", "Wave at someone.", {}, module, sys_path)
+    Registry().add_tool(lazy)
+
+    with pytest.raises(LookupError, match=f"Tool wave is not defined in {module}"):
+        lazy()
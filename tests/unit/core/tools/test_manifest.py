@@ -0,0 +1,135 @@
+"""
+Tests for the tool manifest.
+"""
+import os
+
+import pytest
+
+from dasshh.core.registry import Registry
+from dasshh.core.tools.function_tool import FunctionTool
+from dasshh.core.tools.lazy_tool import LazyTool
+from dasshh.core.tools.manifest import ToolManifest
+
+
+def greet(name: str) -> dict:
+    """Greet someone."""
+    return {"message": f"Hello, {name}!"}
+
+
+@pytest.fixture
+def tool_dir(tmp_path):
+    """A tool directory with a single package."""
+    package = tmp_path / "tools" / "greetings"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("from .hello import *\n")
+    (package / "hello.py").write_text("# tools\n")
+    return str(tmp_path / "tools")
+
+
+@pytest.fixture
+def greet_tool():
+    """A tool with a built declaration."""
+    tool = FunctionTool(name="greet", description="Greet someone.", parameters={}, func=greet)
+    tool.declaration = {"type": "function", "function": {"name": "greet"}}
+    return tool
+
+
+def test_fingerprint(tmp_path, tool_dir):
+    """Test that every Python file is fingerprinted, outside of __pycache__."""
+    pycache = os.path.join(tool_dir, "greetings", "__pycache__")
+    os.mkdir(pycache)
+    open(os.path.join(pycache, "stale.py"), "w").close()
+
+    files = ToolManifest(tmp_path / "tools.json").fingerprint(tool_dir)
+
+    assert set(files) == {os.path.join("greetings", "__init__.py"), os.path.join("greetings", "hello.py")}
+    mtime_ns, size, digest = files[os.path.join("greetings", "hello.py")]
+    assert size == len("# tools\n")
+    assert len(digest) == 64
+
+
+def test_round_trip(reset_registry, tmp_path, tool_dir, greet_tool):
+    """Test that recorded tools are registered as placeholders by the next manifest."""
+    manifest = ToolManifest(tmp_path / "tools.json")
+    manifest.record(tool_dir, manifest.fingerprint(tool_dir), [greet_tool])
+    manifest.save()
+
+    loaded = ToolManifest(tmp_path / "tools.json")
+    loaded.load()
+    tools = loaded.lookup(tool_dir, loaded.fingerprint(tool_dir))
+    loaded.register(Registry(), tools)
+
+    lazy = Registry().get_tool("greet")
+    assert isinstance(lazy, LazyTool)
+    assert lazy.module == __name__
+    assert lazy.get_declaration() == greet_tool.declaration
+
+
+def test_changed_file_misses(tmp_path, tool_dir, greet_tool):
+    """Test that a changed file invalidates the tools of its directory."""
+    manifest = ToolManifest(tmp_path / "tools.json")
+    manifest.record(tool_dir, manifest.fingerprint(tool_dir), [greet_tool])
+
+    with open(os.path.join(tool_dir, "greetings", "hello.py"), "a") as f:
+        f.write("# more tools\n")
+
+    assert manifest.lookup(tool_dir, manifest.fingerprint(tool_dir)) is None
+
+
+def test_touched_file_hits(tmp_path, tool_dir, greet_tool):
+    """Test that a file with a new modification time but the same contents still matches."""
+    manifest = ToolManifest(tmp_path / "tools.json")
+    manifest.record(tool_dir, manifest.fingerprint(tool_dir), [greet_tool])
+    manifest.save()
+
+    path = os.path.join(tool_dir, "greetings", "hello.py")
+    os.utime(path, ns=(0, 0))
+    files = manifest.fingerprint(tool_dir)
+
+    assert manifest.lookup(tool_dir, files) is not None
+    assert manifest.directories[tool_dir]["files"][os.path.join("greetings", "hello.py")][0] == 0
+
+
+def test_missing_declarations_are_filled_in(reset_registry, tmp_path, tool_dir, greet_tool):
+    """Test that tools recorded before their declaration was built are only saved once it is."""
+    declaration = greet_tool.declaration
+    greet_tool.declaration = None
+    manifest = ToolManifest(tmp_path / "tools.json")
+    manifest.record(tool_dir, manifest.fingerprint(tool_dir), [greet_tool])
+    manifest.save()
+
+    loaded = ToolManifest(tmp_path / "tools.json")
+    loaded.load()
+    assert loaded.directories == {}
+
+    Registry().add_tool(greet_tool)
+    greet_tool.declaration = declaration
+    manifest.update(Registry())
+    manifest.save()
+
+    loaded.load()
+    assert loaded.lookup(tool_dir, loaded.fingerprint(tool_dir))[0]["declaration"] == declaration
+
+
+def test_outdated_manifest_is_ignored(tmp_path):
+    """Test that a manifest of another version or an unreadable one is empty."""
+    path = tmp_path / "tools.json"
+    path.write_text('{"version": 0, "directories": {"/tools": {}}}')
+    manifest = ToolManifest(path)
+    manifest.load()
+    assert manifest.directories == {}
+
+    path.write_text("not json")
+    manifest.load()
+    assert manifest.directories == {}
+
+
+def test_register_keeps_imported_tools(reset_registry, tmp_path, tool_dir, greet_tool):
+    """Test that a placeholder does not replace a tool that is already imported."""
+    manifest = ToolManifest(tmp_path / "tools.json")
+    manifest.record(tool_dir, manifest.fingerprint(tool_dir), [greet_tool])
+    Registry().add_tool(greet_tool)
+
+    manifest.register(Registry(), manifest.lookup(tool_dir, manifest.fingerprint(tool_dir)))
+
+    assert Registry().get_tool("greet") is greet_tool
@@ -1,42 +1,41 @@
 """
 Test fixtures for the data module.
 """
-import os
-import tempfile
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
-from dasshh.data.client import Base, DBClient
+from dasshh.data.client import DBClient
 from dasshh.data.session import SessionService
 
 
 @pytest.fixture
-def test_db_file():
-    """Create a temporary database file."""
-    fd, path = tempfile.mkstemp()
-    try:
-        yield path
-    finally:
-        os.close(fd)
-        os.unlink(path)
+def test_db_file(tmp_path):
+    """Get a temporary database file path, backups made by migrations go next to it."""
+    return str(tmp_path / "dasshh.db")
 
 
 @pytest.fixture
 def test_db_client(monkeypatch, test_db_file):
     """Create a test database client with a temporary database."""
-    class TestDBClient(DBClient):
-        def __init__(self, db_path):
-            self.db_path = db_path
-            self.engine = create_engine(f"sqlite:///{self.db_path}")
-            self.DatabaseSessionFactory = sessionmaker(bind=self.engine)
-            Base.metadata.create_all(bind=self.engine)
-
-    client = TestDBClient(test_db_file)
-    return client
+    client = DBClient(db_path=test_db_file)
+    yield client
+    client.engine.dispose()
 
 
 @pytest.fixture
 def test_session_service(test_db_client):
     """Create a test session service."""
     return SessionService(test_db_client)
+
+
+@pytest.fixture
+def write_behind_session_service(test_db_client):
+    """Create a test session service that writes events in the background."""
+    service = SessionService(test_db_client, write_behind=True)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def fast_path_session_service(test_db_client):
+    """Create a test session service that skips the ORM for its hot paths."""
+    return SessionService(test_db_client, fast_path=True)
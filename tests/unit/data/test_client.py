@@ -1,6 +1,7 @@
 """
 Tests for the database client.
 """
+import pytest
 from sqlalchemy import Engine
 from sqlalchemy.orm import Session
 
@@ -27,3 +28,52 @@ def test_db_client_get_db_as_context_manager(test_db_client):
     with test_db_client.get_db() as db:
         assert db is not None
         assert isinstance(db, Session)
+
+
+def test_db_client_default_pragmas(test_db_client):
+    """Test that new connections use WAL journaling and the tuned pragmas."""
+    with test_db_client.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -16 * 1024
+
+
+def test_db_client_config(test_db_file):
+    """Test that the configuration overrides the defaults."""
+    client = DBClient(
+        db_path=test_db_file,
+        config={"journal_mode": "DELETE", "synchronous": "full", "busy_timeout_ms": 100, "pool_size": 2},
+    )
+    try:
+        assert client.engine.pool.size() == 2
+        with client.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 2
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 100
+    finally:
+        client.engine.dispose()
+
+
+def test_db_client_invalid_config(test_db_file):
+    """Test that invalid modes are rejected."""
+    with pytest.raises(ValueError):
+        DBClient(db_path=test_db_file, config={"journal_mode": "fast"})
+    with pytest.raises(ValueError):
+        DBClient(db_path=test_db_file, config={"synchronous": "sometimes"})
+
+
+def test_db_client_incremental_vacuum(test_db_client):
+    """Test that free pages are given back a step at a time."""
+    with test_db_client.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+        conn.exec_driver_sql("CREATE TABLE filler (data TEXT)")
+        conn.exec_driver_sql("INSERT INTO filler VALUES (?)", [("x" * 1000,)] * 500)
+        conn.commit()
+        conn.exec_driver_sql("DELETE FROM filler")
+        conn.commit()
+
+    free = test_db_client.free_pages()
+    assert free > 10
+    assert test_db_client.incremental_vacuum(10) == 10
+    assert test_db_client.free_pages() == free - 10
@@ -0,0 +1,115 @@
+"""
+Tests for the sqlite3 fast path of the session service.
+"""
+from datetime import datetime, timedelta
+
+from dasshh.data.fast_path import dumps, loads
+from dasshh.data.models import EventRecord, SessionSummary, StorageBlob, StorageEvent
+from dasshh.data.session import SessionService
+
+
+def test_add_and_get_events(fast_path_session_service, test_session_service):
+    """Test that events written without the ORM read back the same through both paths."""
+    session = fast_path_session_service.new_session()
+    contents = [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "tool_calls": [{"id": "1", "function": {"name": "f", "arguments": "{}"}}]},
+        {"role": "assistant", "content": "Hi there"},
+    ]
+    for i, content in enumerate(contents):
+        fast_path_session_service.add_event(invocation_id=str(i), session_id=session.id, content=content)
+
+    events = fast_path_session_service.get_events(session_id=session.id)
+    assert all(isinstance(event, EventRecord) for event in events)
+    assert [event.seq for event in events] == [1, 2, 3]
+    assert [event.content for event in events] == contents
+    assert isinstance(events[0].created_at, datetime)
+
+    orm_events = test_session_service.get_events(session_id=session.id)
+    assert [(e.id, e.invocation_id, e.seq, e.content, e.created_at) for e in orm_events] == [
+        (e.id, e.invocation_id, e.seq, e.content, e.created_at) for e in events
+    ]
+
+
+def test_get_events_pagination(fast_path_session_service):
+    """Test that the fast path pages events like the ORM path."""
+    session = fast_path_session_service.new_session()
+    for i in range(10):
+        fast_path_session_service.add_event(invocation_id=str(i), session_id=session.id, content={"i": i})
+
+    def page(**kwargs):
+        return [e.seq for e in fast_path_session_service.get_events(session_id=session.id, **kwargs)]
+
+    assert page(limit=3) == [1, 2, 3]
+    assert page(after_seq=3, limit=3) == [4, 5, 6]
+    assert page(after_seq=8) == [9, 10]
+    assert page(reverse=True, limit=3) == [10, 9, 8]
+    assert page(reverse=True, after_seq=3) == [2, 1]
+
+
+def test_session_summary_is_updated(fast_path_session_service):
+    """Test that adding events updates the summary columns of the session."""
+    session = fast_path_session_service.new_session()
+    fast_path_session_service.add_event(invocation_id="1", session_id=session.id, content={"role": "user", "content": "Hi"})
+    fast_path_session_service.add_event(invocation_id="1", session_id=session.id, content={"role": "tool", "content": "{}"})
+
+    summary = fast_path_session_service.list_session_summaries()[0]
+    assert summary.message_count == 1
+    assert summary.preview == "Hi"
+    assert summary.last_activity_at is not None
+
+
+def test_get_recent_session(fast_path_session_service):
+    """Test that the most recently updated session is returned as a summary."""
+    assert fast_path_session_service.get_recent_session() is None
+    fast_path_session_service.new_session(detail="Old")
+    recent = fast_path_session_service.new_session(detail="New")
+
+    session = fast_path_session_service.get_recent_session()
+    assert isinstance(session, SessionSummary)
+    assert (session.id, session.detail) == (recent.id, "New")
+
+
+def test_large_text_goes_to_the_blob_store(test_db_client, fast_path_session_service):
+    """Test that the fast path stores large text once in the blob store."""
+    session = fast_path_session_service.new_session()
+    text = "x" * (20 * 1024)
+    for i in range(2):
+        fast_path_session_service.add_event(
+            invocation_id=str(i), session_id=session.id, content={"role": "tool", "content": text}
+        )
+
+    events = fast_path_session_service.get_events(session_id=session.id)
+    assert events[0].content["content_blob"] == events[1].content["content_blob"]
+    assert fast_path_session_service.load_content(events[0].content)["content"] == text
+    with test_db_client.get_db() as db:
+        assert db.query(StorageBlob).count() == 1
+
+
+def test_archived_events_are_decompressed(fast_path_session_service):
+    """Test that the fast path reads archived events."""
+    session = fast_path_session_service.new_session()
+    content = {"role": "user", "content": "Archive me"}
+    fast_path_session_service.add_event(invocation_id="1", session_id=session.id, content=content)
+    fast_path_session_service.archive_idle_sessions(timedelta(seconds=-1))
+
+    assert fast_path_session_service.get_events(session_id=session.id)[0].content == content
+
+
+def test_write_behind_uses_the_fast_path(test_db_client):
+    """Test that batches of the background writer are written without the ORM."""
+    service = SessionService(test_db_client, write_behind=True, fast_path=True)
+    session = service.new_session()
+    for i in range(20):
+        service.add_event(invocation_id=str(i), session_id=session.id, content={"i": i})
+
+    assert [e.seq for e in service.get_events(session_id=session.id)] == list(range(1, 21))
+    with test_db_client.get_db() as db:
+        assert db.query(StorageEvent).count() == 20
+    service.close()
+
+
+def test_json_codec_round_trip():
+    """Test that the JSON codec reads back what it writes."""
+    value = {"role": "user", "content": "héllo ☃", "n": [1, 2.5, None, True]}
+    assert loads(dumps(value)) == value
@@ -0,0 +1,123 @@
+"""
+Tests for the schema migrations.
+"""
+import sqlite3
+from pathlib import Path
+
+from dasshh.data.client import DBClient
+from dasshh.data.migrations import MigrationRunner, latest_version
+from dasshh.data.session import SessionService
+
+OLD_SCHEMA = """
+CREATE TABLE sessions (id VARCHAR PRIMARY KEY, detail VARCHAR, created_at DATETIME, updated_at DATETIME);
+CREATE TABLE events (
+    id VARCHAR PRIMARY KEY, invocation_id VARCHAR, session_id VARCHAR REFERENCES sessions(id),
+    created_at DATETIME, content JSON
+);
+INSERT INTO sessions VALUES ('a', 'old', NULL, NULL), ('b', 'old', NULL, NULL), ('c', 'old', NULL, NULL);
+INSERT INTO events VALUES
+    ('z', '1', 'a', NULL, '{"role": "user", "content": "first"}'),
+    ('y', '1', 'b', NULL, '{"role": "tool", "content": "{}"}'),
+    ('x', '2', 'a', NULL, '{"role": "assistant", "content": "second"}'),
+    ('w', '3', NULL, NULL, '{"role": "user", "content": "orphan"}');
+"""
+
+
+def create_old_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(OLD_SCHEMA)
+    conn.close()
+
+
+def test_new_database_is_stamped_with_latest_version(test_db_client):
+    """Test that a new database is created at the latest version without migrations."""
+    runner = MigrationRunner(test_db_client.engine)
+    assert runner.current_version() == latest_version()
+    assert runner.pending() == []
+    assert runner.run() == []
+
+
+def test_old_database_is_migrated(test_db_file):
+    """Test that a database from an older version gets the new columns, indexes and backfills."""
+    create_old_database(test_db_file)
+
+    client = DBClient(db_path=test_db_file, config={"migration_batch_size": 1})
+    try:
+        with client.engine.connect() as conn:
+            seqs = conn.exec_driver_sql("SELECT id, seq FROM events ORDER BY rowid").all()
+            indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(events)")}
+            summaries = conn.exec_driver_sql("SELECT id, message_count, preview FROM sessions ORDER BY id").all()
+            version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+            auto_vacuum = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+    finally:
+        client.engine.dispose()
+
+    # the orphaned event is deleted
+    assert seqs == [("z", 1), ("y", 1), ("x", 2)]
+    assert {"ix_events_session_seq", "ix_events_content_blob"} <= indexes
+    # the switch to incremental vacuum waits for a full vacuum, which is not run on startup
+    assert auto_vacuum == 0
+    assert summaries == [("a", 2, "second"), ("b", 0, None), ("c", 0, None)]
+    assert version == latest_version()
+
+    service = SessionService(DBClient(db_path=test_db_file))
+    assert [result.session_id for result in service.search("second")] == ["a"]
+    service.db_client.vacuum()
+    with service.db_client.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+    service.db_client.engine.dispose()
+
+
+def test_migration_backs_up_and_runs_once(test_db_file):
+    """Test that the database is backed up before migrating, and a second run does nothing."""
+    create_old_database(test_db_file)
+
+    client = DBClient(db_path=test_db_file)
+    try:
+        backups = list(Path(test_db_file).parent.glob("dasshh.db.v0-*.bak"))
+        assert len(backups) == 1
+        backup = sqlite3.connect(backups[0])
+        assert backup.execute("SELECT COUNT(*) FROM events").fetchone() == (4,)
+        backup.close()
+
+        assert client.migrate() == []
+    finally:
+        client.engine.dispose()
+
+
+def test_migration_without_backup(test_db_file):
+    """Test that backups can be turned off."""
+    create_old_database(test_db_file)
+
+    client = DBClient(db_path=test_db_file, config={"backup_before_migration": False})
+    client.engine.dispose()
+
+    assert list(Path(test_db_file).parent.glob("*.bak")) == []
+
+
+def test_search_index_copy_is_dropped(test_db_file):
+    """Test that a full text index with its own copy of the text is replaced by one that reads the events."""
+    client = DBClient(db_path=test_db_file)
+    service = SessionService(client)
+    session = service.new_session()
+    service.add_event(invocation_id="1", session_id=session.id, content={"role": "user", "content": "list containers"})
+    with client.engine.begin() as conn:
+        for statement in (
+            "DROP TRIGGER events_fts_insert",
+            "DROP TRIGGER events_fts_delete",
+            "DROP TABLE events_fts",
+            "CREATE VIRTUAL TABLE events_fts USING fts5(text)",
+            "INSERT INTO events_fts (rowid, text) VALUES (1, 'list containers')",
+            "PRAGMA user_version = 8",
+        ):
+            conn.exec_driver_sql(statement)
+    client.engine.dispose()
+
+    service = SessionService(DBClient(db_path=test_db_file, config={"backup_before_migration": False}))
+    try:
+        with service.db_client.engine.connect() as conn:
+            tables = conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE name LIKE 'events_fts%'").scalars().all()
+        assert "events_fts_content" not in tables
+        assert [result.session_id for result in service.search("containers")] == [session.id]
+    finally:
+        service.db_client.engine.dispose()
@@ -0,0 +1,37 @@
+"""
+Tests for the background space reclaimer.
+"""
+from dasshh.data.reclaimer import SpaceReclaimer
+
+
+def fill_and_delete(db_client, rows=500):
+    with db_client.engine.connect() as conn:
+        conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS filler (data BLOB)")
+        conn.exec_driver_sql("INSERT INTO filler VALUES (?)", [(b"x" * 1000,)] * rows)
+        conn.commit()
+        conn.exec_driver_sql("DELETE FROM filler")
+        conn.commit()
+
+
+def test_reclaims_free_pages_while_idle(test_db_client):
+    """Test that all free pages are given back once nothing has been written for a while."""
+    fill_and_delete(test_db_client)
+    reclaimer = SpaceReclaimer(test_db_client, lambda: 60.0, interval=3600, pages_per_step=16)
+    try:
+        free = test_db_client.free_pages()
+        assert reclaimer.reclaim() == free
+        assert test_db_client.free_pages() == 0
+    finally:
+        reclaimer.close()
+
+
+def test_does_not_reclaim_while_busy(test_db_client):
+    """Test that nothing is reclaimed while events are being written."""
+    fill_and_delete(test_db_client)
+    reclaimer = SpaceReclaimer(test_db_client, lambda: 0.0, interval=3600)
+    try:
+        free = test_db_client.free_pages()
+        assert reclaimer.reclaim() == 0
+        assert test_db_client.free_pages() == free
+    finally:
+        reclaimer.close()
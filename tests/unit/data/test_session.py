@@ -2,8 +2,11 @@
 Tests for the session service.
 """
 import uuid
+from datetime import datetime, timedelta, timezone
 
-from dasshh.data.models import StorageSession
+from sqlalchemy import text
+
+from dasshh.data.models import MATCH_END, MATCH_START, StorageSession
 
 
 def test_new_session(test_session_service):
@@ -124,3 +127,240 @@ def test_add_event(test_session_service):
     assert events[0].invocation_id == invocation_id
     assert events[0].session_id == session.id
     assert events[0].content == content
+
+
+def test_add_event_write_behind(write_behind_session_service):
+    """Test that queued events are visible to get_events of the same session."""
+    service = write_behind_session_service
+    session = service.new_session(detail="Test Session")
+
+    futures = [
+        service.add_event(invocation_id=str(i), session_id=session.id, content={"index": i})
+        for i in range(50)
+    ]
+    events = service.get_events(session_id=session.id)
+
+    assert all(future.done() for future in futures)
+    assert sorted(event.content["index"] for event in events) == list(range(50))
+
+
+def test_add_event_returns_resolved_future(test_session_service):
+    """Test that a synchronous write returns a resolved future."""
+    session = test_session_service.new_session(detail="Test Session")
+    future = test_session_service.add_event(invocation_id="1", session_id=session.id, content={})
+    assert future.done()
+    assert future.result() is None
+
+
+def test_get_events_pagination(test_session_service):
+    """Test reading the events of a session in pages, forwards and backwards."""
+    session = test_session_service.new_session(detail="Test Session")
+    for i in range(10):
+        test_session_service.add_event(invocation_id=str(i), session_id=session.id, content={"index": i})
+
+    events = test_session_service.get_events(session_id=session.id)
+    assert [event.seq for event in events] == list(range(1, 11))
+
+    page = test_session_service.get_events(session_id=session.id, after_seq=3, limit=4)
+    assert [event.content["index"] for event in page] == [3, 4, 5, 6]
+
+    last = test_session_service.get_events(session_id=session.id, limit=3, reverse=True)
+    assert [event.content["index"] for event in last] == [9, 8, 7]
+
+    before = test_session_service.get_events(session_id=session.id, after_seq=last[-1].seq, limit=3, reverse=True)
+    assert [event.content["index"] for event in before] == [6, 5, 4]
+
+
+def test_event_seq_is_per_session(write_behind_session_service):
+    """Test that each session numbers its events from 1, also when written in a batch."""
+    service = write_behind_session_service
+    first = service.new_session()
+    second = service.new_session()
+    for i in range(3):
+        service.add_event(invocation_id=str(i), session_id=first.id, content={})
+        service.add_event(invocation_id=str(i), session_id=second.id, content={})
+
+    assert [event.seq for event in service.get_events(session_id=first.id)] == [1, 2, 3]
+    assert [event.seq for event in service.get_events(session_id=second.id)] == [1, 2, 3]
+
+
+def test_list_session_summaries(test_session_service):
+    """Test that the summary columns follow the events of a session."""
+    session = test_session_service.new_session(detail="Test Session")
+    empty = test_session_service.new_session(detail="Empty Session")
+    test_session_service.add_event(invocation_id="1", session_id=session.id, content={"role": "user", "content": "hi"})
+    test_session_service.add_event(
+        invocation_id="1",
+        session_id=session.id,
+        content={"role": "assistant", "content": None, "tool_calls": [{"id": "1"}]},
+    )
+    test_session_service.add_event(
+        invocation_id="1", session_id=session.id, content={"role": "tool", "tool_call_id": "1", "content": "{}"}
+    )
+    test_session_service.add_event(
+        invocation_id="1", session_id=session.id, content={"role": "assistant", "content": "x" * 500}
+    )
+
+    summaries = {summary.id: summary for summary in test_session_service.list_session_summaries()}
+
+    assert summaries[session.id].detail == "Test Session"
+    assert summaries[session.id].message_count == 2
+    assert summaries[session.id].preview == "x" * 120
+    assert summaries[session.id].last_activity_at is not None
+    assert summaries[empty.id].message_count == 0
+    assert summaries[empty.id].preview is None
+
+
+def test_search(test_session_service):
+    """Test full text search over user, assistant and tool events."""
+    first = test_session_service.new_session(detail="Docker")
+    second = test_session_service.new_session(detail="Files")
+    events = [
+        (first.id, {"role": "user", "content": "How do I list docker containers?"}),
+        (first.id, {"role": "assistant", "content": None, "tool_calls": [{"id": "1"}]}),
+        (first.id, {"role": "tool", "tool_call_id": "1", "content": '{"containers": ["web", "db"]}'}),
+        (second.id, {"role": "user", "content": "read the nginx config file"}),
+    ]
+    for session_id, content in events:
+        test_session_service.add_event(invocation_id="1", session_id=session_id, content=content)
+
+    results = test_session_service.search("dock")
+    assert [(r.session_id, r.detail, r.role, r.seq) for r in results] == [(first.id, "Docker", "user", 1)]
+    assert MATCH_START + "docker" + MATCH_END in results[0].snippet
+
+    assert [r.role for r in test_session_service.search("web")] == ["tool"]
+    assert [r.session_id for r in test_session_service.search("nginx file")] == [second.id]
+    assert test_session_service.search("nginx docker") == []
+    assert test_session_service.search('"AND NEAR( *') == []
+    assert test_session_service.search("   ") == []
+
+    test_session_service.delete_session(session_id=first.id)
+    with test_session_service.db_client.get_db() as db:
+        db.execute(text("DELETE FROM events WHERE session_id IS NULL"))
+        db.commit()
+    assert test_session_service.search("docker") == []
+
+
+def test_archive_idle_sessions(test_session_service):
+    """Test that idle sessions are compressed and read back transparently."""
+    idle = test_session_service.new_session(detail="Idle")
+    active = test_session_service.new_session(detail="Active")
+    content = {"role": "tool", "tool_call_id": "1", "content": "process " * 500}
+    for session_id in (idle.id, active.id):
+        test_session_service.add_event(invocation_id="1", session_id=session_id, content={"role": "user", "content": "ps"})
+        test_session_service.add_event(invocation_id="1", session_id=session_id, content=content)
+    with test_session_service.db_client.get_db() as db:
+        db.execute(
+            text("UPDATE sessions SET last_activity_at = :old WHERE id = :id"),
+            {"old": datetime.now(timezone.utc) - timedelta(days=40), "id": idle.id},
+        )
+        db.commit()
+
+    report = test_session_service.archive_idle_sessions(timedelta(days=30), batch_size=1)
+
+    assert (report.sessions, report.events) == (1, 2)
+    assert report.bytes_saved > 0
+    events = test_session_service.get_events(session_id=idle.id)
+    assert [event.content for event in events] == [{"role": "user", "content": "ps"}, content]
+    assert all(event.raw_content is None for event in events)
+    assert all(event.raw_content is not None for event in test_session_service.get_events(session_id=active.id))
+    assert {r.role for r in test_session_service.search("process") if r.session_id == idle.id} == {"tool"}
+
+    assert test_session_service.archive_idle_sessions(timedelta(days=30)).events == 0
+
+    # the index reads the archived text to remove it
+    test_session_service.delete_session(session_id=idle.id)
+    assert {r.session_id for r in test_session_service.search("process")} == {active.id}
+    with test_session_service.db_client.get_db() as db:
+        db.execute(text("INSERT INTO events_fts (events_fts) VALUES ('integrity-check')"))
+
+
+def test_search_index_has_no_copy_of_the_text(test_db_client):
+    """Test that the full text index reads the event text instead of storing it again."""
+    with test_db_client.get_db() as db:
+        tables = db.execute(text("SELECT name FROM sqlite_master WHERE name LIKE 'events_fts%'")).scalars().all()
+
+    assert "events_fts" in tables
+    assert "events_fts_content" not in tables
+
+
+def test_large_text_is_stored_once_in_the_blob_store(test_session_service):
+    """Test that large event text goes to the blob store, deduplicated and loaded on demand."""
+    session = test_session_service.new_session()
+    result = '{"processes": [' + ", ".join(f'"process {i}"' for i in range(3000)) + "]}"
+    test_session_service.add_event(
+        invocation_id="1", session_id=session.id, content={"role": "tool", "tool_call_id": "1", "content": result}
+    )
+    test_session_service.add_event(
+        invocation_id="1",
+        session_id=session.id,
+        content={"role": "tool", "tool_call_id": "2", "content": result},
+    )
+    test_session_service.add_event(invocation_id="1", session_id=session.id, content={"role": "user", "content": "hi"})
+
+    events = test_session_service.get_events(session_id=session.id)
+    blob_hash = events[0].content["content_blob"]
+
+    assert events[1].content["content_blob"] == blob_hash
+    assert len(events[0].content["content"]) < len(result)
+    assert "content_blob" not in events[2].content
+    assert test_session_service.get_blob(blob_hash) == result
+    assert test_session_service.load_content(events[0].content) == {
+        "role": "tool", "tool_call_id": "1", "content": result
+    }
+    assert test_session_service.load_content(events[2].content) is events[2].content
+    with test_session_service.db_client.get_db() as db:
+        assert db.execute(text("SELECT COUNT(*) FROM blobs")).scalar() == 1
+
+
+def test_search_finds_text_beyond_the_blob_preview(test_session_service, fast_path_session_service):
+    """Test that the full text of a blob is searchable, not only the preview kept in the event."""
+    result = "line\n" * 5000 + "needle"
+    sessions = []
+    for service in (test_session_service, fast_path_session_service):
+        session = service.new_session()
+        service.add_event(invocation_id="1", session_id=session.id, content={"role": "tool", "content": result})
+        sessions.append(session.id)
+
+    results = test_session_service.search("needle")
+
+    assert {r.session_id for r in results} == set(sessions)
+    assert all(MATCH_START + "needle" + MATCH_END in r.snippet for r in results)
+
+    for session_id in sessions:
+        test_session_service.delete_session(session_id=session_id)
+    assert test_session_service.search("needle") == []
+    with test_session_service.db_client.get_db() as db:
+        db.execute(text("INSERT INTO events_fts (events_fts) VALUES ('integrity-check')"))
+
+
+def test_blob_store_with_write_behind(write_behind_session_service):
+    """Test that the background writer also moves large text to the blob store."""
+    service = write_behind_session_service
+    session = service.new_session()
+    content = {"role": "user", "content": "x" * (service.blob_threshold + 1)}
+    service.add_event(invocation_id="1", session_id=session.id, content=content)
+
+    stored = service.get_events(session_id=session.id)[0].content
+
+    assert "content_blob" in stored
+    assert service.load_content(stored) == content
+
+
+def test_delete_session_deletes_events_and_unused_blobs(test_db_client, test_session_service):
+    """Test that deleting a session deletes its events and the blobs only it referenced."""
+    text_a, text_b = "a" * (20 * 1024), "b" * (20 * 1024)
+    kept = test_session_service.new_session()
+    deleted = test_session_service.new_session()
+    test_session_service.add_event(invocation_id="1", session_id=kept.id, content={"role": "tool", "content": text_a})
+    for content in (text_a, text_b):
+        test_session_service.add_event(invocation_id="2", session_id=deleted.id, content={"role": "tool", "content": content})
+
+    test_session_service.delete_session(session_id=deleted.id)
+
+    with test_db_client.get_db() as db:
+        assert db.execute(text("SELECT COUNT(*) FROM events")).scalar() == 1
+        assert db.execute(text("SELECT COUNT(*) FROM events WHERE session_id IS NULL")).scalar() == 0
+        assert db.execute(text("SELECT COUNT(*) FROM blobs")).scalar() == 1
+    event = test_session_service.get_events(session_id=kept.id)[0]
+    assert test_session_service.load_content(event.content)["content"] == text_a
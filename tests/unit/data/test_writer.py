@@ -0,0 +1,102 @@
+"""
+Tests for the background event writer.
+"""
+import threading
+
+import pytest
+
+from dasshh.data.fast_path import FastPath
+from dasshh.data.models import StorageEvent
+from dasshh.data.writer import EventWriter
+
+
+def count_events(db_client):
+    with db_client.get_db() as db:
+        return db.query(StorageEvent).count()
+
+
+def test_events_are_written_in_batches(test_db_client, test_session_service, monkeypatch):
+    """Test that queued events are grouped into a few transactions."""
+    session = test_session_service.new_session()
+    writer = EventWriter(test_db_client, max_delay=0.05)
+    batches = []
+    write = writer._write
+    monkeypatch.setattr(writer, "_write", lambda batch: (batches.append(len(batch)), write(batch)))
+
+    futures = [writer.submit(invocation_id="1", session_id=session.id, content={"i": i}) for i in range(100)]
+    writer.flush()
+
+    assert all(future.done() for future in futures)
+    assert sum(batches) == 100
+    assert len(batches) < 100
+    assert count_events(test_db_client) == 100
+    writer.close()
+
+
+def test_close_writes_queued_events(test_db_client, test_session_service):
+    """Test that closing the writer writes the queued events."""
+    session = test_session_service.new_session()
+    writer = EventWriter(test_db_client)
+    for i in range(10):
+        writer.submit(invocation_id="1", session_id=session.id, content={"i": i})
+    writer.close()
+
+    assert count_events(test_db_client) == 10
+    with pytest.raises(RuntimeError):
+        writer.submit(invocation_id="1", session_id=session.id, content={})
+
+
+def test_flush_session_only_waits_for_that_session(test_db_client, test_session_service, monkeypatch):
+    """Test that flushing a session without queued events returns right away."""
+    writer = EventWriter(test_db_client)
+    release = threading.Event()
+    write = writer._write
+    monkeypatch.setattr(writer, "_write", lambda batch: (release.wait(), write(batch)))
+
+    future = writer.submit(invocation_id="1", session_id="busy", content={})
+    writer.flush("idle", timeout=1)
+
+    assert not future.done()
+    release.set()
+    writer.flush("busy", timeout=1)
+    assert future.done()
+    writer.close()
+
+
+def test_failed_batch_sets_exception(test_db_client, monkeypatch):
+    """Test that a failed write resolves the futures of the batch with the error."""
+    writer = EventWriter(test_db_client)
+
+    def fail():
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(test_db_client, "get_db", fail)
+    future = writer.submit(invocation_id="1", session_id="1", content={})
+
+    assert isinstance(future.exception(timeout=1), RuntimeError)
+    writer.close()
+
+
+@pytest.mark.parametrize("fast_path", [False, True])
+def test_failed_batch_writes_other_events(test_db_client, test_session_service, monkeypatch, fast_path):
+    """Test that an event that can not be written does not fail the other events of its batch."""
+    session_a = test_session_service.new_session()
+    session_b = test_session_service.new_session()
+    writer = EventWriter(test_db_client, max_delay=0.05, fast_path=FastPath(test_db_client) if fast_path else None)
+    release = threading.Event()
+    batches = []
+    write = writer._write
+    monkeypatch.setattr(writer, "_write", lambda batch: (release.wait(), batches.append(len(batch)), write(batch)))
+
+    good_a = writer.submit(invocation_id="1", session_id=session_a.id, content={"role": "user", "content": "a"})
+    bad = writer.submit(invocation_id="2", session_id=session_b.id, content={"value": object()})
+    good_b = writer.submit(invocation_id="2", session_id=session_b.id, content={"role": "user", "content": "b"})
+    release.set()
+    writer.flush(timeout=5)
+
+    assert batches[0] == 3
+    assert good_a.exception(timeout=1) is None
+    assert good_b.exception(timeout=1) is None
+    assert bad.exception(timeout=1) is not None
+    assert count_events(test_db_client) == 2
+    writer.close()
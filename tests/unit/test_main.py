@@ -3,7 +3,10 @@ Tests for the main CLI entry point.
 """
 from unittest.mock import patch
 
+import pytest
+
 from dasshh.__main__ import main
+from dasshh.core.config import ConfigStore
 
 
 def test_version_option(cli_runner):
@@ -21,3 +24,80 @@ def test_main_no_command(mock_dasshh, cli_runner):
     assert mock_dasshh.called
     assert mock_app_instance.run.called
     assert result.exit_code == 0
+
+
+def test_db_compact(cli_runner, tmp_path, monkeypatch):
+    """Test the db compact command archives idle sessions and reports the sizes."""
+    from dasshh.data.client import DBClient
+
+    monkeypatch.setattr(DBClient, "db_path", tmp_path / "dasshh.db")
+    monkeypatch.setattr("dasshh.core.config.config_store.path", tmp_path / "config.yaml")
+
+    result = cli_runner.invoke(main, ["db", "compact", "--idle-days", "0"])
+
+    assert result.exit_code == 0, result.output
+    assert "Archived 0 events of 0 sessions idle for over 0 days" in result.output
+    assert "Database size:" in result.output
+
+
+def test_profile_startup(cli_runner):
+    """Test that --profile-startup runs the app until it is ready and prints the report."""
+    with patch("dasshh.ui.app.Dasshh") as mock_dasshh:
+        result = cli_runner.invoke(main, ["--profile-startup"])
+
+    assert result.exit_code == 0, result.output
+    assert mock_dasshh.return_value.run.call_args.kwargs["auto_pilot"] is not None
+    assert "Startup profile" in result.output
+    assert "Import time by package" in result.output
+
+
+@pytest.fixture
+def model_config(tmp_path, monkeypatch):
+    """A configuration file with a model."""
+    path = tmp_path / "config.yaml"
+    path.write_text("model:\n  name: openai/gpt-4o\n  api_key: secret\n")
+    monkeypatch.setattr("dasshh.core.config.config_store", ConfigStore(path))
+    return path
+
+
+def run_batch_returning(failed: int, calls: list):
+    async def run_batch(prompts, config, concurrency, output, timeout):
+        calls.append((list(prompts), concurrency, output, timeout))
+        return failed
+    return run_batch
+
+
+def test_run_prompts(cli_runner, model_config):
+    """Test that the run command runs the prompts given as arguments."""
+    calls = []
+    with patch("dasshh.__main__._run_batch", run_batch_returning(0, calls)):
+        result = cli_runner.invoke(main, ["run", "uptime", "df -h", "--timeout", "30"])
+
+    assert result.exit_code == 0, result.output
+    prompts, concurrency, output, timeout = calls[0]
+    assert [(prompt.id, prompt.text) for prompt in prompts] == [(1, "uptime"), (2, "df -h")]
+    assert (concurrency, output, timeout) == (1, "text", 30)
+
+
+def test_run_file_with_concurrency(cli_runner, model_config, tmp_path):
+    """Test that prompts are read from a JSONL file and a failed prompt fails the command."""
+    prompt_file = tmp_path / "prompts.jsonl"
+    prompt_file.write_text('{"id": "disk", "prompt": "df -h"}\n"uptime"\n')
+    calls = []
+    with patch("dasshh.__main__._run_batch", run_batch_returning(1, calls)):
+        result = cli_runner.invoke(main, ["run", "--file", str(prompt_file), "--concurrency", "4"])
+
+    assert result.exit_code == 1
+    prompts, concurrency, output, _ = calls[0]
+    assert [(prompt.id, prompt.text) for prompt in prompts] == [("disk", "df -h"), (2, "uptime")]
+    assert (concurrency, output) == (4, "jsonl")
+
+
+def test_run_without_model(cli_runner, tmp_path, monkeypatch):
+    """Test that the run command needs a model."""
+    monkeypatch.setattr("dasshh.core.config.config_store", ConfigStore(tmp_path / "config.yaml"))
+
+    result = cli_runner.invoke(main, ["run", "uptime"])
+
+    assert result.exit_code == 2
+    assert "No model is configured" in result.output
@@ -106,3 +106,28 @@ def test_action_render_without_result(mock_app_prop, mock_syntax):
     assert isinstance(rendered.renderables[0], Text)
     assert "Using tool: test_tool" in rendered.renderables[0].plain
     assert rendered.renderables[1] == mock_args_syntax
+
+
+def test_action_click_loads_full_result():
+    """Test that clicking an action with a truncated result requests the full result."""
+    action = Action(
+        invocation_id="test_invocation",
+        tool_call_id="test_tool_call",
+        name="test_tool",
+        args="{}",
+        result='{"result": "suc',
+        result_blob="abc123",
+    )
+    action.post_message = MagicMock()
+
+    action.on_click()
+
+    message = action.post_message.call_args[0][0]
+    assert (message.invocation_id, message.tool_call_id, message.blob_hash) == (
+        "test_invocation", "test_tool_call", "abc123"
+    )
+
+    action.result_blob = None
+    action.post_message.reset_mock()
+    action.on_click()
+    action.post_message.assert_not_called()
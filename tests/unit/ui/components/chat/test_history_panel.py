@@ -0,0 +1,123 @@
+"""Tests for the HistoryPanel component."""
+from datetime import datetime
+
+import pytest
+from textual.app import App
+from textual.widgets import Input
+
+from dasshh.data.models import MATCH_END, MATCH_START
+from dasshh.ui.components.chat.history_item import DeleteIcon, HistoryItem, SearchResultItem
+from dasshh.ui.components.chat.history_panel import HistoryPanel
+from dasshh.ui.events import DeleteSession, SearchSessions
+from dasshh.ui.types import UISearchResult, UISession
+
+
+class HistoryPanelApp(App):
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+
+    def compose(self):
+        yield HistoryPanel()
+
+    def on_search_sessions(self, event: SearchSessions) -> None:
+        self.queries.append(event.query)
+
+
+def make_session(session_id, **kwargs):
+    now = datetime.now()
+    return UISession(
+        id=session_id, detail=f"session {session_id}", created_at=now, updated_at=now, messages=[], actions=[], **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_set_current_session():
+    """Test that only the current session is selected."""
+    app = HistoryPanelApp()
+    async with app.run_test() as pilot:
+        panel = app.query_one(HistoryPanel)
+        panel.load_sessions([make_session("1"), make_session("2")], current="1")
+        await pilot.pause()
+
+        panel.add_session(make_session("3"))
+        panel.set_current_session("3")
+        await pilot.pause()
+
+        selected = [item.session_id for item in panel.query(HistoryItem) if item.selected]
+        assert selected == ["3"]
+        assert [icon.session_id for icon in panel.query(DeleteIcon) if icon.selected] == ["3"]
+        assert panel.get_history_item_widget("2").session_id == "2"
+
+
+@pytest.mark.asyncio
+async def test_session_summary_is_shown():
+    """Test that the message count and preview of a session are shown and follow new messages."""
+    app = HistoryPanelApp()
+    async with app.run_test() as pilot:
+        panel = app.query_one(HistoryPanel)
+        panel.load_sessions([make_session("1", message_count=2, preview="disk usage is 40%\nof 100G")], current="1")
+        await pilot.pause()
+
+        item = panel.get_history_item_widget("1")
+        rendered = [line.plain for line in item.render().renderables]
+        assert rendered[1] == "disk usage is 40%"
+        assert rendered[2].endswith("· 2 messages")
+
+        item.add_message("check memory")
+        rendered = [line.plain for line in item.render().renderables]
+        assert rendered[1] == "check memory"
+        assert rendered[2].startswith("Today at ")
+        assert rendered[2].endswith("· 3 messages")
+
+
+@pytest.mark.asyncio
+async def test_delete_session():
+    """Test that deleting a session removes its widgets and its index entry."""
+    app = HistoryPanelApp()
+    async with app.run_test() as pilot:
+        panel = app.query_one(HistoryPanel)
+        panel.load_sessions([make_session("1"), make_session("2")], current="2")
+        await pilot.pause()
+
+        panel.post_message(DeleteSession(session_id="2"))
+        await pilot.pause()
+
+        assert panel.get_history_item_widget("2") is None
+        assert [item.session_id for item in panel.query(HistoryItem)] == ["1"]
+        assert len(panel.query(DeleteIcon)) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_results_replace_sessions():
+    """Test that typing a query posts a search and its results are shown instead of the sessions."""
+    app = HistoryPanelApp()
+    async with app.run_test() as pilot:
+        panel = app.query_one(HistoryPanel)
+        panel.search_delay = 0.01
+        panel.load_sessions([make_session("1")], current="1")
+        panel.query_one("#history-search", Input).value = "docker"
+        # the search is posted once the debounce timer fires
+        for _ in range(100):
+            if app.queries:
+                break
+            await pilot.pause(0.01)
+
+        assert app.queries == ["docker"]
+
+        panel.show_search_results("docker", [
+            UISearchResult(session_id="1", detail="session 1", role="user", snippet=f"list {MATCH_START}docker{MATCH_END}")
+        ])
+        await pilot.pause()
+
+        assert panel.has_class("-searching")
+        assert [item.session_id for item in panel.query(SearchResultItem)] == ["1"]
+
+        panel.show_search_results("stale", [])
+        assert len(panel.query(SearchResultItem)) == 1
+
+        panel.query_one("#history-search", Input).value = ""
+        await pilot.pause()
+
+        assert not panel.has_class("-searching")
+        assert len(panel.query(SearchResultItem)) == 0
@@ -1,9 +1,9 @@
 """Tests for the ChatMessage component."""
 from rich.console import Group
-from rich.markdown import Markdown
 from rich.text import Text
 
 from dasshh.ui.components.chat.message import ChatMessage
+from dasshh.ui.components.chat.streaming_markdown import StreamingMarkdown
 
 
 def test_chat_message_initialization_user():
@@ -52,7 +52,7 @@ def test_chat_message_render_user():
     assert "You" in title.plain
 
     content = rendered.renderables[1]
-    assert isinstance(content, Markdown)
+    assert isinstance(content, StreamingMarkdown)
     assert content.markup == "Hello, world!"
 
 
@@ -73,7 +73,7 @@ def test_chat_message_render_assistant():
     assert "Dasshh" in title.plain
 
     content = rendered.renderables[1]
-    assert isinstance(content, Markdown)
+    assert isinstance(content, StreamingMarkdown)
     assert content.markup == "Hello, I'm the assistant!"
 
 
@@ -0,0 +1,159 @@
+"""Tests for the MessageList component."""
+import pytest
+from textual.app import App
+
+from dasshh.ui.components.chat.message import ChatMessage
+from dasshh.ui.components.chat.message_list import MessageList
+from dasshh.ui.events import LoadOlderMessages
+from dasshh.ui.types import UIMessage
+
+
+class MessageListApp(App):
+    def __init__(self):
+        super().__init__()
+        self.load_requests = 0
+
+    def compose(self):
+        yield MessageList()
+
+    def on_load_older_messages(self, _: LoadOlderMessages) -> None:
+        self.load_requests += 1
+
+
+async def settle(pilot):
+    """Let pending mounts, layout and scrolling finish."""
+    for _ in range(5):
+        await pilot.pause(0.01)
+
+
+def make_messages(count, start=0):
+    return [
+        UIMessage(invocation_id=str(i), role="assistant", content=f"message {i}\n\nsome text")
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_only_visible_messages_are_mounted():
+    """Test that a long session only mounts the messages in view."""
+    app = MessageListApp()
+    async with app.run_test(size=(80, 30)) as pilot:
+        message_list = app.query_one(MessageList)
+        message_list.set_messages(make_messages(300))
+        await settle(pilot)
+
+        mounted = message_list.query(ChatMessage)
+        assert 0 < len(mounted) < 30
+        assert mounted.last().invocation_id == "299"
+
+        message_list.scroll_home(animate=False)
+        await settle(pilot)
+
+        assert message_list.query(ChatMessage).first().invocation_id == "0"
+        assert len(message_list.query(ChatMessage)) < 30
+
+
+@pytest.mark.asyncio
+async def test_update_message_out_of_view():
+    """Test streaming into a message that is not mounted keeps the scroll position."""
+    app = MessageListApp()
+    async with app.run_test(size=(80, 30)) as pilot:
+        message_list = app.query_one(MessageList)
+        message_list.set_messages(make_messages(100))
+        await settle(pilot)
+        message_list.add_message(UIMessage(invocation_id="new", role="assistant", content=""))
+        await settle(pilot)
+        message_list.scroll_home(animate=False)
+        await settle(pilot)
+
+        widget = message_list.update_message(invocation_id="new", content="streamed")
+        await settle(pilot)
+
+        assert widget is None
+        assert message_list.scroll_y == 0
+        assert message_list.messages[-1].content == "streamed"
+
+
+@pytest.mark.asyncio
+async def test_update_message_follows_end():
+    """Test streaming into the last message while scrolled to the end."""
+    app = MessageListApp()
+    async with app.run_test(size=(80, 30)) as pilot:
+        message_list = app.query_one(MessageList)
+        message_list.set_messages(make_messages(20))
+        message_list.add_message(UIMessage(invocation_id="new", role="assistant", content=""))
+        await settle(pilot)
+
+        message_list.update_message(invocation_id="new", content="hello")
+        widget = message_list.update_message(invocation_id="new", content=" world")
+        await settle(pilot)
+
+        assert widget is not None
+        assert widget.content == "hello world"
+        message_list.update_message(invocation_id="new", content="final", final=True)
+        assert widget.content == "final"
+
+
+@pytest.mark.asyncio
+async def test_update_message_uses_latest_assistant_message():
+    """Test that updates go to the latest assistant message of an invocation."""
+    app = MessageListApp()
+    async with app.run_test(size=(80, 30)) as pilot:
+        message_list = app.query_one(MessageList)
+        message_list.set_messages([
+            UIMessage(invocation_id="1", role="user", content="hi"),
+            UIMessage(invocation_id="1", role="assistant", content="first"),
+        ])
+        message_list.add_message(UIMessage(invocation_id="1", role="assistant", content=""))
+        await settle(pilot)
+
+        message_list.update_message(invocation_id="1", content="second")
+
+        assert [m.content for m in message_list.messages] == ["hi", "first", "second"]
+        assert message_list.update_message(invocation_id="unknown", content="x") is None
+
+        message_list.clear()
+        assert message_list.update_message(invocation_id="1", content="x") is None
+
+
+@pytest.mark.asyncio
+async def test_scrolling_to_top_loads_older_messages():
+    """Test that older messages are asked for at the top and added above without moving the view."""
+    app = MessageListApp()
+    async with app.run_test(size=(80, 30)) as pilot:
+        message_list = app.query_one(MessageList)
+        message_list.set_messages(make_messages(100, start=50), more_above=True)
+        await settle(pilot)
+        assert app.load_requests == 0
+
+        message_list.scroll_home(animate=False)
+        await settle(pilot)
+        assert app.load_requests == 1
+        assert not message_list.more_above
+
+        message_list.prepend_messages(make_messages(50), more_above=False)
+        await settle(pilot)
+
+        assert [m.invocation_id for m in message_list.messages] == [str(i) for i in range(150)]
+        assert message_list.scroll_y > 0
+        mounted = [widget.invocation_id for widget in message_list.query(ChatMessage)]
+        assert "50" in mounted
+        assert message_list.update_message(invocation_id="149", content="x") is None
+        assert message_list.messages[-1].content.endswith("x")
+
+        message_list.scroll_home(animate=False)
+        await settle(pilot)
+        assert app.load_requests == 1
+        assert message_list.query(ChatMessage).first().invocation_id == "0"
+
+
+@pytest.mark.asyncio
+async def test_short_page_loads_older_messages():
+    """Test that a page that does not fill the view asks for older messages right away."""
+    app = MessageListApp()
+    async with app.run_test(size=(80, 30)) as pilot:
+        message_list = app.query_one(MessageList)
+        message_list.set_messages(make_messages(1), more_above=True)
+        await settle(pilot)
+
+        assert app.load_requests == 1
@@ -0,0 +1,167 @@
+"""Tests for the StreamingMarkdown renderable."""
+from unittest.mock import patch
+
+from rich.console import Console
+from rich.markdown import Markdown
+
+from dasshh.ui.components.chat.streaming_markdown import StreamingMarkdown, split_blocks
+
+
+def render(renderable, width=40):
+    console = Console(width=width, record=True, color_system=None)
+    console.print(renderable)
+    return console.export_text()
+
+
+def test_split_blocks():
+    """Test splitting text into finished blocks and the open block."""
+    blocks, tail = split_blocks("# Title\n\nParagraph one\nstill one\n\nOpen")
+    assert blocks == ["# Title", "Paragraph one\nstill one"]
+    assert tail == "Open"
+
+
+def test_split_blocks_keeps_fenced_code_together():
+    """Test that blank lines inside a code fence do not end a block."""
+    blocks, tail = split_blocks("```python\na = 1\n\nb = 2\n```\n\nafter")
+    assert blocks == ["```python\na = 1\n\nb = 2\n```"]
+    assert tail == "after"
+
+    blocks, tail = split_blocks("```\nopen fence\n\nstill open")
+    assert blocks == []
+    assert tail == "```\nopen fence\n\nstill open"
+
+
+def test_split_blocks_keeps_the_last_line_open():
+    """Test that a trailing newline or blank line does not finish the open block."""
+    assert split_blocks("para two\n") == ([], "para two\n")
+    assert split_blocks("para one\n\n") == ([], "para one\n\n")
+    assert split_blocks("| a | b |\n|---|---|\n") == ([], "| a | b |\n|---|---|\n")
+
+
+def test_split_blocks_keeps_blocks_spanning_blank_lines():
+    """Test that loose lists, block quotes and indented code stay in one block."""
+    blocks, tail = split_blocks("- one\n\n- two\n\n  more two\n\nafter")
+    assert blocks == ["- one\n\n- two\n\n  more two"]
+    assert tail == "after"
+
+    blocks, tail = split_blocks("> one\n\n> two\n\n    code\n\n    more\n\nafter")
+    assert blocks == ["> one\n\n> two", "    code\n\n    more"]
+    assert tail == "after"
+
+    # the streamed line may still become the next list item
+    assert split_blocks("1. one\n\n2") == ([], "1. one\n\n2")
+
+
+def test_render_matches_markdown():
+    """Test that the rendered text matches a plain markdown render."""
+    text = "# Title\n\nSome *text* here.\n\n- one\n- two\n\n```\ncode\n```"
+    assert render(StreamingMarkdown(text)).split() == render(Markdown(text)).split()
+
+
+def test_streaming_updates_only_scan_new_text():
+    """Test that appending text keeps the finished blocks."""
+    markdown = StreamingMarkdown("Para one")
+    markdown.update("Para one\n\nPara two")
+    assert markdown._blocks == ["Para one"]
+    assert markdown._tail == "Para two"
+
+    markdown.update("Para one\n\nPara two continues\n\nThree")
+    assert markdown._blocks == ["Para one", "Para two continues"]
+    assert markdown._tail == "Three"
+
+
+def test_non_append_update_starts_over():
+    """Test that replacing the text drops the finished blocks."""
+    markdown = StreamingMarkdown("Para one\n\nPara two")
+    markdown.update("Something else")
+    assert markdown._blocks == []
+    assert markdown.markup == "Something else"
+
+
+def test_finished_blocks_are_rendered_once():
+    """Test that finished blocks are not rendered again while streaming."""
+    markdown = StreamingMarkdown("Para one\n\nPara two")
+    render(markdown)
+
+    with patch.object(markdown, "_render_block", wraps=markdown._render_block) as render_block:
+        markdown.update("Para one\n\nPara two and more")
+        render(markdown)
+        assert render_block.call_count == 1
+        assert render_block.call_args.args[2] == "Para two and more"
+
+
+def test_width_change_renders_again():
+    """Test that a different width invalidates the cached lines."""
+    markdown = StreamingMarkdown("Para one\n\nPara two")
+    render(markdown, width=40)
+
+    with patch.object(markdown, "_render_block", wraps=markdown._render_block) as render_block:
+        render(markdown, width=40)
+        assert render_block.call_count == 0
+        render(markdown, width=20)
+        assert render_block.call_count == 2
+
+
+DOCUMENT = """# Title
+
+A paragraph
+over two lines.
+
+| Name | Value |
+|------|-------|
+| a    | 1     |
+| b    | 2     |
+
+- loose
+- list
+
+- with a gap
+
+> a quote
+> over two lines
+
+```python
+a = 1
+
+b = 2
+```
+
+1. one
+2. two
+
+---
+
+The end.
+"""
+
+
+def test_streaming_line_by_line_matches_markdown():
+    """Test that a document streamed one line at a time renders like the whole document."""
+    markdown = StreamingMarkdown()
+    text = ""
+    for line in DOCUMENT.splitlines(keepends=True):
+        text += line
+        markdown.update(text)
+        render(markdown, width=60)
+    assert render(markdown, width=60) == render(Markdown(DOCUMENT), width=60)
+
+
+def test_streaming_chars_matches_markdown():
+    """Test that a document streamed in small chunks renders like the whole document."""
+    markdown = StreamingMarkdown()
+    for end in range(0, len(DOCUMENT) + 3, 3):
+        markdown.update(DOCUMENT[:end])
+        render(markdown, width=60)
+    assert render(markdown, width=60) == render(Markdown(DOCUMENT), width=60)
+
+
+def test_link_definitions_apply_to_every_block():
+    """Test that a link reference definition in a later block resolves the links of earlier ones."""
+    text = "See [the docs][ref].\n\nMore text.\n\n[ref]: https://example.com\n"
+    markdown = StreamingMarkdown()
+    for end in range(0, len(text) + 3, 3):
+        markdown.update(text[:end])
+        render(markdown)
+
+    assert render(markdown) == render(Markdown(text))
+    assert "[ref]" not in render(markdown)
@@ -5,6 +5,7 @@ from dasshh.ui.events import (
     NewMessage,
     NewSession,
     LoadSession,
+    LoadOlderMessages,
     DeleteSession,
     AssistantResponseStart,
     AssistantResponseUpdate,
@@ -125,4 +126,10 @@ def test_assistant_tool_call_error_event():
     assert event.invocation_id == invocation_id
     assert event.tool_call_id == tool_call_id
     assert event.tool_name == tool_name
-    assert event.error == error 
\ No newline at end of file
+    assert event.error == error 
+
+
+def test_load_older_messages_event():
+    """Test initialization of LoadOlderMessages event."""
+    event = LoadOlderMessages()
+    assert isinstance(event, LoadOlderMessages)